@@ -0,0 +1 @@
+# This Python file uses the following encoding: utf-8
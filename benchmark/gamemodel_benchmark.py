@@ -0,0 +1,298 @@
+# This Python file uses the following encoding: utf-8
+#python -m benchmark.gamemodel_benchmark --save baseline.json
+#python -m benchmark.gamemodel_benchmark --baseline baseline.json
+
+import argparse
+import json
+import random
+import sys
+import time
+from benchmark.baseline import ConnectFourClassic as BaselineClassic, ConnectFourPopOut as BaselinePopOut
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT
+from gamemodel.solver.mcts import MCTSPlayer
+from gamemodel.solver.negamax import Solver
+
+# the frozen copy of the list-of-lists classes from before the optimizations is the reference every
+# other implementation is compared with, the list classes are those of the game model as it is now
+IMPLEMENTATIONS = {
+    'baseline': {CLASSIC: BaselineClassic, POPOUT: BaselinePopOut},
+    'list': {CLASSIC: ConnectFourClassic, POPOUT: ConnectFourPopOut},
+    'bitboard': {CLASSIC: ConnectFourBitboardClassic, POPOUT: ConnectFourBitboardPopOut},
+}
+REFERENCE = 'baseline'
+# the baseline classes have neither the legal moves nor the solver, only these benchmarks run on them
+REFERENCE_BENCHMARKS = ('drop_move', 'pop_move', 'is_valid_drop', 'is_winning', 'is_board_full', 'random_games')
+# a position in the middle of a game, without a winning line
+MIDGAME_BOARD = [[1, 2, 1, 2, 2, 1, 0],
+                 [2, 1, 2, 1, 1, 0, 0],
+                 [1, 0, 1, 2, 2, 0, 0],
+                 [0, 0, 2, 1, 0, 0, 0],
+                 [0, 0, 0, 0, 0, 0, 0],
+                 [0, 0, 0, 0, 0, 0, 0]]
+FULL_COLUMNS = [column for column in range(7) for _ in range(6)]
+
+
+def measure(run, operations, repeat):
+    '''Returns the best operations per second of @repeat calls of @run doing @operations each.
+
+    @run gets the object returned by its setup, so that the setup is not timed.'''
+    best = 0.0
+    for _ in range(repeat):
+        setup, timed = run()
+        start = time.perf_counter()
+        timed(setup)
+        elapsed = time.perf_counter() - start
+        best = max(best, operations / elapsed if elapsed > 0 else 0.0)
+    return best
+
+
+def get_midgame(game_class):
+    '''Returns the game of the @game_class in the midgame position'''
+    game = game_class()
+    game.board = [list(row) for row in MIDGAME_BOARD]
+    return game
+
+
+def bench_drop_move(game_class, scale):
+    '''Returns the drops per second, filling whole empty boards column by column'''
+    games = 20 * scale
+
+    def run():
+        def timed(boards):
+            for game in boards:
+                for column in FULL_COLUMNS:
+                    game.drop_move(column)
+        return [game_class() for _ in range(games)], timed
+    return run, games * len(FULL_COLUMNS)
+
+
+def bench_pop_move(game_class, scale):
+    '''Returns the pops per second, emptying whole boards of the current player's coins'''
+    games = 20 * scale
+
+    def run():
+        boards = []
+        for _ in range(games):
+            game = game_class()
+            game.board = [[1] * 7 for _ in range(6)]
+            boards.append(game)
+
+        def timed(boards):
+            for game in boards:
+                for column in FULL_COLUMNS:
+                    game.pop_move(column)
+        return boards, timed
+    return run, games * len(FULL_COLUMNS)
+
+
+def bench_is_valid_drop(game_class, scale):
+    '''Returns the is_valid_drop calls per second on the midgame position'''
+    rounds = 1000 * scale
+
+    def run():
+        def timed(game):
+            for _ in range(rounds):
+                for column in range(7):
+                    game.is_valid_drop(column)
+        return get_midgame(game_class), timed
+    return run, rounds * 7
+
+
+def bench_is_winning(game_class, scale):
+    '''Returns the is_winning calls per second on the midgame position'''
+    rounds = 500 * scale
+
+    def run():
+        def timed(game):
+            for _ in range(rounds):
+                game.is_winning(1)
+                game.is_winning(2)
+        return get_midgame(game_class), timed
+    return run, rounds * 2
+
+
+def bench_is_board_full(game_class, scale):
+    '''Returns the is_board_full calls per second on the midgame position'''
+    rounds = 2000 * scale
+
+    def run():
+        def timed(game):
+            for _ in range(rounds):
+                game.is_board_full()
+        return get_midgame(game_class), timed
+    return run, rounds
+
+
+def bench_legal_moves(game_class, scale):
+    '''Returns the legal_moves calls per second on the midgame position'''
+    rounds = 2000 * scale
+
+    def run():
+        def timed(game):
+            for _ in range(rounds):
+                game.legal_moves()
+        return get_midgame(game_class), timed
+    return run, rounds
+
+
+def play_random_game(game, rng, max_moves):
+    '''Plays the random moves on the @game until it ends or @max_moves are made'''
+    for _ in range(max_moves):
+        moves = game.legal_moves()
+        if not moves:
+            break
+        game.make_move(rng.choice(moves))
+        if game.get_game_state() is not None:
+            break
+        game.change_turns()
+
+
+def play_baseline_random_game(game, rng, max_moves):
+    '''Plays the random moves on the baseline @game the way the window of that version did: the valid
+    moves are asked column by column and the end of the game is checked with is_winning()'''
+    for _ in range(max_moves):
+        moves = [('drop', column) for column in range(game.column_count) if game.is_valid_drop(column)]
+        if hasattr(game, 'pop_move'):
+            moves += [('pop', column) for column in range(game.column_count) if game.is_valid_pop(column)]
+        if not moves:
+            break
+        kind, column = rng.choice(moves)
+        getattr(game, kind + '_move')(column)
+        if game.is_winning(game.current_player):
+            break
+        if kind == 'drop':
+            if game.is_board_full() and not hasattr(game, 'pop_move'):
+                break
+        elif game.is_winning(game.next_player):
+            break
+        game.change_turns()
+
+
+def bench_random_games(game_class, scale, max_moves=200):
+    '''Returns the random games per second, played to the end with the game model only'''
+    games = 10 * scale
+    play = play_random_game if hasattr(game_class, 'legal_moves') else play_baseline_random_game
+
+    def run():
+        def timed(rng):
+            for _ in range(games):
+                play(game_class(), rng, max_moves)
+        return random.Random(1), timed
+    return run, games
+
+
+def bench_search(game_class, scale):
+    '''Returns the search nodes (Classic) or the rollouts (PopOut) per second'''
+    if game_class.rules == CLASSIC:
+        solver = Solver(table_size=1 << 16)
+        result = solver.search(get_midgame(game_class), depth=4 + scale)
+        return result.nodes_per_second
+    result = MCTSPlayer(iterations=50 * scale, seed=1).search(game_class())
+    return result.rollouts_per_second
+
+
+BENCHMARKS = {
+    'drop_move': bench_drop_move,
+    'pop_move': bench_pop_move,
+    'is_valid_drop': bench_is_valid_drop,
+    'is_winning': bench_is_winning,
+    'is_board_full': bench_is_board_full,
+    'legal_moves': bench_legal_moves,
+    'random_games': bench_random_games,
+    'search': bench_search,
+}
+
+
+def run_benchmarks(implementations=None, benchmarks=None, scale=1, repeat=3):
+    '''Returns the {implementation: {rules: {benchmark: operations per second}}} results'''
+    results = {}
+    for implementation in implementations or IMPLEMENTATIONS:
+        results[implementation] = {}
+        for rules, game_class in IMPLEMENTATIONS[implementation].items():
+            results[implementation][rules] = {}
+            for name in benchmarks or BENCHMARKS:
+                if name == 'pop_move' and rules != POPOUT:
+                    continue
+                if implementation == REFERENCE and name not in REFERENCE_BENCHMARKS:
+                    continue
+                if name == 'search':
+                    value = max(bench_search(game_class, scale) for _ in range(repeat))
+                else:
+                    run, operations = BENCHMARKS[name](game_class, scale)
+                    value = measure(run, operations, repeat)
+                results[implementation][rules][name] = value
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''Returns the rows (implementation, rules, benchmark, value, baseline value, ratio, regressed)
+    of every result that is also in the @baseline results'''
+    rows = []
+    for implementation, rule_sets in results.items():
+        for rules, values in rule_sets.items():
+            for name, value in values.items():
+                base = baseline.get(implementation, {}).get(rules, {}).get(name)
+                if base:
+                    ratio = value / base
+                    rows.append((implementation, rules, name, value, base, ratio, ratio < 1 - threshold))
+    return rows
+
+
+def print_results(results, output=sys.stdout):
+    '''Prints the table of the @results with the speedup over the baseline implementation'''
+    print(f'{"implementation":<16}{"rules":<9}{"benchmark":<15}{"ops/s":>14}{"vs " + REFERENCE:>14}', file=output)
+    for implementation, rule_sets in results.items():
+        for rules, values in rule_sets.items():
+            for name, value in values.items():
+                reference = results.get(REFERENCE, {}).get(rules, {}).get(name)
+                speedup = f'{value / reference:.2f}x' if reference else '-'
+                print(f'{implementation:<16}{rules:<9}{name:<15}{value:>14,.0f}{speedup:>14}', file=output)
+    # the whole random games are what the simulations spend their time on, so every implementation
+    # is compared with each one before it apart
+    implementations = list(results)
+    for index, implementation in enumerate(implementations):
+        for rules, values in results[implementation].items():
+            for other in implementations[:index]:
+                reference = results[other].get(rules, {}).get('random_games')
+                if reference and 'random_games' in values:
+                    print(f'full games: {implementation} {rules} {values["random_games"] / reference:.2f}x '
+                          f'the {other} speed', file=output)
+
+
+def main(argv=None):
+    '''Runs the benchmarks described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m benchmark.gamemodel_benchmark',
+                                     description='Benchmarks the hot paths of the game model.')
+    parser.add_argument('--implementation', action='append', choices=sorted(IMPLEMENTATIONS),
+                        help='implementation to benchmark (all by default), can be repeated')
+    parser.add_argument('--benchmark', action='append', choices=sorted(BENCHMARKS),
+                        help='benchmark to run (all by default), can be repeated')
+    parser.add_argument('--scale', type=int, default=1, help='multiplies the work of every benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='the best of the repeats is reported')
+    parser.add_argument('--save', help='JSON file to save the results to')
+    parser.add_argument('--baseline', help='JSON file with the results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown ratio reported as a regression (0.1 = 10%% slower)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.implementation, args.benchmark, args.scale, args.repeat)
+    print_results(results)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            rows = compare(results, json.load(file), args.threshold)
+        print()
+        print(f'{"implementation":<16}{"rules":<9}{"benchmark":<15}{"ops/s":>14}{"baseline":>14}{"ratio":>8}')
+        for implementation, rules, name, value, base, ratio, regressed in rows:
+            print(f'{implementation:<16}{rules:<9}{name:<15}{value:>14,.0f}{base:>14,.0f}{ratio:>8.2f}'
+                  + ('  REGRESSION' if regressed else ''))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
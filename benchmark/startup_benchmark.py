@@ -0,0 +1,107 @@
+# This Python file uses the following encoding: utf-8
+#python -m benchmark.startup_benchmark --save startup.json
+#QT_QPA_PLATFORM=offscreen python -m benchmark.startup_benchmark
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the modules the headless workers start with, none of them may load Qt
+HEADLESS_MODULES = ['gamemodel', 'gamemodel.connectfour', 'gamemodel.bitboard', 'gamemodel.solver',
+                    'gamemodel.arena', 'gamemodel.gamerecord']
+IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - start, 'qt': 'PySide2' in sys.modules}}))
+'''
+# the same steps as main.main(), the first paint event of any widget stops the clock
+FIRST_PAINT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from PySide2.QtWidgets import QApplication
+from PySide2.QtCore import QEvent, QObject, QTimer
+from interface.mainwindow import MainWindow
+imported = time.perf_counter()
+app = QApplication([])
+win = MainWindow()
+win.show()
+shown = time.perf_counter()
+times = {}
+
+class PaintWatcher(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and 'paint' not in times:
+            times['paint'] = time.perf_counter()
+            QTimer.singleShot(0, app.quit)
+        return False
+
+watcher = PaintWatcher()
+app.installEventFilter(watcher)
+QTimer.singleShot(10000, app.quit)
+app.exec_()
+print(json.dumps({'seconds': times.get('paint', float('nan')) - start, 'import_seconds': imported - start,
+                  'show_seconds': shown - start, 'qt': True}))
+'''
+
+
+def run_script(script):
+    '''Runs the @script in a new interpreter, returns its JSON output and the wall time of the whole process'''
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result['process_seconds'] = time.perf_counter() - start
+    return result
+
+
+def measure(script, repeat):
+    '''Returns the result of the fastest of @repeat runs of the @script, each in a new process'''
+    return min((run_script(script) for _ in range(repeat)), key=lambda result: result['seconds'])
+
+
+def run_benchmarks(modules=None, repeat=5, gui=True):
+    '''Returns the {name: result} of the cold imports of the @modules and of the first paint of the window'''
+    results = {'python': measure('print(\'{"seconds": 0.0, "qt": false}\')', repeat)}
+    for module in modules or HEADLESS_MODULES:
+        results['import ' + module] = measure(IMPORT_SCRIPT.format(module=module), repeat)
+    if gui:
+        results['first paint'] = measure(FIRST_PAINT_SCRIPT, repeat)
+    return results
+
+
+def print_results(results, output=sys.stdout):
+    '''Prints the table of the @results in milliseconds'''
+    print(f'{"benchmark":<32}{"in process ms":>15}{"process ms":>12}{"Qt":>5}', file=output)
+    for name, result in results.items():
+        print(f'{name:<32}{1000 * result["seconds"]:>15.1f}{1000 * result["process_seconds"]:>12.1f}'
+              f'{"yes" if result["qt"] else "no":>5}', file=output)
+
+
+def main(argv=None):
+    '''Runs the startup benchmarks described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m benchmark.startup_benchmark',
+                                     description='Measures the import time of the game model and the time to the first paint of the window.')
+    parser.add_argument('--module', action='append', help='module to import (the headless ones by default), can be repeated')
+    parser.add_argument('--repeat', type=int, default=5, help='the fastest of the repeats is reported')
+    parser.add_argument('--no-gui', dest='gui', action='store_false', help='skip the first paint of the window')
+    parser.add_argument('--save', help='JSON file to save the results to')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.module, args.repeat, args.gui)
+    print_results(results)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    # a headless module pulling in Qt is a failure, the workers would pay for it in every process
+    if any(result['qt'] for name, result in results.items() if name.startswith('import ')):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
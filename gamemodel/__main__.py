@@ -0,0 +1,22 @@
+# This Python file uses the following encoding: utf-8
+#python -m gamemodel arena random greedy --games 100
+
+import importlib
+import sys
+
+# the headless tools, only the chosen one is imported; none of them imports Qt
+TOOLS = {'arena': 'gamemodel.arena', 'book': 'gamemodel.solver.book', 'perft': 'gamemodel.perft',
+         'trainingdata': 'gamemodel.trainingdata'}
+
+
+def main(argv=None):
+    '''Runs the headless tool named by the first command line argument with the rest of the arguments'''
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in TOOLS:
+        print(f'usage: python -m gamemodel {{{",".join(TOOLS)}}} [arguments]', file=sys.stderr)
+        return 2
+    return importlib.import_module(TOOLS[argv[0]]).main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# This Python file uses the following encoding: utf-8
+#python -m gamemodel.arena random greedy --games 100 --workers 4 --output results.jsonl
+
+import argparse
+import json
+import random
+import sys
+import time
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import CLASSIC, POPOUT, DROP
+from gamemodel.solver.mcts import MCTSPlayer
+from gamemodel.solver.negamax import Solver
+
+GAME_CLASSES = {CLASSIC: ConnectFourBitboardClassic, POPOUT: ConnectFourBitboardPopOut}
+INITIAL_RATING = 1500
+RATING_FACTOR = 16
+
+
+class RandomAgent:
+    '''Agent making random legal moves'''
+    def __init__(self, seed=None):
+        '''Initialize the random generator with the @seed'''
+        self.rng = random.Random(seed)
+
+    def choose_move(self, game):
+        '''Returns a random legal move of the current player of the @game'''
+        return self.rng.choice(game.legal_moves())
+
+
+class GreedyAgent(RandomAgent):
+    '''Agent winning at once when it can, else blocking the opponent's immediate win, else random'''
+    def choose_move(self, game):
+        '''Returns the winning, the blocking or a random move of the current player of the @game'''
+        moves = game.legal_moves()
+        for move in moves:
+            game.make_move(move)
+            game_state = game.get_game_state()
+            game.undo()
+            if game_state == game.current_player:
+                return move
+        # a drop of the opponent's coin shows where the opponent would win
+        game.change_turns()
+        threats = []
+        for move in moves:
+            if move[0] == DROP:
+                game.make_move(move)
+                if game.get_game_state() == game.current_player:
+                    threats.append(move)
+                game.undo()
+        game.change_turns()
+        return threats[0] if threats else self.rng.choice(moves)
+
+
+class NegamaxAgent:
+    '''Agent choosing the drops with the alpha-beta Solver (Classic rules only)'''
+    def __init__(self, depth=6, seed=None):
+        '''Initialize the solver searching @depth moves ahead'''
+        self.depth = depth
+        self.solver = Solver(table_size=1 << 18)
+
+    def choose_move(self, game):
+        '''Returns the drop chosen by the solver for the current player of the @game'''
+        if game.rules != CLASSIC:
+            raise ValueError('The negamax agent plays only the Classic rules')
+        return (DROP, self.solver.best_move(game, depth=self.depth))
+
+
+class MCTSAgent:
+    '''Agent choosing the moves with the Monte Carlo Tree Search'''
+    def __init__(self, iterations=400, seed=None):
+        '''Initialize the single process search with @iterations rollouts per move'''
+        self.player = MCTSPlayer(iterations=iterations, seed=seed)
+
+    def choose_move(self, game):
+        '''Returns the move chosen by the search for the current player of the @game'''
+        return self.player.choose_move(game)
+
+
+AGENTS = {'random': RandomAgent, 'greedy': GreedyAgent, 'negamax': NegamaxAgent, 'mcts': MCTSAgent}
+
+
+def create_agent(spec, seed=None):
+    '''Returns the agent described by the @spec: its name and an optional strength, e.g. "negamax:6"'''
+    # the label after "#" only tells apart two agents of the same kind
+    name, _, strength = spec.split('#')[0].partition(':')
+    if name not in AGENTS:
+        raise ValueError(f'Unknown agent {name!r}, choose one of: {", ".join(AGENTS)}')
+    if strength:
+        return AGENTS[name](int(strength), seed=seed)
+    return AGENTS[name](seed=seed)
+
+
+def play_game(task):
+    '''Plays the game described by the @task dictionary, returns the dictionary of its result.
+
+    The winner is the spec of the winning agent, None for a draw. The game is drawn by the
+    repetition of a position or after the max_moves moves, PopOut games could go on forever.'''
+    game = GAME_CLASSES[task['rules']](*task.get('geometry', (6, 7, 4)), move_limit=task['max_moves'])
+    agents = {1: create_agent(task['first'], task['seed']),
+              2: create_agent(task['second'], task['seed'] + 1)}
+    start = time.perf_counter()
+    moves = []
+    game_state = None
+    while game_state is None and game.legal_moves():
+        move = agents[game.current_player].choose_move(game)
+        game.make_move(move)
+        moves.append(list(move))
+        game_state = game.get_game_state()
+        if game_state is None:
+            game.change_turns()
+    winner = None
+    if game_state:
+        winner = task['first'] if game_state == 1 else task['second']
+    return {'game': task['game'], 'rules': task['rules'], 'first': task['first'],
+            'second': task['second'], 'winner': winner, 'moves': moves,
+            'seconds': round(time.perf_counter() - start, 6)}
+
+
+def get_expected_score(rating, opponent_rating):
+    '''Returns the expected score of the player with the @rating against the @opponent_rating'''
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def update_ratings(ratings, result):
+    '''Updates the Elo @ratings of both agents of the game @result'''
+    first, second = result['first'], result['second']
+    score = 0.5 if result['winner'] is None else float(result['winner'] == first)
+    expected = get_expected_score(ratings[first], ratings[second])
+    ratings[first] += RATING_FACTOR * (score - expected)
+    ratings[second] -= RATING_FACTOR * (score - expected)
+
+
+def get_tasks(agents, games, rules, max_moves, seed, geometry=(6, 7, 4)):
+    '''Returns the tasks of @games games between the @agents pair, swapping who starts every game.
+    The @geometry is the (rows, columns, coins in a winning line) of the board.'''
+    return [{'game': game, 'rules': rules, 'max_moves': max_moves, 'seed': seed + 2 * game,
+             'geometry': geometry,
+             'first': agents[game % 2], 'second': agents[(game + 1) % 2]}
+            for game in range(games)]
+
+
+def run_tournament(agents, games, rules=CLASSIC, workers=1, max_moves=200, seed=0, output=None,
+                   geometry=(6, 7, 4)):
+    '''Plays @games games between the pair of @agents specs, writing every result as a JSON line
+    to the @output file as soon as the game ends. Returns the summary dictionary.'''
+    if agents[0] == agents[1]:
+        agents = (agents[0], agents[1] + '#2')
+    tasks = get_tasks(agents, games, rules, max_moves, seed, geometry)
+    summary = {agent: {'wins': 0, 'draws': 0, 'losses': 0} for agent in agents}
+    ratings = {agent: float(INITIAL_RATING) for agent in agents}
+    results = []
+    start = time.perf_counter()
+
+    def record(result):
+        if output is not None:
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+        for agent in (result['first'], result['second']):
+            if result['winner'] is None:
+                summary[agent]['draws'] += 1
+            elif result['winner'] == agent:
+                summary[agent]['wins'] += 1
+            else:
+                summary[agent]['losses'] += 1
+        results.append(result)
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(workers) as executor:
+            for future in as_completed([executor.submit(play_game, task) for task in tasks]):
+                record(future.result())
+    else:
+        for task in tasks:
+            record(play_game(task))
+    # the games end in any order on the processes, the ratings are updated in the order of the games
+    # so that the same seed gives the same ratings
+    for result in sorted(results, key=lambda result: result['game']):
+        update_ratings(ratings, result)
+
+    elapsed = time.perf_counter() - start
+    for agent in agents:
+        played = sum(summary[agent].values()) or 1
+        summary[agent]['win_rate'] = summary[agent]['wins'] / played
+        summary[agent]['draw_rate'] = summary[agent]['draws'] / played
+        summary[agent]['rating'] = round(ratings[agent], 1)
+    return {'games': games, 'rules': rules, 'agents': summary, 'seconds': round(elapsed, 3),
+            'games_per_second': games / elapsed if elapsed > 0 else 0.0}
+
+
+def main(argv=None):
+    '''Runs the tournament described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m gamemodel.arena',
+                                     description='Plays ConnectFour games between two agents without the GUI.')
+    parser.add_argument('first', help='first agent: ' + ', '.join(AGENTS) + ' (optionally name:strength)')
+    parser.add_argument('second', help='second agent, the agents take turns to start')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--rules', choices=sorted(GAME_CLASSES), default=CLASSIC)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4, help='number of coins in a winning line')
+    parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout,
+                        help='file for the JSON lines of the game results (stdout by default)')
+    parser.add_argument('--instrument', action='store_true',
+                        help='time the game model methods, writing their summary to stderr (needs --workers 1)')
+    parser.add_argument('--summary-interval', type=int, help='write the summary every this many moves too')
+    parser.add_argument('--profile-moves', type=int, help='profile this many first moves with cProfile')
+    parser.add_argument('--profile-output', help='file for the pstats of the profiled moves')
+    args = parser.parse_args(argv)
+    instrumentation = None
+    if args.instrument or args.profile_moves:
+        if args.workers > 1:
+            parser.error('the instrumentation times the games of this process only, use --workers 1')
+        from gamemodel.instrumentation import Instrumentation
+        instrumentation = Instrumentation(args.summary_interval)
+        instrumentation.attach_game_model()
+        if args.profile_moves:
+            instrumentation.profile_moves(args.profile_moves, args.profile_output)
+    try:
+        summary = run_tournament((args.first, args.second), args.games, args.rules, args.workers,
+                                 args.max_moves, args.seed, args.output,
+                                 (args.rows, args.columns, args.connect))
+    finally:
+        if instrumentation is not None:
+            instrumentation.detach()
+            print(instrumentation.format_summary(), file=sys.stderr)
+            if instrumentation.profile_stats is not None:
+                instrumentation.profile_stats.stream = sys.stderr
+                instrumentation.profile_stats.sort_stats('cumulative').print_stats(20)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# This Python file uses the following encoding: utf-8
+
+import numpy as np
+from gamemodel.connectfour import DIRECTIONS
+
+
+class BatchConnectFour:
+    '''Plays many ConnectFour games at once, keeping all their boards in one N x rows x columns int8 array.
+
+    The rules are the same as in ConnectFourClassic and ConnectFourPopOut, except for the PopOut draws
+    by the repetition and by the move limit: the batch keeps neither the positions seen before nor
+    the move counts, its PopOut games are drawn only on the full board where the next player cannot
+    pop. Unlike the single games, a batch changes the turns itself after every move that does not
+    end the game, and a finished game does not accept any more moves until it is reset.'''
+    def __init__(self, size, popout=False, row_count=6, column_count=7, connect_count=4):
+        '''Initialize @size empty boards playing by the Classic (or PopOut if @popout) rules'''
+        self.size = size
+        self.popout = popout
+        self.row_count = row_count
+        self.column_count = column_count
+        self.connect_count = connect_count
+        self.boards = np.zeros((size, self.row_count, self.column_count), dtype=np.int8)
+        self.current_player = np.ones(size, dtype=np.int8)
+        self.finished = np.zeros(size, dtype=bool)
+        self.winner = np.zeros(size, dtype=np.int8)
+        self.indices = np.arange(size)
+
+    def reset(self, boards=None):
+        '''Resets the games selected by the @boards mask (all the games by default)'''
+        if boards is None:
+            boards = np.ones(self.size, dtype=bool)
+        self.boards[boards] = 0
+        self.current_player[boards] = 1
+        self.finished[boards] = False
+        self.winner[boards] = 0
+
+    def get_next_player(self):
+        '''Returns the array of the players waiting for their turn'''
+        return 3 - self.current_player
+
+    def get_heights(self, columns):
+        '''Returns the number of coins in the given column of every board'''
+        return np.count_nonzero(self.boards[self.indices, :, columns], axis=1)
+
+    def get_columns(self, columns):
+        '''Returns the @columns as an array and the mask of the ones lying on the board'''
+        columns = np.asarray(columns, dtype=np.int64)
+        on_board = (columns >= 0) & (columns < self.column_count)
+        return np.where(on_board, columns, 0), on_board
+
+    def is_valid_drop(self, columns):
+        '''Returns the mask of the boards where the drop on the given column is possible'''
+        columns, on_board = self.get_columns(columns)
+        top_empty = self.boards[self.indices, self.row_count - 1, columns] == 0
+        return on_board & top_empty & ~self.finished
+
+    def is_valid_pop(self, columns):
+        '''Returns the mask of the boards where the pop from the given column is possible'''
+        columns, on_board = self.get_columns(columns)
+        if not self.popout:
+            return np.zeros(self.size, dtype=bool)
+        own_bottom = self.boards[self.indices, 0, columns] == self.current_player
+        return on_board & own_bottom & ~self.finished
+
+    def is_winning(self, players):
+        '''Returns the mask of the boards where the given player (one per board) has a line of connect_count'''
+        players = np.broadcast_to(np.asarray(players, dtype=np.int8), (self.size,))
+        coins = self.boards == players[:, None, None]
+        rows, columns, length = self.row_count, self.column_count, self.connect_count
+        winning = np.zeros(self.size, dtype=bool)
+        for row_step, column_step in DIRECTIONS:
+            row_span, column_span = (length - 1) * row_step, (length - 1) * abs(column_step)
+            if row_span >= rows or column_span >= columns:
+                continue
+            # every shifted slice is the field one step further along the line
+            lines = None
+            for offset in range(length):
+                row = offset * row_step
+                column = offset * column_step if column_step >= 0 else column_span - offset
+                fields = coins[:, row:rows - row_span + row, column:columns - column_span + column]
+                lines = fields if lines is None else lines & fields
+            winning |= lines.any(axis=(1, 2))
+        return winning
+
+    def is_board_full(self):
+        '''Returns the mask of the boards without any free space'''
+        return np.all(self.boards[:, self.row_count - 1, :] != 0, axis=1)
+
+    def drop_move(self, columns):
+        '''Drops the coin of the current player on the given column of every board.
+
+        Returns the (valid, win, draw) masks of the boards.'''
+        return self.play(columns, np.zeros(self.size, dtype=bool))
+
+    def pop_move(self, columns):
+        '''Pops the coin of the current player from the given column of every board.
+
+        Returns the (valid, win, draw) masks of the boards.'''
+        return self.play(columns, np.ones(self.size, dtype=bool))
+
+    def play(self, columns, pops):
+        '''Makes the move on the given column of every board, a pop where @pops is set, else a drop.
+
+        Returns the (valid, win, draw) masks of the boards. A pop can also win the game for the
+        other player, the winner of every finished game is kept in the winner array.'''
+        pops = np.asarray(pops, dtype=bool)
+        valid = np.where(pops, self.is_valid_pop(columns), self.is_valid_drop(columns))
+        columns, _ = self.get_columns(columns)
+
+        dropped = np.flatnonzero(valid & ~pops)
+        if dropped.size:
+            rows = self.get_heights(columns)[dropped]
+            self.boards[dropped, rows, columns[dropped]] = self.current_player[dropped]
+
+        popped = np.flatnonzero(valid & pops)
+        if popped.size:
+            popped_columns = columns[popped]
+            self.boards[popped, :-1, popped_columns] = self.boards[popped, 1:, popped_columns]
+            self.boards[popped, -1, popped_columns] = 0
+
+        current_wins = valid & self.is_winning(self.current_player)
+        # after a pop the coins of the other player move too, the mover's line counts first
+        next_wins = valid & pops & ~current_wins & self.is_winning(self.get_next_player())
+        win = current_wins | next_wins
+        draw = valid & ~win & self.is_board_full()
+        if self.popout:
+            # the full board goes on if the next player has a coin to pop
+            next_bottom = self.boards[:, 0, :] == self.get_next_player()[:, None]
+            draw &= ~next_bottom.any(axis=1)
+
+        self.winner[current_wins] = self.current_player[current_wins]
+        self.winner[next_wins] = self.get_next_player()[next_wins]
+        self.finished |= win | draw
+        going_on = valid & ~self.finished
+        self.current_player[going_on] = 3 - self.current_player[going_on]
+        return valid, win, draw
@@ -0,0 +1,293 @@
+# This Python file uses the following encoding: utf-8
+
+from functools import lru_cache
+from gamemodel.connectfour import ConnectFourBase, DROP, POP, CLASSIC, POPOUT
+from gamemodel.wrongmoveexception import WrongMoveException
+
+
+@lru_cache(maxsize=None)
+def get_move_sets(row_count, column_count):
+    '''Returns the {columns bitmask: moves tuple} dictionaries of the drops and of the pops shared by
+    all the games of the board size, filled by the games as the bitmasks come up'''
+    return {}, {}
+
+
+@lru_cache(maxsize=None)
+def get_pop_hashes(row_count, column_count):
+    '''Returns the {column bits: (hash change, mirror hash change)} dictionaries of the pops, indexed by
+    [player][column] and shared by all the games of the board size, filled by the games as the bits come up'''
+    return {player: [{} for column in range(column_count)] for player in (1, 2)}
+
+
+class ConnectFourBitboardBase(ConnectFourBase):
+    '''Base class for the ConnectFour games keeping the board as one integer bitboard per player.
+
+    Every column takes row_count + 1 bits (the extra bit is an always empty sentinel that stops the
+    shifts from wrapping into the next column), so the field (row, column) is the bit
+    column * (row_count + 1) + row. The list-of-lists board is only built on demand by get_board().'''
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, bitboards and current player turns, @connect_count coins in a line win'''
+        super().__init__(row_count, column_count, connect_count, move_limit)
+
+    @property
+    def board(self):
+        '''The read-only view of the bitboards as a tuple of the row tuples, row 0 being the bottom row.
+        The fields cannot be written, the position changes by the moves or by setting a whole board.'''
+        return tuple(tuple(row) for row in self.get_board())
+
+    @board.setter
+    def board(self, board):
+        '''Loads the bitboards from the list-of-lists @board'''
+        self.column_height = self.row_count + 1
+        self.column_mask = (1 << self.row_count) - 1
+        self.line_steps = self.get_line_steps()
+        self.bottom_bits = tuple(1 << self.get_bit(0, column) for column in range(self.column_count))
+        self.bottom_mask = sum(self.bottom_bits)
+        self.top_bits = tuple(bit << (self.row_count - 1) for bit in self.bottom_bits)
+        self.top_mask = sum(self.top_bits)
+        self.drop_move_sets, self.pop_move_sets = get_move_sets(self.row_count, self.column_count)
+        self.pop_hashes = get_pop_hashes(self.row_count, self.column_count)
+        self.bitboards = [0, 0, 0]
+        for row in range(self.row_count):
+            for column in range(self.column_count):
+                player = board[row][column]
+                if player != 0:
+                    self.bitboards[player] |= 1 << self.get_bit(row, column)
+        self.reset_position_state()
+
+    def reset_hash(self):
+        '''Computes the Zobrist hash of the board and of its mirror image from scratch'''
+        self.hash = 0
+        self.mirror_hash = 0
+        # only the coins are visited, the empty board of a new game costs nothing
+        for player in (1, 2):
+            bitboard = self.bitboards[player]
+            while bitboard:
+                bit = bitboard & -bitboard
+                column, row = divmod(bit.bit_length() - 1, self.column_height)
+                self.toggle_field_hash(player, row, column)
+                bitboard ^= bit
+
+    def reset_heights(self):
+        '''Counts the coins of every column and of the whole board from scratch'''
+        occupied = self.bitboards[1] | self.bitboards[2]
+        self.heights = [self.get_column_bits(occupied, column).bit_length()
+                        for column in range(self.column_count)]
+        self.coin_count = sum(self.heights)
+
+    def get_bit(self, row, column):
+        '''Returns the index of the bit representing the field at @row and @column'''
+        return column * self.column_height + row
+
+    def get_board(self):
+        '''Returns the current board as a list of lists'''
+        first, second = self.bitboards[1], self.bitboards[2]
+        board = self.get_new_board()
+        for row in range(self.row_count):
+            for column in range(self.column_count):
+                bit = 1 << self.get_bit(row, column)
+                if first & bit:
+                    board[row][column] = 1
+                elif second & bit:
+                    board[row][column] = 2
+        return board
+
+    def get_column_bits(self, bitboard, column):
+        '''Returns the bits of the given @column of the @bitboard shifted down to the lowest bits'''
+        return (bitboard >> (column * self.column_height)) & self.column_mask
+
+    def drop_move(self, column):
+        '''Drops the coin of the current player on the given @column'''
+        if self.is_valid_drop(column):
+            row = self.heights[column]
+            self.bitboards[self.current_player] |= 1 << (column * self.column_height + row)
+            self.toggle_field_hash(self.current_player, row, column)
+            self.record_move(DROP, row, column)
+        else:
+            raise WrongMoveException(column)
+
+    def undo_drop(self, row, column):
+        '''Removes the coin dropped on @row and @column'''
+        bit = 1 << self.get_bit(row, column)
+        for player in (1, 2):
+            if self.bitboards[player] & bit:
+                self.bitboards[player] ^= bit
+                self.toggle_field_hash(player, row, column)
+
+    def undo_pop(self, column):
+        '''Shifts the @column one row up and puts back the popped coin of the current player'''
+        shift = column * self.column_height
+        mask = self.column_mask << shift
+        for player in (1, 2):
+            bitboard = self.bitboards[player]
+            # the column as it was before the pop, whose hash change is taken back
+            column_bits = (bitboard >> shift & self.column_mask) << 1 | (player == self.current_player)
+            if column_bits:
+                hash_change, mirror_hash_change = self.get_pop_hash(player, column, column_bits)
+                self.hash ^= hash_change
+                self.mirror_hash ^= mirror_hash_change
+                self.bitboards[player] = (bitboard & ~mask) | (column_bits << shift)
+
+    def is_winning(self, player):
+        '''Returns True if the given @player wins the game, else False'''
+        bitboard = self.bitboards[player]
+        for _, steps in self.line_steps:
+            starts = bitboard
+            for step in steps:
+                starts &= starts >> step
+            if starts:
+                return True
+        return False
+
+    def get_line_steps(self):
+        '''Returns the shifts finding the starts of the lines of connect_count coins, one tuple for the
+        vertical, horizontal, negatively and positively sloped lines'''
+        line_steps = []
+        for shift in (1, self.column_height, self.column_height - 1, self.column_height + 1):
+            # every step doubles the length of the runs of coins, the last one tops them up;
+            # the sentinel row stops the lines from wrapping, every step of a line passes through it
+            steps, length = [], 1
+            while 2 * length <= self.connect_count:
+                steps.append(length * shift)
+                length *= 2
+            if length < self.connect_count:
+                steps.append((self.connect_count - length) * shift)
+            line_steps.append((shift, tuple(steps)))
+        return line_steps
+
+    def is_winning_move(self, row, column):
+        '''Returns True if the coin on @row and @column is a part of a winning line, else False'''
+        bit = 1 << self.get_bit(row, column)
+        for player in (1, 2):
+            if self.bitboards[player] & bit:
+                return self.is_line_through(self.bitboards[player], bit)
+        return False
+
+    def is_line_through(self, bitboard, bit):
+        '''Returns True if the coin of the @bit is a part of a line of connect_count coins of the @bitboard'''
+        # only the runs of coins going both ways from the bit are followed, the sentinel row
+        # and the ends of the board stop them
+        for shift, _ in self.line_steps:
+            length = 1
+            probe = bit << shift
+            while bitboard & probe:
+                length += 1
+                probe <<= shift
+            probe = bit >> shift
+            while bitboard & probe:
+                length += 1
+                probe >>= shift
+            if length >= self.connect_count:
+                return True
+        return False
+
+    def last_move_wins(self, player):
+        '''Returns True if the last move made a winning line for the given @player, else False'''
+        if self.last_move is None:
+            return False
+        kind, row, column = self.last_move
+        bitboard = self.bitboards[player]
+        if kind == DROP:
+            bit = 1 << (column * self.column_height + row)
+            return bitboard & bit != 0 and self.is_line_through(bitboard, bit)
+        # a pop shifts the whole column, so only the lines crossing this column could have changed;
+        # most positions have no line at all, which is_winning() tells the quickest
+        if not self.is_winning(player):
+            return False
+        column_bits = self.column_mask << (column * self.column_height)
+        return self.get_winning_lines(bitboard) & column_bits != 0
+
+    def legal_moves(self):
+        '''Returns the tuple of all the (kind, column) moves the current player can make'''
+        # the moves are looked up by the full columns (the top row) and the current player's
+        # coins on the bottom row, so the same moves tuple is built only once
+        full = (self.bitboards[1] | self.bitboards[2]) & self.top_mask
+        moves = self.drop_move_sets.get(full)
+        if moves is None:
+            moves = tuple(move for move, bit in zip(self.drop_moves, self.top_bits) if not full & bit)
+            self.drop_move_sets[full] = moves
+        if self.rules == POPOUT:
+            bottom = self.bitboards[self.current_player] & self.bottom_mask
+            pops = self.pop_move_sets.get(bottom)
+            if pops is None:
+                pops = tuple(move for move, bit in zip(self.pop_moves, self.bottom_bits) if bottom & bit)
+                self.pop_move_sets[bottom] = pops
+            moves += pops
+        return moves
+
+    def get_pop_hash(self, player, column, column_bits):
+        '''Returns the (hash change, mirror hash change) of the pop shifting the coins of the @player
+        on the @column_bits of the @column one row down, the coin on the bottom row leaves the board'''
+        changes = self.pop_hashes[player][column]
+        change = changes.get(column_bits)
+        if change is None:
+            keys = self.zobrist_keys[player]
+            mirror_column = self.column_count - 1 - column
+            hash_change = mirror_hash_change = 0
+            for row in range(self.row_count):
+                if column_bits >> row & 1:
+                    hash_change ^= keys[row][column]
+                    mirror_hash_change ^= keys[row][mirror_column]
+                    if row > 0:
+                        hash_change ^= keys[row - 1][column]
+                        mirror_hash_change ^= keys[row - 1][mirror_column]
+            change = changes[column_bits] = (hash_change, mirror_hash_change)
+        return change
+
+    def has_bottom_coin(self, player):
+        '''Returns True if the @player has a coin on the bottom row (so that it can pop), else False'''
+        return self.bitboards[player] & self.bottom_mask != 0
+
+    def get_winning_lines(self, bitboard):
+        '''Returns the bitboard of all the coins of the @bitboard that are a part of a winning line'''
+        # the shifts cost the same no matter where the coins are, so the checks stay constant time
+        lines = 0
+        for shift, steps in self.line_steps:
+            starts = bitboard
+            for step in steps:
+                starts &= starts >> step
+            for offset in range(self.connect_count):
+                lines |= starts << (offset * shift)
+        return lines
+
+
+class ConnectFourBitboardClassic(ConnectFourBitboardBase):
+    '''Implements the classic version of the ConnectFour game on bitboards'''
+    rules = CLASSIC
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, bitboards and current player turns, @connect_count coins in a line win'''
+        super().__init__(row_count, column_count, connect_count, move_limit)
+
+
+class ConnectFourBitboardPopOut(ConnectFourBitboardBase):
+    '''Implements the PopOut version of the ConnectFour game on bitboards'''
+    rules = POPOUT
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, bitboards and current player turns, @connect_count coins in a line win'''
+        super().__init__(row_count, column_count, connect_count, move_limit)
+
+    def pop_move(self, column):
+        '''Pops the coin of the current player from the given @column'''
+        if self.is_valid_pop(column):
+            shift = column * self.column_height
+            mask = self.column_mask << shift
+            for player in (1, 2):
+                bitboard = self.bitboards[player]
+                column_bits = bitboard >> shift & self.column_mask
+                if column_bits:
+                    # every coin of the column moves one row down, the keys of the whole column change at once
+                    hash_change, mirror_hash_change = self.get_pop_hash(player, column, column_bits)
+                    self.hash ^= hash_change
+                    self.mirror_hash ^= mirror_hash_change
+                    self.bitboards[player] = (bitboard & ~mask) | (column_bits >> 1 << shift)
+            self.record_move(POP, 0, column)
+        else:
+            raise WrongMoveException(column)
+
+    def is_valid_pop(self, column):
+        '''Returns True if the pop from the given @column is possible, else False'''
+        if not 0 <= column < self.column_count:
+            return False
+        return bool(self.bitboards[self.current_player] >> self.get_bit(0, column) & 1)
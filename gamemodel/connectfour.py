@@ -1,34 +1,157 @@
 # This Python file uses the following encoding: utf-8
 
+from functools import lru_cache
 from gamemodel.wrongmoveexception import WrongMoveException
+from gamemodel.zobrist import get_zobrist_keys, get_side_key
+
+DROP = 'drop'
+POP = 'pop'
+CLASSIC = 'Classic'
+POPOUT = 'PopOut'
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+# the game is drawn when the same position is reached this many times
+REPETITION_LIMIT = 3
+
+
+@lru_cache(maxsize=None)
+def get_winning_lines(row_count, column_count, connect_count):
+    '''Returns all the lines of @connect_count fields on the board of @row_count rows and
+    @column_count columns, each line being the tuple of its (row, column) fields'''
+    lines = []
+    # horizontal, vertical, positively and negatively sloped diagonals
+    for row_step, column_step in DIRECTIONS:
+        for row in range(row_count):
+            for column in range(column_count):
+                last_row = row + (connect_count - 1) * row_step
+                last_column = column + (connect_count - 1) * column_step
+                if 0 <= last_row < row_count and 0 <= last_column < column_count:
+                    lines.append(tuple((row + i * row_step, column + i * column_step)
+                                       for i in range(connect_count)))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=None)
+def get_field_lines(row_count, column_count, connect_count):
+    '''Returns the lines crossing every field of the board, indexed by [row][column]'''
+    field_lines = [[[] for column in range(column_count)] for row in range(row_count)]
+    for line in get_winning_lines(row_count, column_count, connect_count):
+        for row, column in line:
+            field_lines[row][column].append(line)
+    return tuple(tuple(tuple(lines) for lines in row) for row in field_lines)
 
 
 class ConnectFourBase:
     '''Base class for implementing the full set of rules of a variation of a ConnectFour game'''
-    def __init__(self):
-        '''Initialize board size, game board and current player turns'''
+    rules = None
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, game board and current player turns, @connect_count coins in a line win.
+        The game is drawn after the @move_limit moves if it is given.'''
+        if not 2 <= connect_count <= max(row_count, column_count):
+            raise ValueError(f'Cannot connect {connect_count} coins on the {row_count}x{column_count} board')
         self.current_player = 1
         self.next_player = 2
-        self.row_count = 6
-        self.column_count = 7
+        self.row_count = row_count
+        self.column_count = column_count
+        self.connect_count = connect_count
+        self.move_limit = move_limit
+        self.field_count = row_count * column_count
+        # every move object is made once, legal_moves() only picks them
+        self.drop_moves = tuple((DROP, column) for column in range(column_count))
+        self.pop_moves = tuple((POP, column) for column in range(column_count))
+        self.winning_lines = get_winning_lines(row_count, column_count, connect_count)
+        self.field_lines = get_field_lines(row_count, column_count, connect_count)
+        self.zobrist_keys = get_zobrist_keys(self.row_count, self.column_count)
         self.board = self.get_new_board()
+        self.last_move = None
+
+    @property
+    def board(self):
+        '''The game board as a list of rows, row 0 being the bottom row'''
+        return self._board
+
+    @board.setter
+    def board(self, board):
+        '''Replaces the game board with the @board and recomputes the position state, the players
+        have to be set before, as the position the moves start from is the current player's to move'''
+        self._board = board
+        self.reset_position_state()
 
     def get_new_board(self):
-        '''Returns empty (filled with zeros) 6x7 game board'''
+        '''Returns empty (filled with zeros) game board of row_count x column_count fields'''
         return [[0 for i in range(self.column_count)] for i in range(self.row_count)]
 
+    def reset_position_state(self):
+        '''Recomputes everything derived from the board after it was replaced as a whole'''
+        self.reset_hash()
+        self.reset_heights()
+        # the moves made on the previous board cannot be taken back on the new one
+        self.history = []
+        # the keys of the positions reached by the moves and how many times every position was reached;
+        # only the pops can bring a position back, so the Classic games do not count them
+        self.position_keys = []
+        self.position_counts = {}
+        if self.rules == POPOUT:
+            # the position the moves start from counts once
+            self.position_counts[self.get_hash()] = 1
+
+    def reset_hash(self):
+        '''Computes the Zobrist hash of the board and of its mirror image from scratch'''
+        self.hash = 0
+        self.mirror_hash = 0
+        board = self.get_board()
+        for row in range(self.row_count):
+            for column in range(self.column_count):
+                self.toggle_field_hash(board[row][column], row, column)
+
+    def reset_heights(self):
+        '''Counts the coins of every column and of the whole board from scratch'''
+        board = self.get_board()
+        # the coins lie at the bottom of the columns, so the count is the row of the next drop
+        self.heights = [sum(1 for row in range(self.row_count) if board[row][column] != 0)
+                        for column in range(self.column_count)]
+        self.coin_count = sum(self.heights)
+
+    def toggle_field_hash(self, player, row, column):
+        '''Adds (or removes) the coin of the @player on @row and @column to (from) the hashes'''
+        keys = self.zobrist_keys[player][row]
+        self.hash ^= keys[column]
+        # the mirror image has the same coin in the column reflected around the center
+        self.mirror_hash ^= keys[self.column_count - 1 - column]
+
+    def get_hash(self):
+        '''Returns the 64-bit key of the position (the board and the player to move)'''
+        if self.current_player == 2:
+            return self.hash ^ get_side_key(self.row_count, self.column_count)
+        return self.hash
+
+    def get_position_key(self):
+        '''Returns the key of the position after the move, before the turns change (the next player to move)'''
+        if self.next_player == 2:
+            return self.hash ^ get_side_key(self.row_count, self.column_count)
+        return self.hash
+
+    def get_canonical_hash(self):
+        '''Returns the 64-bit key shared by the position and its left-right mirror image'''
+        canonical_hash = min(self.hash, self.mirror_hash)
+        if self.current_player == 2:
+            return canonical_hash ^ get_side_key(self.row_count, self.column_count)
+        return canonical_hash
+
     def get_board(self):
         '''Returns the current board'''
         return self.board
 
     def reset(self):
         '''Resets the game state'''
-        self.board = self.get_new_board()
         self.current_player = 1
+        self.next_player = 2
+        self.board = self.get_new_board()
+        self.last_move = None
 
     def is_board_full(self):
         '''Returns True if there is no more free space on the board, else False'''
-        return not any(0 in row for row in self.board)
+        return self.coin_count == self.field_count
 
     def change_turns(self):
         '''Makes the current player the next player'''
@@ -37,153 +160,210 @@ class ConnectFourBase:
 
     def drop_move(self, column):
         '''Drops the coin of the current player on the given @column'''
-        raise NotImplementedError('drop_move is not implemented')
+        if self.is_valid_drop(column):
+            row = self.heights[column]
+            self.board[row][column] = self.current_player
+            self.toggle_field_hash(self.current_player, row, column)
+            self.record_move(DROP, row, column)
+        else:
+            raise WrongMoveException(column)
 
     def is_valid_drop(self, column):
         '''Returns True if the drop on the given @column is possible, else False'''
-        raise NotImplementedError('is_valid_drop is not implemented')
+        return 0 <= column < self.column_count and self.heights[column] < self.row_count
 
     def is_winning(self, player):
         '''Returns True if the given @player wins the game, else False'''
-        raise NotImplementedError('is_winning is not implemented')
+        board = self.board
+        for line in self.winning_lines:
+            for row, column in line:
+                if board[row][column] != player:
+                    break
+            else:
+                return True
+        return False
 
+    def record_move(self, kind, row, column):
+        '''Remembers the move of the @kind on @row and @column, so that it can be taken back'''
+        self.history.append((kind, row, column, self.current_player, self.next_player, self.last_move))
+        self.last_move = (kind, row, column)
+        step = 1 if kind == DROP else -1
+        self.heights[column] += step
+        self.coin_count += step
+        if self.rules == POPOUT:
+            key = self.get_position_key()
+            self.position_keys.append(key)
+            self.position_counts[key] = self.position_counts.get(key, 0) + 1
 
-class ConnectFourClassic(ConnectFourBase):
-    '''Implements the classic version of the ConnectFour game'''
-    def __init__(self):
-        '''Initialize board size, game board and current player turns'''
-        super().__init__()
-
-    def drop_move(self, column):
-        '''Drops the coin of the current player on the given @column'''
-        if self.is_valid_drop(column):
-            for row in self.board:
-                if row[column] == 0:
-                    row[column] = self.current_player
-                    return
+    def undo(self):
+        '''Takes back the last move, restoring the board, the player turns and the last move'''
+        if not self.history:
+            raise IndexError('There is no move to undo')
+        kind, row, column, self.current_player, self.next_player, self.last_move = self.history.pop()
+        if self.rules == POPOUT:
+            key = self.position_keys.pop()
+            count = self.position_counts.pop(key) - 1
+            if count:
+                self.position_counts[key] = count
+        if kind == DROP:
+            self.undo_drop(row, column)
         else:
-            raise WrongMoveException(column)
+            self.undo_pop(column)
+        step = -1 if kind == DROP else 1
+        self.heights[column] += step
+        self.coin_count += step
 
-    def is_valid_drop(self, column):
-        '''Returns True if the drop on the given @column is possible, else False'''
-        if self.board[self.row_count - 1][column] != 0:
-            return False
-        else:
-            return True
+    def undo_drop(self, row, column):
+        '''Removes the coin dropped on @row and @column'''
+        self.toggle_field_hash(self.board[row][column], row, column)
+        self.board[row][column] = 0
 
-    def is_winning(self, player):
-        '''Returns True if the given @player wins the game, else False'''
-        # horizontal
-        for col in range(self.column_count - 3):
-            for row in range(self.row_count):
-                if (self.board[row][col] == player
-                        and self.board[row][col + 1] == player
-                        and self.board[row][col + 2] == player
-                        and self.board[row][col + 3] == player):
-                    return True
-
-        # vertical
-        for col in range(self.column_count):
-            for row in range(self.row_count - 3):
-                if (self.board[row][col] == player
-                        and self.board[row + 1][col] == player
-                        and self.board[row + 2][col] == player
-                        and self.board[row + 3][col] == player):
-                    return True
-
-        # positively sloped diagonals
-        for col in range(self.column_count - 3):
-            for row in range(self.row_count - 3):
-                if (self.board[row][col] == player
-                        and self.board[row + 1][col + 1] == player
-                        and self.board[row + 2][col + 2] == player
-                        and self.board[row + 3][col + 3] == player):
-                    return True
-
-        # negatively sloped diagonals
-        for col in range(self.column_count - 3):
-            for row in range(3, self.row_count):
-                if (self.board[row][col] == player
-                        and self.board[row - 1][col + 1] == player
-                        and self.board[row - 2][col + 2] == player
-                        and self.board[row - 3][col + 3] == player):
-                    return True
+    def undo_pop(self, column):
+        '''Shifts the @column one row up and puts back the popped coin of the current player'''
+        board = self.board
+        zobrist_keys = self.zobrist_keys
+        mirror_column = self.column_count - 1 - column
+        # only the coins move, the height is still the one after the pop
+        for row in range(self.heights[column], 0, -1):
+            player = board[row - 1][column]
+            keys = zobrist_keys[player]
+            self.hash ^= keys[row - 1][column] ^ keys[row][column]
+            self.mirror_hash ^= keys[row - 1][mirror_column] ^ keys[row][mirror_column]
+            board[row][column] = player
+        keys = zobrist_keys[self.current_player][0]
+        self.hash ^= keys[column]
+        self.mirror_hash ^= keys[mirror_column]
+        board[0][column] = self.current_player
 
+    def is_winning_move(self, row, column):
+        '''Returns True if the coin on @row and @column is a part of a winning line, else False'''
+        board = self.board
+        player = board[row][column]
+        if player == 0:
+            return False
+        for line in self.field_lines[row][column]:
+            for line_row, line_column in line:
+                if board[line_row][line_column] != player:
+                    break
+            else:
+                return True
         return False
 
+    def is_repetition(self):
+        '''Returns True if the last move reached the same position for the REPETITION_LIMIT-th time'''
+        return bool(self.position_keys) and self.position_counts[self.position_keys[-1]] >= REPETITION_LIMIT
 
-class ConnectFourPopOut(ConnectFourBase):
-    '''Implements the PopOut version of the ConnectFour game'''
-    def __init__(self):
-        '''Initialize board size, game board and current player turns'''
-        super().__init__()
+    def has_bottom_coin(self, player):
+        '''Returns True if the @player has a coin on the bottom row (so that it can pop), else False'''
+        return player in self.board[0]
 
-    def drop_move(self, column):
-        '''Drops the coin of the current player on the given @column'''
-        if self.is_valid_drop(column):
-            for row in self.board:
-                if row[column] == 0:
-                    row[column] = self.current_player
-                    return
-        else:
-            raise WrongMoveException(column)
+    def is_draw(self):
+        '''Returns True if the game is drawn after the last move which did not win, else False'''
+        if self.is_board_full():
+            # a full PopOut board goes on only if the next player can pop
+            if self.rules == CLASSIC or not self.has_bottom_coin(self.next_player):
+                return True
+        if self.move_limit is not None and len(self.history) >= self.move_limit:
+            return True
+        return self.is_repetition()
 
-    def is_valid_drop(self, column):
-        '''Returns True if the drop on the given @column is possible, else False'''
-        if self.board[self.row_count - 1][column] != 0:
+    def last_move_wins(self, player):
+        '''Returns True if the last move made a winning line for the given @player, else False'''
+        if self.last_move is None:
             return False
+        kind, row, column = self.last_move
+        if kind == DROP:
+            return self.board[row][column] == player and self.is_winning_move(row, column)
+        # a pop shifts the whole column, so only the lines crossing this column could have changed
+        return any(self.board[row][column] == player and self.is_winning_move(row, column)
+                   for row in range(self.row_count))
+
+    def legal_moves(self):
+        '''Returns the tuple of all the (kind, column) moves the current player can make'''
+        row_count = self.row_count
+        moves = tuple(move for move, height in zip(self.drop_moves, self.heights) if height < row_count)
+        if self.rules == POPOUT:
+            moves += tuple(move for move in self.pop_moves if self.is_valid_pop(move[1]))
+        return moves
+
+    def legal_move_mask(self):
+        '''Returns the legal moves as the bitmask: the bit column for the drop on the column and
+        the bit column_count + column for the pop from the column'''
+        mask = 0
+        for column, height in enumerate(self.heights):
+            if height < self.row_count:
+                mask |= 1 << column
+        if self.rules == POPOUT:
+            for column in range(self.column_count):
+                if self.is_valid_pop(column):
+                    mask |= 1 << (self.column_count + column)
+        return mask
+
+    def make_move(self, move):
+        '''Makes the (kind, column) @move of the current player'''
+        kind, column = move
+        if kind == DROP:
+            self.drop_move(column)
+        elif kind == POP and self.rules == POPOUT:
+            self.pop_move(column)
         else:
-            return True
+            raise WrongMoveException(column)
+
+    def get_game_state(self):
+        '''Returns the player who won with the last move, 0 if the game is drawn or None if it goes on
+
+        It is meant to be called after the move and before the turns change, the returned values are
+        the game states shown by the GameStateDialog'''
+        if self.last_move_wins(self.current_player):
+            return self.current_player
+        if self.last_move_wins(self.next_player):
+            return self.next_player
+        if self.is_draw():
+            return 0
+        return None
+
+
+class ConnectFourClassic(ConnectFourBase):
+    '''Implements the classic version of the ConnectFour game'''
+    rules = CLASSIC
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, game board and current player turns, @connect_count coins in a line win'''
+        super().__init__(row_count, column_count, connect_count, move_limit)
+
+
+class ConnectFourPopOut(ConnectFourBase):
+    '''Implements the PopOut version of the ConnectFour game'''
+    rules = POPOUT
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4, move_limit=None):
+        '''Initialize board size, game board and current player turns, @connect_count coins in a line win'''
+        super().__init__(row_count, column_count, connect_count, move_limit)
 
     def pop_move(self, column):
         '''Pops the coin of the current player from the given @column'''
         if self.is_valid_pop(column):
-            for i in range(self.row_count - 1):
-                self.board[i][column] = self.board[i + 1][column]
-            self.board[self.row_count - 1][column] = 0
+            board = self.board
+            zobrist_keys = self.zobrist_keys
+            mirror_column = self.column_count - 1 - column
+            keys = zobrist_keys[self.current_player][0]
+            hash_change = keys[column]
+            mirror_hash_change = keys[mirror_column]
+            # every coin of the column moves one row down, the empty fields above them stay as they are
+            height = self.heights[column]
+            for row in range(1, height):
+                player = board[row][column]
+                keys = zobrist_keys[player]
+                hash_change ^= keys[row][column] ^ keys[row - 1][column]
+                mirror_hash_change ^= keys[row][mirror_column] ^ keys[row - 1][mirror_column]
+                board[row - 1][column] = player
+            board[height - 1][column] = 0
+            self.hash ^= hash_change
+            self.mirror_hash ^= mirror_hash_change
+            self.record_move(POP, 0, column)
         else:
             raise WrongMoveException(column)
 
     def is_valid_pop(self, column):
         '''Returns True if the pop from the given @column is possible, else False'''
-        return self.board[0][column] == self.current_player
-
-    def is_winning(self, player):
-        '''Returns True if the given @player wins the game, else False'''
-        # horizontal
-        for col in range(self.column_count - 3):
-            for row in range(self.row_count):
-                if (self.board[row][col] == player
-                        and self.board[row][col + 1] == player
-                        and self.board[row][col + 2] == player
-                        and self.board[row][col + 3] == player):
-                    return True
-
-        # vertical
-        for col in range(self.column_count):
-            for row in range(self.row_count - 3):
-                if (self.board[row][col] == player
-                        and self.board[row + 1][col] == player
-                        and self.board[row + 2][col] == player
-                        and self.board[row + 3][col] == player):
-                    return True
-
-        # positively sloped diagonals
-        for col in range(self.column_count - 3):
-            for row in range(self.row_count - 3):
-                if (self.board[row][col] == player
-                        and self.board[row + 1][col + 1] == player
-                        and self.board[row + 2][col + 2] == player
-                        and self.board[row + 3][col + 3] == player):
-                    return True
-
-        # negatively sloped diagonals
-        for col in range(self.column_count - 3):
-            for row in range(3, self.row_count):
-                if (self.board[row][col] == player
-                        and self.board[row - 1][col + 1] == player
-                        and self.board[row - 2][col + 2] == player
-                        and self.board[row - 3][col + 3] == player):
-                    return True
-
-        return False
+        return 0 <= column < self.column_count and self.board[0][column] == self.current_player
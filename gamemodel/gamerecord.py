@@ -0,0 +1,203 @@
+# This Python file uses the following encoding: utf-8
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT, DROP, POP
+
+# The games file starts with a header: the magic, the format version, the board size and the
+# number of coins in a winning line.
+# Every game is then stored as:
+#   - 1 byte: bit 0 the rules (0 Classic, 1 PopOut), bits 1-2 the result (see RESULTS)
+#   - the number of moves as a varint (7 bits per byte, the high bit set if more bytes follow)
+#   - the moves packed into the smallest number of bytes, each move taking the pop flag bit
+#     and the bits needed for the column number (4 bits per move on the 7 columns board)
+# The index file (games file path + ".idx") holds the 8-byte offset of every game in the games file.
+MAGIC = b'C4GR'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sBBBB')
+OFFSET = struct.Struct('<Q')
+RULES = (CLASSIC, POPOUT)
+# the game states as returned by get_game_state(): drawn, won by a player or not finished
+RESULTS = (0, 1, 2, None)
+GAME_CLASSES = {CLASSIC: ConnectFourClassic, POPOUT: ConnectFourPopOut}
+
+GameRecord = namedtuple('GameRecord', ['rules', 'result', 'moves'])
+
+
+class GameRecordError(Exception):
+    '''Exception raised when the games file does not match the game record format'''
+
+
+def get_record(game):
+    '''Returns the GameRecord of the moves made in the @game so far'''
+    moves = tuple((kind, column) for kind, row, column, *_ in game.history)
+    result = game.get_game_state() if moves else None
+    return GameRecord(game.rules, result, moves)
+
+
+def replay(record, game_class=None, row_count=6, column_count=7, connect_count=4):
+    '''Yields the game after every move of the @record, the game is the same object every time.
+
+    The game is of the @game_class, by default the one of the rules of the @record.'''
+    game = (game_class or GAME_CLASSES[record.rules])(row_count, column_count, connect_count)
+    for move in record.moves:
+        game.make_move(move)
+        if game.get_game_state() is None:
+            game.change_turns()
+        yield game
+
+
+class GameRecordFile:
+    '''Base class for the readers and the writers of the games file of the given board size'''
+    def read_header(self, file):
+        '''Reads the board size from the header of the games @file'''
+        data = file.read(FILE_HEADER.size)
+        if len(data) != FILE_HEADER.size:
+            raise GameRecordError('The games file is too short')
+        magic, version, self.row_count, self.column_count, self.connect_count = FILE_HEADER.unpack(data)
+        if magic != MAGIC or version != VERSION:
+            raise GameRecordError('The file is not a games file of a known version')
+        self.set_move_bits()
+
+    def set_move_bits(self):
+        '''Computes the number of bits of a single move for the board size'''
+        self.column_bits = max(1, (self.column_count - 1).bit_length())
+        self.move_bits = self.column_bits + 1
+
+    def encode(self, record):
+        '''Returns the bytes of the @record'''
+        if record.rules not in RULES or record.result not in RESULTS:
+            raise GameRecordError(f'Cannot store the game of the {record.rules} rules and {record.result} result')
+        data = bytearray([RULES.index(record.rules) | RESULTS.index(record.result) << 1])
+        count = len(record.moves)
+        while True:
+            byte, count = count & 0x7f, count >> 7
+            data.append(byte | (0x80 if count else 0))
+            if not count:
+                break
+        packed = 0
+        for index, (kind, column) in enumerate(record.moves):
+            code = column | (1 << self.column_bits if kind == POP else 0)
+            packed |= code << (index * self.move_bits)
+        data += packed.to_bytes((len(record.moves) * self.move_bits + 7) // 8, 'little')
+        return bytes(data)
+
+    def decode(self, data, offset):
+        '''Returns the record stored in the @data at the @offset and the offset of the next record'''
+        header = data[offset]
+        offset += 1
+        count = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            count |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        size = (count * self.move_bits + 7) // 8
+        packed = int.from_bytes(data[offset:offset + size], 'little')
+        column_mask = (1 << self.column_bits) - 1
+        moves = []
+        for _ in range(count):
+            moves.append((POP if packed >> self.column_bits & 1 else DROP, packed & column_mask))
+            packed >>= self.move_bits
+        return GameRecord(RULES[header & 1], RESULTS[header >> 1 & 3], tuple(moves)), offset + size
+
+
+class GameRecordWriter(GameRecordFile):
+    '''Appends the game records to the games file and its index'''
+    def __init__(self, path, row_count=6, column_count=7, connect_count=4):
+        '''Opens the games file on the @path for appending, creating it for the given board size'''
+        self.path = path
+        geometry = (row_count, column_count, connect_count)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as file:
+                self.read_header(file)
+            if (self.row_count, self.column_count, self.connect_count) != geometry:
+                raise GameRecordError('The games file holds the games of another board size')
+            self.file = open(path, 'ab')
+        else:
+            self.row_count, self.column_count, self.connect_count = geometry
+            self.set_move_bits()
+            self.file = open(path, 'wb')
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, *geometry))
+        self.index = open(path + '.idx', 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, record):
+        '''Appends the @record to the games file'''
+        self.index.write(OFFSET.pack(self.file.tell()))
+        self.file.write(self.encode(record))
+
+    def write_game(self, game):
+        '''Appends the record of the moves made in the @game'''
+        self.write(get_record(game))
+
+    def close(self):
+        '''Flushes and closes the games file and its index'''
+        self.file.close()
+        self.index.close()
+
+
+class GameRecordReader(GameRecordFile):
+    '''Reads the games file: streams all the records or gets a single one through the index'''
+    def __init__(self, path):
+        '''Opens the games file on the @path and maps its index into memory'''
+        self.path = path
+        self.file = open(path, 'rb')
+        self.read_header(self.file)
+        self.data = self.map(self.file)
+        self.index_file = open(path + '.idx', 'rb')
+        self.index = self.map(self.index_file)
+
+    def map(self, file):
+        '''Returns the read-only memory map of the whole @file (empty bytes for an empty file)'''
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        '''Returns the number of the games in the file'''
+        return len(self.index) // OFFSET.size
+
+    def __getitem__(self, number):
+        '''Returns the record of the game with the given @number, reading only this game'''
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError('There is no game with this number')
+        offset, = OFFSET.unpack_from(self.index, number * OFFSET.size)
+        return self.decode(self.data, offset)[0]
+
+    def __iter__(self):
+        '''Yields all the records of the file in order, without using the index'''
+        offset = FILE_HEADER.size
+        while offset < len(self.data):
+            record, offset = self.decode(self.data, offset)
+            yield record
+
+    def replay_all(self, game_class=None):
+        '''Yields the game after every move of every record of the file'''
+        for record in self:
+            yield from replay(record, game_class, self.row_count, self.column_count, self.connect_count)
+
+    def close(self):
+        '''Closes the memory maps and the files'''
+        for data in (self.data, self.index):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self.file.close()
+        self.index_file.close()
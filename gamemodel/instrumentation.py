@@ -0,0 +1,175 @@
+# This Python file uses the following encoding: utf-8
+
+import cProfile
+import io
+import pstats
+import sys
+import time
+from gamemodel.connectfour import ConnectFourBase
+
+# the hot paths of the game model timed by attach_game_model()
+GAME_METHODS = ('drop_move', 'pop_move', 'is_winning', 'is_board_full')
+# the calls counted as the moves for the summaries and the profiling windows
+MOVE_METHODS = ('drop_move', 'pop_move')
+
+
+class LatencyHistogram:
+    '''Histogram of the call latencies in the power of two buckets of nanoseconds.
+
+    The bucket n counts the calls taking from 2 ** (n - 1) to 2 ** n - 1 nanoseconds, so the
+    percentiles are exact within a factor of two at the cost of a single list update per call.'''
+    def __init__(self):
+        '''Initialize the empty histogram'''
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, nanoseconds):
+        '''Counts the call taking @nanoseconds'''
+        self.buckets[nanoseconds.bit_length()] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def get_percentile(self, percentile):
+        '''Returns the upper bound in nanoseconds of the bucket holding the @percentile (0-100) of the calls'''
+        if not self.count:
+            return 0
+        rank = percentile / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) - 1, self.max)
+        return self.max
+
+    def get_stats(self):
+        '''Returns the dictionary of the calls count and the latencies in microseconds'''
+        return {'calls': self.count, 'total_ms': self.total / 1e6,
+                'mean_us': self.total / self.count / 1e3 if self.count else 0.0,
+                'p50_us': self.get_percentile(50) / 1e3, 'p99_us': self.get_percentile(99) / 1e3,
+                'max_us': self.max / 1e3}
+
+
+class Instrumentation:
+    '''Times the chosen methods of the classes by replacing them with the timing wrappers.
+
+    Nothing is measured and nothing costs anything until the methods are attached; detach()
+    puts the original methods back. Every @summary_interval moves the summary is written to the
+    @output. profile_moves() runs cProfile for a window of the next moves. The process pool
+    workers do not share the instrumentation, the games have to be played in this process.'''
+    def __init__(self, summary_interval=None, output=sys.stderr):
+        '''Initialize the empty histograms, writing the summary to the @output every @summary_interval moves'''
+        self.summary_interval = summary_interval
+        self.output = output
+        self.histograms = {}
+        self.originals = []
+        self.moves = 0
+        self.profiler = None
+        self.profile_end = None
+        self.profile_path = None
+        self.profile_stats = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+    def attach(self, cls, method_names, move_methods=MOVE_METHODS):
+        '''Replaces the @method_names defined by the @cls itself with the timing wrappers,
+        the calls of the @move_methods count as the moves'''
+        for name in method_names:
+            if name in cls.__dict__:
+                method = cls.__dict__[name]
+                self.originals.append((cls, name, method))
+                setattr(cls, name, self.get_timed(f'{cls.__name__}.{name}', method, name in move_methods))
+
+    def attach_game_model(self, method_names=GAME_METHODS):
+        '''Times the @method_names of ConnectFourBase and of all its subclasses'''
+        # the bitboard classes are subclasses only once imported
+        import gamemodel.bitboard
+        classes = [ConnectFourBase]
+        for cls in classes:
+            classes.extend(cls.__subclasses__())
+        for cls in classes:
+            self.attach(cls, method_names)
+
+    def detach(self):
+        '''Puts back all the original methods and stops the profiling window'''
+        while self.originals:
+            cls, name, method = self.originals.pop()
+            setattr(cls, name, method)
+        if self.profiler is not None:
+            self.stop_profile()
+
+    def get_timed(self, name, method, is_move):
+        '''Returns the wrapper of the @method adding the latency of every call to the @name histogram'''
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                histogram.add(perf_counter_ns() - start)
+            if is_move:
+                self.count_move()
+            return result
+        timed.__name__ = method.__name__
+        timed.__doc__ = method.__doc__
+        timed.__wrapped__ = method
+        return timed
+
+    def record(self, name, nanoseconds):
+        '''Adds the call of @nanoseconds to the @name histogram, for the code timing itself'''
+        self.histograms.setdefault(name, LatencyHistogram()).add(nanoseconds)
+
+    def count_move(self):
+        '''Counts the move, writing the summary and ending the profiling window when it is their time'''
+        self.moves += 1
+        if self.summary_interval and self.moves % self.summary_interval == 0:
+            self.output.write(self.format_summary())
+            self.output.flush()
+        if self.profile_end is not None and self.moves >= self.profile_end:
+            self.stop_profile()
+
+    def profile_moves(self, count, path=None):
+        '''Profiles everything run in this thread during the next @count moves with cProfile.
+        The pstats.Stats are kept in profile_stats and dumped to the @path if it is given.'''
+        if self.profiler is not None:
+            raise RuntimeError('The profiling window is already open')
+        self.profile_end = self.moves + count
+        self.profile_path = path
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop_profile(self):
+        '''Closes the profiling window early or when its moves are made'''
+        self.profiler.disable()
+        self.profile_stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        if self.profile_path is not None:
+            self.profile_stats.dump_stats(self.profile_path)
+        self.profiler = None
+        self.profile_end = None
+
+    def get_summary(self):
+        '''Returns the {method name: stats} of the methods called so far'''
+        return {name: histogram.get_stats() for name, histogram in self.histograms.items() if histogram.count}
+
+    def format_summary(self):
+        '''Returns the summary table as text'''
+        lines = [f'{"method":<36}{"calls":>10}{"total ms":>11}{"mean us":>10}{"p50 us":>10}{"p99 us":>10}{"max us":>10}']
+        for name, stats in sorted(self.get_summary().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f'{name:<36}{stats["calls"]:>10}{stats["total_ms"]:>11.2f}{stats["mean_us"]:>10.2f}'
+                         f'{stats["p50_us"]:>10.2f}{stats["p99_us"]:>10.2f}{stats["max_us"]:>10.2f}')
+        return f'after {self.moves} moves:\n' + '\n'.join(lines) + '\n'
+
+    def reset(self):
+        '''Clears the histograms and the moves count, the attached methods stay timed'''
+        for histogram in self.histograms.values():
+            histogram.__init__()
+        self.moves = 0
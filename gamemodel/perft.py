@@ -0,0 +1,196 @@
+# This Python file uses the following encoding: utf-8
+#python -m gamemodel.perft --rules Classic --depth 8 --workers 4 --check
+#python -m gamemodel.perft --rules PopOut --depth 5 --implementation bitboard --moves 3,3,p3
+
+import argparse
+import copy
+import json
+import sys
+import time
+from collections import namedtuple
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT, DROP, POP
+from gamemodel.position import Position
+
+IMPLEMENTATIONS = {
+    'list': {CLASSIC: ConnectFourClassic, POPOUT: ConnectFourPopOut},
+    'bitboard': {CLASSIC: ConnectFourBitboardClassic, POPOUT: ConnectFourBitboardPopOut},
+}
+# The counts from the empty standard board made with the list-of-lists games, one (nodes, wins,
+# draws) triple for every depth from 1: the move sequences of that length not ended before and
+# how many of them end with a win or a draw on their last move. The PopOut draws of the depth 8 are
+# the 7 * 7 drop, drop, pop, pop cycles played twice, back on the empty board for the third time.
+REFERENCE_COUNTS = {
+    CLASSIC: ((7, 0, 0), (49, 0, 0), (343, 0, 0), (2401, 0, 0), (16807, 0, 0), (117649, 0, 0),
+              (823536, 13032, 0), (5673234, 44430, 0)),
+    POPOUT: ((7, 0, 0), (49, 0, 0), (392, 0, 0), (3087, 0, 0), (26320, 0, 0), (220626, 0, 0),
+             (1965614, 21714, 0), (17029874, 153438, 2401)),
+}
+
+PerftCounts = namedtuple('PerftCounts', ['nodes', 'wins', 'draws'])
+
+
+class Perft:
+    '''Counts the move sequences of the given length from a position, with the wins and the draws
+    on their last move, walking the whole move tree with the game model.
+
+    The counts of the subtrees are cached by the Zobrist hash of the position and the remaining
+    depth, so the transpositions are counted once. Only the Classic subtrees are cached, in PopOut
+    the positions seen before decide the repetition draws. At most @cache_size subtrees are kept.'''
+    def __init__(self, cache_size=1 << 20):
+        '''Initialize the empty cache of @cache_size subtree counts (0 turns the cache off)'''
+        self.cache_size = cache_size
+        self.cache = {}
+        self.hits = 0
+
+    def count(self, game, depth):
+        '''Returns the PerftCounts of the @depth moves long sequences from the position of the @game'''
+        cached = self.cache_size and game.rules == CLASSIC and game.move_limit is None
+        return PerftCounts(*self.count_moves(game, depth, cached))
+
+    def count_moves(self, game, depth, cached):
+        '''Returns the (nodes, wins, draws) of the position of the @game, the moves are taken back'''
+        if cached:
+            key = (game.get_hash(), depth)
+            counts = self.cache.get(key)
+            if counts is not None:
+                self.hits += 1
+                return counts
+        nodes = wins = draws = 0
+        for move in game.legal_moves():
+            game.make_move(move)
+            game_state = game.get_game_state()
+            if depth == 1:
+                nodes += 1
+                if game_state == 0:
+                    draws += 1
+                elif game_state is not None:
+                    wins += 1
+            elif game_state is None:
+                game.change_turns()
+                subtree = self.count_moves(game, depth - 1, cached)
+                nodes += subtree[0]
+                wins += subtree[1]
+                draws += subtree[2]
+            game.undo()
+        counts = (nodes, wins, draws)
+        if cached and len(self.cache) < self.cache_size:
+            self.cache[key] = counts
+        return counts
+
+
+def parse_moves(text):
+    '''Returns the list of the (kind, column) moves of the comma separated @text, e.g. "3,3,p2" (pN pops)'''
+    moves = []
+    for item in filter(None, text.split(',')):
+        if item.startswith('p'):
+            moves.append((POP, int(item[1:])))
+        else:
+            moves.append((DROP, int(item)))
+    return moves
+
+
+def get_game(rules, implementation='list', geometry=(6, 7, 4), moves=()):
+    '''Returns the game of the @implementation after the @moves from the empty board'''
+    game = IMPLEMENTATIONS[implementation][rules](*geometry)
+    for move in moves:
+        game.make_move(move)
+        if game.get_game_state() is not None:
+            raise ValueError('The game ends before the position to count from')
+        game.change_turns()
+    return game
+
+
+def get_root(game):
+    '''Returns the (Position code, moves) of the position the moves of the @game start from and of
+    the moves made since, the repetition draws depend on the positions those moves went through'''
+    start = copy.deepcopy(game)
+    while start.history:
+        start.undo()
+    return int(Position.from_game(start)), [(kind, column) for kind, row, column, *_ in game.history]
+
+
+def count_root_move(task):
+    '''Returns the (nodes, wins, draws, cache hits) of the @task: a root move and the depth below it.
+    The worker replays the moves to the root from their start position, so it has the same history.'''
+    game = Position(task['position']).to_game(IMPLEMENTATIONS[task['implementation']][task['rules']],
+                                              *task['geometry'])
+    for move in task['moves']:
+        game.make_move(move)
+        game.change_turns()
+    game.make_move(task['move'])
+    game_state = game.get_game_state()
+    if task['depth'] == 1:
+        return (1, int(game_state not in (None, 0)), int(game_state == 0), 0)
+    if game_state is not None:
+        return (0, 0, 0, 0)
+    game.change_turns()
+    perft = Perft(task['cache_size'])
+    return tuple(perft.count(game, task['depth'] - 1)) + (perft.hits,)
+
+
+def run_perft(game, depth, workers=1, cache_size=1 << 20, implementation='list'):
+    '''Counts the @depth moves from the position of the @game, splitting the root moves across the
+    @workers processes (each with its own cache). Returns the summary dictionary.'''
+    start = time.perf_counter()
+    if workers > 1 and depth > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        position, moves = get_root(game)
+        tasks = [{'position': position, 'moves': moves, 'implementation': implementation,
+                  'rules': game.rules, 'move': move, 'depth': depth, 'cache_size': cache_size,
+                  'geometry': (game.row_count, game.column_count, game.connect_count)}
+                 for move in game.legal_moves()]
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(count_root_move, tasks))
+        nodes, wins, draws, hits = (sum(values) for values in zip(*results))
+    else:
+        perft = Perft(cache_size)
+        (nodes, wins, draws), hits = perft.count(game, depth), perft.hits
+    elapsed = time.perf_counter() - start
+    return {'rules': game.rules, 'depth': depth, 'nodes': nodes, 'wins': wins, 'draws': draws,
+            'cache_hits': hits, 'seconds': round(elapsed, 3),
+            'nodes_per_second': nodes / elapsed if elapsed > 0 else 0.0}
+
+
+def check_reference(summary):
+    '''Returns True if the counts of the @summary from the empty standard board match the REFERENCE_COUNTS,
+    None if there is no reference count for its depth'''
+    references = REFERENCE_COUNTS[summary['rules']]
+    if summary['depth'] > len(references):
+        return None
+    return references[summary['depth'] - 1] == (summary['nodes'], summary['wins'], summary['draws'])
+
+
+def main(argv=None):
+    '''Runs the perft described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m gamemodel.perft',
+                                     description='Counts the move sequences, wins and draws to the given depth.')
+    parser.add_argument('--rules', choices=sorted(REFERENCE_COUNTS), default=CLASSIC)
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--implementation', choices=sorted(IMPLEMENTATIONS), default='list')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--cache-size', type=int, default=1 << 20, help='subtree counts kept (0 turns the cache off)')
+    parser.add_argument('--moves', default='', help='moves to the position to count from, e.g. 3,3,p3 (pN pops)')
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4, help='number of coins in a winning line')
+    parser.add_argument('--check', action='store_true',
+                        help='compare the counts with the reference counts of the empty standard board')
+    args = parser.parse_args(argv)
+    geometry = (args.rows, args.columns, args.connect)
+    moves = parse_moves(args.moves)
+    game = get_game(args.rules, args.implementation, geometry, moves)
+    summary = run_perft(game, args.depth, args.workers, args.cache_size, args.implementation)
+    print(json.dumps(summary, indent=2))
+    if args.check:
+        if moves or geometry != (6, 7, 4):
+            parser.error('the reference counts are those of the empty standard board')
+        matches = check_reference(summary)
+        print('reference: ' + {True: 'match', False: 'MISMATCH', None: 'none for this depth'}[matches],
+              file=sys.stderr)
+        return 1 if matches is False else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# This Python file uses the following encoding: utf-8
+
+from array import array
+from functools import lru_cache
+from gamemodel.bitboard import ConnectFourBitboardBase
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT
+
+GAME_CLASSES = {CLASSIC: ConnectFourClassic, POPOUT: ConnectFourPopOut}
+# the two lowest bits hold the player to move and the rules, the board lies above them
+SIDE_BIT = 1
+POPOUT_BIT = 2
+BOARD_SHIFT = 2
+
+
+@lru_cache(maxsize=None)
+def get_column_layout(row_count, column_count):
+    '''Returns the (column height in bits, bit mask of one column, bits of the bottom row) of the board size'''
+    column_height = row_count + 1
+    bottom = sum(1 << (column * column_height) for column in range(column_count))
+    return column_height, (1 << column_height) - 1, bottom
+
+
+class Position(int):
+    '''Immutable position packed into a single integer: the board, the player to move and the rules.
+
+    Every column of the board takes row_count + 1 bits, the coins of the player 1 lie below the
+    marker bit set on the lowest empty row of the column (the same layout as in the bitboard
+    games, so the standard board takes 49 bits). The board size is not stored, like in the game
+    records it is given when the position is converted back. Being an int, the position is
+    hashable and ordered, a single object takes 48 bytes on the standard board; PositionArray
+    keeps many of them in 8 bytes each.'''
+    __slots__ = ()
+
+    @classmethod
+    def from_game(cls, game):
+        '''Returns the position of the @game'''
+        column_height, _, bottom = get_column_layout(game.row_count, game.column_count)
+        if isinstance(game, ConnectFourBitboardBase):
+            # adding the bottom row to the occupied bits carries every column into its marker bit
+            first, second = game.bitboards[1], game.bitboards[2]
+            code = first + (first | second) + bottom
+        else:
+            board = game.get_board()
+            code = 0
+            for column, height in enumerate(game.heights):
+                column_code = 1 << height
+                for row in range(height):
+                    if board[row][column] == 1:
+                        column_code |= 1 << row
+                code |= column_code << (column * column_height)
+        code = code << BOARD_SHIFT
+        if game.current_player == 2:
+            code |= SIDE_BIT
+        if game.rules == POPOUT:
+            code |= POPOUT_BIT
+        return cls(code)
+
+    @property
+    def current_player(self):
+        '''The player to move'''
+        return 2 if self & SIDE_BIT else 1
+
+    @property
+    def rules(self):
+        '''The rules of the game of the position'''
+        return POPOUT if self & POPOUT_BIT else CLASSIC
+
+    def get_heights(self, row_count=6, column_count=7):
+        '''Returns the list of the numbers of the coins in every column'''
+        column_height, column_mask, _ = get_column_layout(row_count, column_count)
+        code = self >> BOARD_SHIFT
+        return [((code >> (column * column_height)) & column_mask).bit_length() - 1
+                for column in range(column_count)]
+
+    def get_board(self, row_count=6, column_count=7):
+        '''Returns the board of the position as a list of lists, row 0 being the bottom row'''
+        column_height, column_mask, _ = get_column_layout(row_count, column_count)
+        code = self >> BOARD_SHIFT
+        board = [[0] * column_count for _ in range(row_count)]
+        for column in range(column_count):
+            column_code = (code >> (column * column_height)) & column_mask
+            for row in range(column_code.bit_length() - 1):
+                board[row][column] = 1 if column_code >> row & 1 else 2
+        return board
+
+    def to_game(self, game_class=None, row_count=6, column_count=7, connect_count=4):
+        '''Returns a new game of the @game_class (by default the one of the rules) in this position'''
+        game = (game_class or GAME_CLASSES[self.rules])(row_count, column_count, connect_count)
+        if self.current_player == 2:
+            game.change_turns()
+        game.board = self.get_board(row_count, column_count)
+        return game
+
+    def __repr__(self):
+        return f'Position({int(self):#x})'
+
+
+class PositionArray:
+    '''Sequence of positions stored as unsigned 64-bit integers, for the boards taking at most 62 bits
+    (e.g. 7 columns of 7 rows). The Position objects are made only when they are read.'''
+    __slots__ = ('codes',)
+
+    def __init__(self, positions=()):
+        '''Initialize the array holding the @positions'''
+        self.codes = array('Q', positions)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        '''Returns the Position with the given @index'''
+        return Position(self.codes[index])
+
+    def __iter__(self):
+        return map(Position, self.codes)
+
+    def append(self, position):
+        '''Adds the @position at the end of the array'''
+        self.codes.append(position)
+
+    def get_size(self):
+        '''Returns the number of bytes taken by the positions'''
+        return self.codes.itemsize * len(self.codes)
@@ -0,0 +1,5 @@
+# This Python file uses the following encoding: utf-8
+
+# only the negamax solver of the computer player is imported with the package, the MCTS player,
+# the opening book and the analysis are imported from their modules where they are needed
+from gamemodel.solver.negamax import Solver, SearchResult, best_move
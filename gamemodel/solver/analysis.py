@@ -0,0 +1,179 @@
+# This Python file uses the following encoding: utf-8
+
+from collections import OrderedDict
+from gamemodel.bitboard import ConnectFourBitboardPopOut
+from gamemodel.connectfour import CLASSIC, DROP
+from gamemodel.position import Position
+from gamemodel.solver.negamax import Solver, get_bitboard_game, popcount, WIN_SCORE, INFINITY
+
+
+class AnalysisCache:
+    '''Least recently used cache of the analyses, holding at most max_size positions.
+
+    Reading an entry makes it the most recently used one, storing a new entry in the full cache
+    evicts the least recently used one. The hits, misses and evictions are counted.'''
+    def __init__(self, max_size=4096):
+        '''Initialize the empty cache for @max_size entries'''
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        '''Returns the number of the cached entries'''
+        return len(self.entries)
+
+    def get(self, key):
+        '''Returns the entry stored for the @key or None if there is none'''
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        '''Stores the @entry for the @key, evicting the least recently used entries over the max_size'''
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        '''Removes all the entries, the statistics are kept'''
+        self.entries.clear()
+
+    def get_stats(self):
+        '''Returns the dictionary of the hits, misses and evictions of the cache and its fill'''
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self.entries), 'max_size': self.max_size,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+class Analyzer:
+    '''Scores every legal move of the current player, e.g. for the hints or the review of the games.
+
+    The scores are those of the Solver, seen by the player to move: above SOLVED_SCORE the move
+    wins (the sooner the higher), below -SOLVED_SCORE it loses, else the heuristic value. The Classic
+    drops are searched by the Solver @depth moves ahead. The PopOut moves are searched by a plain
+    alpha-beta on the game model @popout_depth moves ahead, the repetition draws not being
+    foreseen. The analyses are cached by the position, so asking again (e.g. after an undo)
+    costs only a dictionary lookup.'''
+    def __init__(self, solver=None, depth=8, popout_depth=4, cache_size=4096):
+        '''Initialize the analysis with the @solver (a new one by default) and the cache of @cache_size positions'''
+        self.solver = solver or Solver(table_size=1 << 18)
+        self.depth = depth
+        self.popout_depth = popout_depth
+        self.cache = AnalysisCache(cache_size)
+
+    def analyze(self, game):
+        '''Returns the {(kind, column): score} of all the legal moves of the current player of the @game,
+        an empty dictionary if the game is over'''
+        # the turns have already changed, so the end of the game is told by the board and the moves
+        # of the side to move rather than by get_game_state()
+        if game.is_winning(1) or game.is_winning(2) or game.is_repetition() or not game.legal_moves():
+            return {}
+        key = (Position.from_game(game), game.row_count, game.column_count, game.connect_count)
+        scores = self.cache.get(key)
+        if scores is None:
+            if game.rules == CLASSIC:
+                scores = self.analyze_drops(game)
+            else:
+                scores = self.analyze_moves(game)
+            self.cache.put(key, scores)
+        return dict(scores)
+
+    def analyze_drops(self, game):
+        '''Returns the scores of the drops of the Classic @game searched by the solver'''
+        solver = self.solver
+        game = get_bitboard_game(game)
+        solver.set_geometry(game.row_count, game.column_count, game.connect_count)
+        current = game.bitboards[game.current_player]
+        mask = game.bitboards[1] | game.bitboards[2]
+        moves = popcount(mask)
+        possible = solver.threats.get_possible_moves(mask)
+        wins = solver.threats.get_immediate_wins(current, mask)
+        # the drops letting the opponent win at once are not searched
+        non_losing = solver.threats.get_non_losing_moves(current, mask, possible)
+        solver.nodes = 0
+        scores = {}
+        for column in range(game.column_count):
+            move = possible & solver.column_masks[column]
+            if not move:
+                continue
+            if wins & move:
+                scores[(DROP, column)] = WIN_SCORE - moves - 1
+            elif not non_losing & move:
+                scores[(DROP, column)] = -(WIN_SCORE - moves - 2)
+            else:
+                scores[(DROP, column)] = -solver.negamax(current ^ mask, mask | move, moves + 1,
+                                                         self.depth - 1, -INFINITY, INFINITY)
+        return scores
+
+    def analyze_moves(self, game):
+        '''Returns the scores of the drops and the pops of the PopOut @game'''
+        game = self.get_search_game(game)
+        self.solver.set_geometry(game.row_count, game.column_count, game.connect_count)
+        scores = {}
+        for move in game.legal_moves():
+            scores[move] = self.score_move(game, move, self.popout_depth, -INFINITY, INFINITY)
+        return scores
+
+    def get_search_game(self, game):
+        '''Returns the bitboard PopOut game in the position of the @game, without its move history'''
+        search_game = ConnectFourBitboardPopOut(game.row_count, game.column_count, game.connect_count)
+        search_game.current_player = game.current_player
+        search_game.next_player = game.next_player
+        search_game.board = game.get_board()
+        return search_game
+
+    def score_move(self, game, move, depth, alpha, beta):
+        '''Returns the score of the @move for the current player of the @game, searching @depth moves ahead'''
+        player = game.current_player
+        game.make_move(move)
+        game_state = game.get_game_state()
+        if game_state is None:
+            game.change_turns()
+            score = -self.search_moves(game, depth - 1, -beta, -alpha)
+        elif game_state == 0:
+            score = 0
+        else:
+            # a pop may complete the opponent's line, then the opponent wins
+            # the search game starts without history, so the sooner win scores higher
+            score = WIN_SCORE - len(game.history)
+            if game_state != player:
+                score = -score
+        game.undo()
+        return score
+
+    def search_moves(self, game, depth, alpha, beta):
+        '''Returns the score of the PopOut @game for the current player, searching @depth moves ahead'''
+        if depth == 0:
+            current = game.bitboards[game.current_player]
+            return self.solver.evaluate(current, game.bitboards[1] | game.bitboards[2])
+        moves = game.legal_moves()
+        if not moves:
+            return 0
+        best_score = -INFINITY
+        for move in moves:
+            score = self.score_move(game, move, depth, alpha, beta)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def get_stats(self):
+        '''Returns the statistics of the analysis cache'''
+        return self.cache.get_stats()
+
+
+def analyze(game, depth=8):
+    '''Returns the {(kind, column): score} of all the legal moves of the current player of the @game'''
+    return Analyzer(depth=depth).analyze(game)
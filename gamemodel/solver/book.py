@@ -0,0 +1,171 @@
+# This Python file uses the following encoding: utf-8
+#python -m gamemodel.solver.book --ply 6 --depth 10 --workers 4 --output book.c4ob
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from gamemodel.bitboard import ConnectFourBitboardClassic
+from gamemodel.connectfour import CLASSIC, DROP
+from gamemodel.solver.negamax import Solver
+
+# The book file starts with a header: the magic, the format version, the board size, the number of
+# coins in a winning line and the ply the positions were enumerated up to. The entries follow,
+# sorted by the key, each one holding the canonical position hash, the score, the best column
+# (of the canonical orientation of the position) and the depth of the search that found them.
+MAGIC = b'C4OB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBB')
+ENTRY = struct.Struct('<QhbB')
+
+BookEntry = namedtuple('BookEntry', ['score', 'column', 'depth'])
+
+
+def is_mirrored(game):
+    '''Returns True if the canonical hash of the @game is the one of its mirror image'''
+    return game.mirror_hash < game.hash
+
+
+class OpeningBook:
+    '''Table of the searched positions, read through mmap and binary search'''
+    # the book is built from the Classic positions only
+    rules = CLASSIC
+
+    def __init__(self, path):
+        '''Opens the book file on the @path and maps it into memory'''
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.row_count, self.column_count, self.connect_count, self.ply = \
+            HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('The file is not an opening book of a known version')
+        self.size = (len(self.data) - HEADER.size) // ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        '''Returns the number of the positions in the book'''
+        return self.size
+
+    def find(self, key):
+        '''Returns the (score, column, depth) entry of the canonical @key or None if it is not there'''
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, score, column, depth = ENTRY.unpack_from(self.data, HEADER.size + middle * ENTRY.size)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                return BookEntry(score, column, depth)
+        return None
+
+    def is_for(self, game):
+        '''Returns True if the book holds the positions of the rules and the board size of the @game, else False'''
+        return game.rules == self.rules and (game.row_count, game.column_count, game.connect_count) == \
+            (self.row_count, self.column_count, self.connect_count)
+
+    def lookup(self, game):
+        '''Returns the BookEntry of the current position of the @game or None if it is not in the book'''
+        if not self.is_for(game):
+            return None
+        entry = self.find(game.get_canonical_hash())
+        if entry is not None and is_mirrored(game):
+            entry = entry._replace(column=self.column_count - 1 - entry.column)
+        return entry
+
+    def close(self):
+        '''Closes the memory map and the file'''
+        self.data.close()
+        self.file.close()
+
+
+def enumerate_positions(ply):
+    '''Returns the move sequences of all the Classic positions up to the @ply moves, one for every
+    canonical position (the mirror images are skipped) where the game has not ended yet'''
+    game = ConnectFourBitboardClassic()
+    seen = set()
+    positions = []
+
+    def visit(moves):
+        key = game.get_canonical_hash()
+        if key in seen:
+            return
+        seen.add(key)
+        positions.append(tuple(moves))
+        if len(moves) == ply:
+            return
+        for move in game.legal_moves():
+            game.make_move(move)
+            if game.get_game_state() is None:
+                game.change_turns()
+                moves.append(move[1])
+                visit(moves)
+                moves.pop()
+            game.undo()
+
+    visit([])
+    return positions
+
+
+def solve_positions(positions, depth):
+    '''Returns the (key, score, column, depth) entries of the positions given by their drops'''
+    solver = Solver(table_size=1 << 18)
+    entries = []
+    for moves in positions:
+        game = ConnectFourBitboardClassic()
+        for column in moves:
+            game.make_move((DROP, column))
+            game.change_turns()
+        result = solver.search(game, depth=depth)
+        column = result.column
+        if is_mirrored(game):
+            column = game.column_count - 1 - column
+        entries.append((game.get_canonical_hash(), result.score, column, result.depth))
+    return entries
+
+
+def build_book(path, ply, depth, workers=1, chunk_size=64):
+    '''Writes the book of all the positions up to the @ply moves searched @depth moves ahead,
+    spreading the searches across @workers processes. Returns the number of the positions.'''
+    positions = enumerate_positions(ply)
+    chunks = [positions[i:i + chunk_size] for i in range(0, len(positions), chunk_size)]
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(solve_positions, chunks, [depth] * len(chunks)))
+    else:
+        results = [solve_positions(chunk, depth) for chunk in chunks]
+    entries = sorted(entry for result in results for entry in result)
+    game = ConnectFourBitboardClassic()
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, game.row_count, game.column_count, game.connect_count, ply))
+        for entry in entries:
+            file.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+def main(argv=None):
+    '''Builds the book described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m gamemodel.solver.book',
+                                     description='Builds the opening book of the Classic positions.')
+    parser.add_argument('--ply', type=int, default=4, help='book all the positions up to this many moves')
+    parser.add_argument('--depth', type=int, default=8, help='search depth of every position')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = build_book(args.output, args.ply, args.depth, args.workers)
+    print(f'{count} positions written in {time.perf_counter() - start:.1f} s', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# This Python file uses the following encoding: utf-8
+
+import copy
+import math
+import random
+import time
+from collections import namedtuple
+
+MCTSResult = namedtuple('MCTSResult', ['move', 'visits', 'win_rate', 'iterations', 'rollouts',
+                                       'elapsed', 'rollouts_per_second'])
+
+
+def get_rollout_state(game):
+    '''Returns the picklable state of the @game from which a rollout can be played'''
+    geometry = (game.row_count, game.column_count, game.connect_count)
+    return (type(game), geometry, [list(row) for row in game.get_board()], game.current_player, game.next_player)
+
+
+def rollout(state, seed, max_moves):
+    '''Plays random moves from the @state until the game ends, returns the winner or 0 for a draw.
+
+    The game is counted as drawn after @max_moves moves, PopOut games could cycle forever.'''
+    game_class, geometry, board, current_player, next_player = state
+    game = game_class(*geometry)
+    game.current_player, game.next_player = current_player, next_player
+    game.board = board
+    rng = random.Random(seed)
+    for _ in range(max_moves):
+        moves = game.legal_moves()
+        if not moves:
+            return 0
+        game.make_move(rng.choice(moves))
+        game_state = game.get_game_state()
+        if game_state is not None:
+            return game_state
+        game.change_turns()
+    return 0
+
+
+def rollout_batch(states, seeds, max_moves):
+    '''Plays the rollouts of all the @states in one call, so a worker process gets them together'''
+    return [rollout(state, seed, max_moves) for state, seed in zip(states, seeds)]
+
+
+class Node:
+    '''Node of the search tree, the position after the @move of the @player'''
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried_moves', 'visits', 'wins',
+                 'game_state', 'hash')
+
+    def __init__(self, move, player, parent, game, game_state):
+        '''Initialize the node reached by the @move of the @player in the @game'''
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried_moves = list(game.legal_moves()) if game_state is None else []
+        self.visits = 0
+        self.wins = 0.0
+        self.game_state = game_state
+        self.hash = game.get_hash()
+
+    def select_child(self, exploration):
+        '''Returns the child with the highest UCT value'''
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def get_reward(self, winner):
+        '''Returns the reward of the @winner's game for the player who made the move of this node'''
+        if winner == 0:
+            return 0.5
+        return 1.0 if winner == self.player else 0.0
+
+
+class MCTSPlayer:
+    '''Chooses the moves with the Monte Carlo Tree Search using the UCT selection.
+
+    The tree is kept between the moves, so the statistics of the position reached after the
+    opponent's reply are reused. The rollouts are spread across a process pool of @workers
+    processes: the tree selects a batch of leaves (counting the pending rollouts as lost visits,
+    so the batch spreads over different leaves) and the pool plays their rollouts at once.'''
+    def __init__(self, iterations=None, time_budget=None, workers=1, exploration=math.sqrt(2),
+                 batch_size=None, max_rollout_moves=200, seed=None):
+        '''Initialize the search bounded by the @iterations count or the @time_budget in seconds'''
+        if iterations is None and time_budget is None:
+            iterations = 1000
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.exploration = exploration
+        self.batch_size = batch_size or max(1, 8 * workers)
+        self.max_rollout_moves = max_rollout_moves
+        self.rng = random.Random(seed)
+        self.executor = None
+        self.root = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''Shuts down the worker processes'''
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def get_executor(self):
+        '''Returns the process pool, started on the first use'''
+        if self.executor is None and self.workers > 1:
+            # multiprocessing is imported only here, the single process players start faster
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(self.workers)
+        return self.executor
+
+    def find_root(self, game):
+        '''Returns the node of the current position of the @game, reusing the previous tree if it is there'''
+        key = game.get_hash()
+        if self.root is not None:
+            candidates = [self.root] + self.root.children
+            candidates += [grandchild for child in self.root.children for grandchild in child.children]
+            for node in candidates:
+                if node.hash == key and node.game_state is None:
+                    node.parent = None
+                    return node
+        return Node(None, game.next_player, None, game, None)
+
+    def select_leaf(self, game, root):
+        '''Walks the @game down to a leaf (expanding it), returns the leaf node.
+
+        Every visited node gets its visit counted at once, the result is added by backpropagate().'''
+        node = root
+        node.visits += 1
+        while not node.untried_moves and node.children:
+            node = node.select_child(self.exploration)
+            game.make_move(node.move)
+            if node.game_state is None:
+                game.change_turns()
+            node.visits += 1
+        if node.untried_moves:
+            move = node.untried_moves.pop(self.rng.randrange(len(node.untried_moves)))
+            player = game.current_player
+            game.make_move(move)
+            game_state = game.get_game_state()
+            if game_state is None:
+                game.change_turns()
+            child = Node(move, player, node, game, game_state)
+            node.children.append(child)
+            node = child
+            node.visits += 1
+        return node
+
+    def backpropagate(self, node, winner):
+        '''Adds the result of the @winner's game to the @node and all its ancestors'''
+        while node is not None:
+            node.wins += node.get_reward(winner)
+            node = node.parent
+
+    def play_rollouts(self, states):
+        '''Returns the winners of the rollouts from the @states, played in the pool if there is one'''
+        seeds = [self.rng.getrandbits(32) for _ in states]
+        executor = self.get_executor()
+        if executor is None:
+            return rollout_batch(states, seeds, self.max_rollout_moves)
+        chunk = max(1, math.ceil(len(states) / self.workers))
+        futures = [executor.submit(rollout_batch, states[i:i + chunk], seeds[i:i + chunk],
+                                   self.max_rollout_moves)
+                   for i in range(0, len(states), chunk)]
+        return [winner for future in futures for winner in future.result()]
+
+    def search(self, game):
+        '''Returns the MCTSResult of the search for the best move of the current player of the @game'''
+        game = copy.deepcopy(game)
+        root = self.find_root(game)
+        self.root = root
+        start = time.perf_counter()
+        deadline = None if self.time_budget is None else start + self.time_budget
+        iterations = rollouts = 0
+        while self.iterations is None or iterations < self.iterations:
+            if deadline is not None and iterations > 0 and time.perf_counter() > deadline:
+                break
+            batch_size = self.batch_size
+            if self.iterations is not None:
+                batch_size = min(batch_size, self.iterations - iterations)
+            leaves, states = [], []
+            for _ in range(batch_size):
+                depth = len(game.history)
+                leaf = self.select_leaf(game, root)
+                if leaf.game_state is not None:
+                    self.backpropagate(leaf, leaf.game_state)
+                else:
+                    leaves.append(leaf)
+                    states.append(get_rollout_state(game))
+                while len(game.history) > depth:
+                    game.undo()
+            for leaf, winner in zip(leaves, self.play_rollouts(states)):
+                self.backpropagate(leaf, winner)
+            iterations += batch_size
+            rollouts += len(states)
+            if not root.untried_moves and not root.children:
+                break
+
+        elapsed = time.perf_counter() - start
+        if not root.children:
+            return MCTSResult(None, 0, 0.0, iterations, rollouts, elapsed, 0.0)
+        best = max(root.children, key=lambda child: child.visits)
+        return MCTSResult(best.move, best.visits, best.wins / best.visits, iterations, rollouts,
+                          elapsed, rollouts / elapsed if elapsed > 0 else 0.0)
+
+    def choose_move(self, game):
+        '''Returns the best (kind, column) move for the current player of the @game'''
+        return self.search(game).move
@@ -0,0 +1,227 @@
+# This Python file uses the following encoding: utf-8
+
+import time
+from collections import namedtuple
+from gamemodel.bitboard import ConnectFourBitboardBase, ConnectFourBitboardClassic
+from gamemodel.connectfour import CLASSIC
+from gamemodel.threats import get_threat_board
+from gamemodel.solver.transpositiontable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# scores above SOLVED_SCORE (in absolute value) are proven wins or losses, the faster the better
+WIN_SCORE = 10000
+SOLVED_SCORE = WIN_SCORE - 1000
+INFINITY = WIN_SCORE + 1
+
+SearchResult = namedtuple('SearchResult', ['column', 'score', 'depth', 'nodes', 'elapsed',
+                                           'nodes_per_second'])
+
+
+class SearchTimeout(Exception):
+    '''Exception raised inside the search when the time budget runs out'''
+
+
+def popcount(bits):
+    '''Returns the number of set bits of the @bits'''
+    return bin(bits).count('1')
+
+
+def get_bitboard_game(game):
+    '''Returns the bitboard version of the Classic @game (the @game itself if it already uses bitboards),
+    raises ValueError for the other rules, the search knows only the drops'''
+    if game.rules != CLASSIC:
+        raise ValueError(f'The solver plays only the Classic rules, not {game.rules}')
+    if isinstance(game, ConnectFourBitboardBase):
+        return game
+    bitboard_game = ConnectFourBitboardClassic(game.row_count, game.column_count, game.connect_count)
+    bitboard_game.current_player = game.current_player
+    bitboard_game.next_player = game.next_player
+    bitboard_game.board = game.get_board()
+    return bitboard_game
+
+
+class Solver:
+    '''Searches for the best drop in the ConnectFourClassic positions with alpha-beta negamax.
+
+    The search works on the bitboards of the side to move (current) and of all the coins (mask),
+    the same layout as in ConnectFourBitboardBase. It deepens iteratively, so it can be bounded
+    either by the @depth or by the @time_budget (in seconds) and still return the best drop found.
+    The positions found in the opening @book are not searched at all.'''
+    def __init__(self, table_size=1 << 20, book=None):
+        '''Initialize the transposition table with @table_size slots and the optional OpeningBook'''
+        self.table = TranspositionTable(table_size)
+        self.book = book
+        self.geometry = None
+        self.nodes = 0
+        self.deadline = None
+        self.stop = None
+
+    def set_geometry(self, row_count, column_count, connect_count=4):
+        '''Prepares the bit masks for the board with @row_count rows and @column_count columns
+        where @connect_count coins in a line win'''
+        if self.geometry == (row_count, column_count, connect_count):
+            return
+        self.geometry = (row_count, column_count, connect_count)
+        self.table.clear()
+        self.row_count = row_count
+        self.column_count = column_count
+        # the winning cells, the possible and the non-losing drops come from the threat analysis
+        self.threats = get_threat_board(row_count, column_count, connect_count)
+        self.column_masks = self.threats.column_masks
+        # the columns closer to the center take part in more lines, so they are searched first
+        center = (column_count - 1) / 2
+        self.column_order = sorted(range(column_count), key=lambda column: abs(column - center))
+
+    def evaluate(self, current, mask):
+        '''Returns the heuristic score of the unsolved position: the difference of the winning cells'''
+        opponent = current ^ mask
+        return popcount(self.threats.get_winning_cells(current, mask)) - \
+            popcount(self.threats.get_winning_cells(opponent, mask))
+
+    def order_moves(self, current, mask, moves, first_column):
+        '''Returns the columns of the @moves, the @first_column and then the most threatening first'''
+        get_winning_cells = self.threats.get_winning_cells
+        scored = []
+        for column in self.column_order:
+            move = moves & self.column_masks[column]
+            if move:
+                if column == first_column:
+                    threats = INFINITY
+                else:
+                    threats = popcount(get_winning_cells(current | move, mask | move))
+                scored.append((threats, column))
+        # the sort is stable, so the center first order is kept between equally threatening moves
+        scored.sort(key=lambda item: -item[0])
+        return [column for _, column in scored]
+
+    def negamax(self, current, mask, moves, depth, alpha, beta):
+        '''Returns the score of the position for the side to move, searching @depth moves ahead'''
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self.is_interrupted():
+            raise SearchTimeout()
+
+        threats = self.threats
+        possible = threats.get_possible_moves(mask)
+        if not possible:
+            return 0
+        if threats.get_winning_cells(current, mask) & possible:
+            return WIN_SCORE - moves - 1
+        if depth == 0:
+            return self.evaluate(current, mask)
+
+        # the opponent wins after any other drop, whether it has two immediate wins or not
+        possible = threats.get_non_losing_moves(current, mask, possible)
+        if not possible:
+            return -(WIN_SCORE - moves - 2)
+
+        key = current + mask
+        original_alpha = alpha
+        first_column = None
+        entry = self.table.get(key)
+        if entry is not None:
+            entry_depth, flag, score, first_column = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return score
+                elif flag == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        best_score, best_column = -INFINITY, None
+        for column in self.order_moves(current, mask, possible, first_column):
+            move = possible & self.column_masks[column]
+            score = -self.negamax(current ^ mask, mask | move, moves + 1, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score, best_column = score, column
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table.put(key, depth, flag, best_score, best_column)
+        return best_score
+
+    def search_root(self, current, mask, moves, depth, first_column):
+        '''Returns the (score, column) of the best drop found searching @depth moves ahead'''
+        possible = self.threats.get_possible_moves(mask)
+        wins = self.threats.get_immediate_wins(current, mask)
+        alpha, best_column = -INFINITY, None
+        for column in self.order_moves(current, mask, possible, first_column):
+            move = possible & self.column_masks[column]
+            if wins & move:
+                return WIN_SCORE - moves - 1, column
+            score = -self.negamax(current ^ mask, mask | move, moves + 1, depth - 1, -INFINITY, -alpha)
+            if score > alpha or best_column is None:
+                alpha, best_column = score, column
+        return alpha, best_column
+
+    def is_interrupted(self):
+        '''Returns True if the search has to stop: the time budget ran out or the stop event is set'''
+        if self.stop is not None and self.stop.is_set():
+            return True
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def search(self, game, depth=None, time_budget=None, on_progress=None, stop=None):
+        '''Returns the SearchResult of the search for the best drop of the current player of the @game.
+
+        The search stops after @depth moves (by default when the game is solved) or when the
+        @time_budget (in seconds) runs out. The book entry of the position is used if it was
+        searched at least @depth moves deep or, without the @depth, if it solved the position.
+        @on_progress is called with the SearchResult of every finished iteration. Setting the
+        @stop event (e.g. threading.Event) from another thread cancels the search, even in its
+        first iteration; the best drop found so far is returned (None if there is none).'''
+        start = time.perf_counter()
+        bitboard_game = get_bitboard_game(game)
+        if self.book is not None and self.book.is_for(game):
+            entry = self.book.lookup(game)
+            # a deeper search than the one stored in the book is still made, the solved score is final
+            if entry is not None and (abs(entry.score) > SOLVED_SCORE or
+                                      depth is not None and entry.depth >= depth):
+                return SearchResult(entry.column, entry.score, entry.depth, 0,
+                                    time.perf_counter() - start, 0.0)
+        game = bitboard_game
+        self.set_geometry(game.row_count, game.column_count, game.connect_count)
+        current = game.bitboards[game.current_player]
+        mask = game.bitboards[1] | game.bitboards[2]
+        moves = popcount(mask)
+        max_depth = self.row_count * self.column_count - moves
+        depth = max_depth if depth is None else min(depth, max_depth)
+
+        self.nodes = 0
+        self.stop = stop
+        result = SearchResult(None, 0, 0, 0, 0.0, 0.0)
+        for current_depth in range(1, depth + 1):
+            # the first iteration always finishes, so there is a move to return
+            if time_budget is not None and current_depth > 1:
+                self.deadline = start + time_budget
+            try:
+                score, column = self.search_root(current, mask, moves, current_depth, result.column)
+            except SearchTimeout:
+                break
+            elapsed = time.perf_counter() - start
+            result = SearchResult(column, score, current_depth, self.nodes, elapsed,
+                                  self.nodes / elapsed if elapsed > 0 else 0.0)
+            if on_progress is not None:
+                on_progress(result)
+            if abs(score) > SOLVED_SCORE:
+                break
+        self.deadline = None
+        self.stop = None
+        return result
+
+    def best_move(self, game, depth=None, time_budget=None):
+        '''Returns the best column to drop the coin for the current player of the @game'''
+        return self.search(game, depth, time_budget).column
+
+
+def best_move(game, depth=None, time_budget=None):
+    '''Returns the best column to drop the coin for the current player of the @game'''
+    return Solver().best_move(game, depth, time_budget)
@@ -0,0 +1,35 @@
+# This Python file uses the following encoding: utf-8
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    '''Fixed size table remembering the search results of the already visited positions'''
+    def __init__(self, size=1 << 20):
+        '''Initialize the table with @size slots, a new entry always replaces the one in its slot'''
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        '''Removes all the entries from the table'''
+        self.keys = [None] * self.size
+        self.entries = [None] * self.size
+
+    def get(self, key):
+        '''Returns the (depth, flag, score, column) entry stored for the @key or None if there is none'''
+        index = key % self.size
+        if self.keys[index] == key:
+            return self.entries[index]
+        return None
+
+    def put(self, key, depth, flag, score, column):
+        '''Stores the @depth, @flag, @score and the best @column found for the @key'''
+        index = key % self.size
+        self.keys[index] = key
+        self.entries[index] = (depth, flag, score, column)
+
+    def __len__(self):
+        '''Returns the number of occupied slots'''
+        return self.size - self.keys.count(None)
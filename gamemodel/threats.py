@@ -0,0 +1,146 @@
+# This Python file uses the following encoding: utf-8
+
+from collections import namedtuple
+from functools import lru_cache
+from gamemodel.bitboard import ConnectFourBitboardBase
+
+# The threats of a position, the masks use the bit layout of the bitboard games and the moves are columns:
+#   winning_cells     {player: the empty cells completing a line of the player}
+#   immediate_wins    the drops winning at once for the player to move
+#   forced_moves      the drops blocking an immediate win of the opponent
+#   non_losing_moves  the drops after which the opponent cannot win at once
+#   is_lost           True if the player to move cannot win at once and every drop loses at once
+#   odd_threats       {player: the winning cells on the odd rows, 1st, 3rd, ... from the bottom}
+#   even_threats      {player: the winning cells on the even rows}
+ThreatReport = namedtuple('ThreatReport', ['winning_cells', 'immediate_wins', 'forced_moves', 'non_losing_moves',
+                                           'is_lost', 'odd_threats', 'even_threats'])
+
+
+class ThreatBoard:
+    '''Finds the threats on the bitboards of the board size with a fixed number of bit operations.
+
+    The positions are given as the coins of the player to move (current) and all the coins (mask),
+    in the layout of ConnectFourBitboardBase. Only the drops are considered, in PopOut a pop can
+    also make or break a line.'''
+    def __init__(self, row_count=6, column_count=7, connect_count=4):
+        '''Prepares the bit masks for the board with @row_count rows and @column_count columns
+        where @connect_count coins in a line win'''
+        self.row_count = row_count
+        self.column_count = column_count
+        self.connect_count = connect_count
+        self.column_height = row_count + 1
+        # the shifts bringing the other coins of a line onto its empty cell, one tuple for every
+        # position of the empty cell in the line of every direction (positive shifts go left)
+        self.line_shifts = [tuple((gap - offset) * shift for offset in range(connect_count) if offset != gap)
+                            for shift in (1, self.column_height, self.column_height - 1, self.column_height + 1)
+                            for gap in range(connect_count)]
+        self.bottom_mask = sum(1 << (column * self.column_height) for column in range(column_count))
+        self.board_mask = self.bottom_mask * ((1 << row_count) - 1)
+        self.column_masks = [((1 << row_count) - 1) << (column * self.column_height)
+                             for column in range(column_count)]
+        self.odd_rows_mask = sum(self.bottom_mask << row for row in range(0, row_count, 2))
+        self.even_rows_mask = self.board_mask ^ self.odd_rows_mask
+
+    def get_winning_cells(self, current, mask):
+        '''Returns the bitmask of the empty cells that would complete a line of the @current coins'''
+        if self.connect_count != 4:
+            return self.get_line_cells(current, mask)
+        height = self.column_height
+        # vertical
+        cells = (current << 1) & (current << 2) & (current << 3)
+        # horizontal and both diagonals
+        for shift in (height, height - 1, height + 1):
+            pairs = (current << shift) & (current << 2 * shift)
+            cells |= pairs & (current << 3 * shift)
+            cells |= pairs & (current >> shift)
+            pairs = (current >> shift) & (current >> 2 * shift)
+            cells |= pairs & (current << shift)
+            cells |= pairs & (current >> 3 * shift)
+        return cells & (self.board_mask ^ mask)
+
+    def get_line_cells(self, current, mask):
+        '''Returns the same cells as get_winning_cells() for the lines of any length, a bit slower'''
+        cells = 0
+        for shifts in self.line_shifts:
+            line = ~0
+            for shift in shifts:
+                line &= current << shift if shift > 0 else current >> -shift
+            cells |= line
+        return cells & (self.board_mask ^ mask)
+
+    def get_possible_moves(self, mask):
+        '''Returns the bitmask of the cells where a coin can be dropped'''
+        return (mask + self.bottom_mask) & self.board_mask
+
+    def get_immediate_wins(self, current, mask):
+        '''Returns the bitmask of the drops completing a line of the @current coins'''
+        return self.get_winning_cells(current, mask) & self.get_possible_moves(mask)
+
+    def get_forced_moves(self, current, mask):
+        '''Returns the bitmask of the drops blocking the opponent's immediate wins, more than one
+        of them means the position is lost unless the @current player wins first'''
+        return self.get_winning_cells(current ^ mask, mask) & self.get_possible_moves(mask)
+
+    def get_non_losing_moves(self, current, mask, possible=None):
+        '''Returns the bitmask of the drops (out of the @possible ones if they are already known)
+        after which the opponent cannot win at once, assuming the @current player has no immediate win'''
+        if possible is None:
+            possible = self.get_possible_moves(mask)
+        opponent_wins = self.get_winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            # two immediate wins of the opponent cannot both be blocked
+            if forced & (forced - 1):
+                return 0
+            possible = forced
+        # playing right below the opponent's winning cell lets the opponent win there
+        return possible & ~(opponent_wins >> 1)
+
+    def get_odd_threats(self, player_coins, mask):
+        '''Returns the winning cells of the @player_coins on the odd rows (the 1st, the 3rd, ... from the bottom)'''
+        return self.get_winning_cells(player_coins, mask) & self.odd_rows_mask
+
+    def get_even_threats(self, player_coins, mask):
+        '''Returns the winning cells of the @player_coins on the even rows'''
+        return self.get_winning_cells(player_coins, mask) & self.even_rows_mask
+
+    def get_columns(self, moves):
+        '''Returns the list of the columns of the @moves bitmask'''
+        return [column for column in range(self.column_count) if moves & self.column_masks[column]]
+
+
+@lru_cache(maxsize=None)
+def get_threat_board(row_count=6, column_count=7, connect_count=4):
+    '''Returns the ThreatBoard of the board size, shared by all its users'''
+    return ThreatBoard(row_count, column_count, connect_count)
+
+
+def get_bitboards(game):
+    '''Returns the (current, mask) bitboards of the @game: the coins of the player to move and all the coins'''
+    if isinstance(game, ConnectFourBitboardBase):
+        coins = game.bitboards
+    else:
+        coins = [0, 0, 0]
+        column_height = game.row_count + 1
+        for row, fields in enumerate(game.get_board()):
+            for column, player in enumerate(fields):
+                coins[player] |= 1 << (column * column_height + row)
+    return coins[game.current_player], coins[1] | coins[2]
+
+
+def analyze_threats(game):
+    '''Returns the ThreatReport of the position of the @game'''
+    threats = get_threat_board(game.row_count, game.column_count, game.connect_count)
+    current, mask = get_bitboards(game)
+    opponent = current ^ mask
+    players = {game.current_player: current, game.next_player: opponent}
+    immediate_wins = threats.get_immediate_wins(current, mask)
+    non_losing_moves = threats.get_non_losing_moves(current, mask)
+    return ThreatReport(
+        winning_cells={player: threats.get_winning_cells(coins, mask) for player, coins in players.items()},
+        immediate_wins=threats.get_columns(immediate_wins),
+        forced_moves=threats.get_columns(threats.get_forced_moves(current, mask)),
+        non_losing_moves=threats.get_columns(non_losing_moves),
+        is_lost=not immediate_wins and not non_losing_moves and bool(threats.get_possible_moves(mask)),
+        odd_threats={player: threats.get_odd_threats(coins, mask) for player, coins in players.items()},
+        even_threats={player: threats.get_even_threats(coins, mask) for player, coins in players.items()})
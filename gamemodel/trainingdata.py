@@ -0,0 +1,271 @@
+# This Python file uses the following encoding: utf-8
+#python -m gamemodel.trainingdata shards --self-play mcts:200 greedy --games 1000 --workers 4
+#python -m gamemodel.trainingdata shards --records games.c4gr --workers 4
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+import numpy as np
+from gamemodel.arena import get_tasks, play_game
+from gamemodel.connectfour import CLASSIC, DROP
+from gamemodel.gamerecord import GameRecord, GameRecordReader, GAME_CLASSES
+
+# Every sample is the position before a move, seen by the player to move:
+#   boards    int8 (2, rows, columns)  the coins of the player to move, then those of the opponent
+#   players   int8                     the player to move (1 or 2)
+#   legal     bool (2 * columns)       the legal drops on every column, then the legal pops
+#   outcomes  int8                     1 if the player to move won the game, -1 if lost, 0 for a draw
+#   moves     int16                    the index of the chosen move in the legal mask
+# The unfinished games have no outcome, so they give no samples.
+FIELDS = ('boards', 'players', 'legal', 'outcomes', 'moves')
+
+
+class SampleBuffer:
+    '''Preallocated arrays of the samples of the board size, filled one sample after another'''
+    def __init__(self, size, row_count=6, column_count=7):
+        '''Initialize the empty arrays for @size samples'''
+        self.size = size
+        self.count = 0
+        self.boards = np.zeros((size, 2, row_count, column_count), dtype=np.int8)
+        self.players = np.zeros(size, dtype=np.int8)
+        self.legal = np.zeros((size, 2 * column_count), dtype=bool)
+        self.outcomes = np.zeros(size, dtype=np.int8)
+        self.moves = np.zeros(size, dtype=np.int16)
+
+    def is_full(self):
+        '''Returns True if there is no room for another sample, else False'''
+        return self.count == self.size
+
+    def add(self, board, player, legal, outcome, move):
+        '''Appends the sample of the @board (numpy array of the players' numbers) before the move of the @player'''
+        index = self.count
+        self.boards[index, 0] = board == player
+        self.boards[index, 1] = board == 3 - player
+        self.players[index] = player
+        self.legal[index] = legal
+        self.outcomes[index] = outcome
+        self.moves[index] = move
+        self.count += 1
+
+    def extend(self, arrays, start=0):
+        '''Copies the samples of the @arrays from the @start index until this buffer is full,
+        returns the index of the first sample left out'''
+        stop = min(len(arrays['moves']), start + self.size - self.count)
+        for field in FIELDS:
+            getattr(self, field)[self.count:self.count + stop - start] = arrays[field][start:stop]
+        self.count += stop - start
+        return stop
+
+    def get_arrays(self):
+        '''Returns the {field: array} of the samples added so far'''
+        return {field: getattr(self, field)[:self.count] for field in FIELDS}
+
+
+def get_legal_mask(game):
+    '''Returns the legal moves of the @game as the boolean array, the drops first and then the pops'''
+    mask = game.legal_move_mask()
+    return np.array([mask >> bit & 1 for bit in range(2 * game.column_count)], dtype=bool)
+
+
+def get_move_index(move, column_count):
+    '''Returns the index of the (kind, column) @move in the legal mask'''
+    kind, column = move
+    return column if kind == DROP else column_count + column
+
+
+def get_outcome(result, player):
+    '''Returns the outcome of the game @result (0 for a draw, else the winner) for the @player'''
+    if result == 0:
+        return 0
+    return 1 if result == player else -1
+
+
+def mirror_sample(board, legal, move, column_count):
+    '''Returns the left-right mirror image of the @board (numpy array of the rows), the @legal mask and the @move index'''
+    legal = np.concatenate((legal[column_count - 1::-1], legal[:column_count - 1:-1]))
+    if move < column_count:
+        move = column_count - 1 - move
+    else:
+        move = 3 * column_count - 1 - move
+    return board[:, ::-1], legal, move
+
+
+def get_samples(records, row_count=6, column_count=7, connect_count=4, mirror=True):
+    '''Returns the {field: array} of the samples of all the moves of the finished @records,
+    together with the left-right mirror image of every sample if @mirror is set'''
+    records = [record for record in records if record.result is not None]
+    copies = 2 if mirror else 1
+    samples = SampleBuffer(copies * sum(len(record.moves) for record in records), row_count, column_count)
+    for record in records:
+        game = GAME_CLASSES[record.rules](row_count, column_count, connect_count)
+        for move in record.moves:
+            player = game.current_player
+            board = np.array(game.get_board(), dtype=np.int8)
+            legal = get_legal_mask(game)
+            outcome = get_outcome(record.result, player)
+            index = get_move_index(move, column_count)
+            samples.add(board, player, legal, outcome, index)
+            if mirror:
+                mirrored_board, mirrored_legal, mirrored_index = mirror_sample(board, legal, index, column_count)
+                samples.add(mirrored_board, player, mirrored_legal, outcome, mirrored_index)
+            game.make_move(move)
+            if game.get_game_state() is None:
+                game.change_turns()
+    return samples.get_arrays()
+
+
+def get_self_play_record(task):
+    '''Plays the arena game of the @task, returns its GameRecord'''
+    result = play_game(task)
+    winner = 0
+    if result['winner'] is not None:
+        winner = 1 if result['winner'] == result['first'] else 2
+    return GameRecord(result['rules'], winner, tuple(tuple(move) for move in result['moves']))
+
+
+def get_self_play_samples(tasks, mirror=True):
+    '''Returns the {field: array} of the samples of the arena games of the @tasks'''
+    geometry = tasks[0].get('geometry', (6, 7, 4)) if tasks else (6, 7, 4)
+    return get_samples([get_self_play_record(task) for task in tasks], *geometry, mirror=mirror)
+
+
+def get_record_file_samples(path, start, stop, mirror=True):
+    '''Returns the {field: array} of the samples of the games from @start to @stop of the games file on the @path'''
+    with GameRecordReader(path) as reader:
+        records = [reader[number] for number in range(start, min(stop, len(reader)))]
+        geometry = (reader.row_count, reader.column_count, reader.connect_count)
+    return get_samples(records, *geometry, mirror=mirror)
+
+
+class ShardWriter:
+    '''Writes the samples into the .npz files of shard_size samples each (the last one may be smaller),
+    named <prefix>-00000.npz, <prefix>-00001.npz, ... in the output directory'''
+    def __init__(self, directory, shard_size=65536, row_count=6, column_count=7, prefix='samples', compress=False):
+        '''Initialize the writer of the shards into the @directory, creating it if needed'''
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.save = np.savez_compressed if compress else np.savez
+        self.buffer = SampleBuffer(shard_size, row_count, column_count)
+        self.paths = []
+        self.sample_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, arrays):
+        '''Adds the samples of the {field: array} @arrays, writing every shard as soon as it is full'''
+        start = 0
+        while start < len(arrays['moves']):
+            start = self.buffer.extend(arrays, start)
+            if self.buffer.is_full():
+                self.flush()
+
+    def flush(self):
+        '''Writes the samples of the buffer into the next shard file'''
+        if self.buffer.count == 0:
+            return
+        path = os.path.join(self.directory, f'{self.prefix}-{len(self.paths):05d}.npz')
+        self.save(path, **self.buffer.get_arrays())
+        self.paths.append(path)
+        self.sample_count += self.buffer.count
+        self.buffer.count = 0
+
+    def close(self):
+        '''Writes the last, incomplete shard'''
+        self.flush()
+
+
+def run_jobs(function, jobs, writer, workers=1):
+    '''Calls the @function with the arguments of every job and writes the samples it returns with the @writer.
+
+    With more @workers the jobs run in the process pool, at most two jobs per worker are submitted
+    ahead so the samples waiting to be written stay bounded whatever the number of the jobs.'''
+    if workers <= 1:
+        for args in jobs:
+            writer.write(function(*args))
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for args in jobs:
+            if len(pending) >= 2 * workers:
+                writer.write(pending.popleft().result())
+            pending.append(executor.submit(function, *args))
+        while pending:
+            writer.write(pending.popleft().result())
+
+
+def export_self_play(directory, agents, games, rules=CLASSIC, workers=1, max_moves=200, seed=0,
+                     geometry=(6, 7, 4), shard_size=65536, games_per_job=16, mirror=True, compress=False):
+    '''Plays @games arena games between the pair of @agents specs and writes their samples
+    into the shards in the @directory. Returns the summary dictionary.'''
+    if agents[0] == agents[1]:
+        agents = (agents[0], agents[1] + '#2')
+    tasks = get_tasks(agents, games, rules, max_moves, seed, geometry)
+    jobs = ((tasks[start:start + games_per_job], mirror) for start in range(0, games, games_per_job))
+    return export(get_self_play_samples, jobs, directory, games, workers, geometry, shard_size, compress)
+
+
+def export_records(directory, path, workers=1, shard_size=65536, games_per_job=256, mirror=True, compress=False):
+    '''Replays the games of the games file on the @path and writes their samples
+    into the shards in the @directory. Returns the summary dictionary.'''
+    with GameRecordReader(path) as reader:
+        games = len(reader)
+        geometry = (reader.row_count, reader.column_count, reader.connect_count)
+    jobs = ((path, start, start + games_per_job, mirror) for start in range(0, games, games_per_job))
+    return export(get_record_file_samples, jobs, directory, games, workers, geometry, shard_size, compress)
+
+
+def export(function, jobs, directory, games, workers, geometry, shard_size, compress):
+    '''Runs the @jobs of the @function writing the samples into the shards, returns the summary dictionary'''
+    start = time.perf_counter()
+    with ShardWriter(directory, shard_size, geometry[0], geometry[1], compress=compress) as writer:
+        run_jobs(function, jobs, writer, workers)
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'samples': writer.sample_count, 'shards': writer.paths,
+            'seconds': round(elapsed, 3),
+            'samples_per_second': writer.sample_count / elapsed if elapsed > 0 else 0.0}
+
+
+def main(argv=None):
+    '''Exports the training samples described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m gamemodel.trainingdata',
+                                     description='Writes the positions of the played games with their labels into the .npz shards.')
+    parser.add_argument('output', help='directory of the shard files')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--self-play', nargs=2, metavar=('FIRST', 'SECOND'),
+                        help='play the games between two arena agents, e.g. mcts:200 greedy')
+    source.add_argument('--records', help='replay the games of the games file')
+    parser.add_argument('--games', type=int, default=100, help='number of the self-play games')
+    parser.add_argument('--rules', choices=sorted(GAME_CLASSES), default=CLASSIC)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4, help='number of coins in a winning line')
+    parser.add_argument('--shard-size', type=int, default=65536, help='number of samples in a shard file')
+    parser.add_argument('--no-mirror', dest='mirror', action='store_false',
+                        help='do not add the left-right mirror image of every sample')
+    parser.add_argument('--compress', action='store_true', help='write the compressed .npz files')
+    args = parser.parse_args(argv)
+    if args.records:
+        summary = export_records(args.output, args.records, args.workers, args.shard_size,
+                                 mirror=args.mirror, compress=args.compress)
+    else:
+        summary = export_self_play(args.output, args.self_play, args.games, args.rules, args.workers,
+                                   args.max_moves, args.seed, (args.rows, args.columns, args.connect),
+                                   args.shard_size, mirror=args.mirror, compress=args.compress)
+    summary['shards'] = len(summary['shards'])
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
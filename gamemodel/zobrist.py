@@ -0,0 +1,26 @@
+# This Python file uses the following encoding: utf-8
+
+import random
+from functools import lru_cache
+
+ZOBRIST_SEED = 20210601
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_keys(row_count, column_count):
+    '''Returns the random 64-bit keys of the board with @row_count rows and @column_count columns.
+
+    The keys are indexed by [player][row][column] (the keys of the player 0, an empty field, are
+    zeros) and are the same in every process, so the hashes can be stored and shared.'''
+    rng = random.Random(ZOBRIST_SEED + 1000 * row_count + column_count)
+    keys = [[[0] * column_count for row in range(row_count)]]
+    for player in (1, 2):
+        keys.append([[rng.getrandbits(64) for column in range(column_count)]
+                     for row in range(row_count)])
+    return keys
+
+
+@lru_cache(maxsize=None)
+def get_side_key(row_count, column_count):
+    '''Returns the random 64-bit key XORed into the hash when the player 2 is to move'''
+    return random.Random(ZOBRIST_SEED - 1000 * row_count - column_count).getrandbits(64)
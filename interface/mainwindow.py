@@ -1,20 +1,35 @@
 # This Python file uses the following encoding: utf-8
+import time
 from PySide2.QtWidgets import (QApplication, QMainWindow, QGridLayout, QVBoxLayout,
                                 QHBoxLayout, QPushButton, QWidget, QLabel, QComboBox)
 from PySide2.QtGui import QPixmap, QFont
-from PySide2.QtCore import QSize, Qt
-from itertools import chain
+from PySide2.QtCore import QSize, Qt, QThreadPool
 from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut
 from gamemodel.wrongmoveexception import WrongMoveException
+from gamemodel.solver import Solver
 from interface.gamestatedialog import GameStateDialog
+from interface.moveprovider import SolverMoveProvider
 
 
 class MainWindow(QMainWindow):
     '''Main game window that displays the game board, buttons and other game controls'''
-    def __init__(self):
-        '''Initialize the game window interface and backend'''
+    CPU_PLAYER = 2
+    CPU_TIME_BUDGET = 1.0
+    FIELD_PIXMAP_FILES = {0: "drawable/empty_field.png", 1: "drawable/red_field.png",
+                          2: "drawable/yellow_field.png"}
+    # the pixmaps are loaded from the disk once and shared by all the fields
+    field_pixmaps = {}
+    # the Instrumentation timing the moves made on the window, None when they are not timed
+    instrumentation = None
+
+    def __init__(self, row_count=6, column_count=7, connect_count=4):
+        '''Initialize the game window interface and backend for the board of the given size'''
         super().__init__()
-        self.game = ConnectFourClassic()
+        self.board_size = (row_count, column_count, connect_count)
+        self.game = ConnectFourClassic(*self.board_size)
+        # the solver and its transposition table are made for the first computer player's move
+        self.solver = None
+        self.move_provider = None
         self.init_interface()
         self.init_backend()
 
@@ -35,7 +50,8 @@ class MainWindow(QMainWindow):
     def set_window_properties(self):
         '''Set window size, title and other properties'''
         self.setWindowTitle("Connect Four")
-        self.setFixedSize(QSize(720, 825))
+        # the fields are 100 pixels wide and high, the controls take the rest
+        self.setFixedSize(QSize(100 * self.game.column_count + 20, 100 * self.game.row_count + 225))
         # setting central layout for all the game components
         self.setCentralWidget(QWidget(self))
         self.central_layout = QVBoxLayout(self.centralWidget())
@@ -55,6 +71,7 @@ class MainWindow(QMainWindow):
         self.board_layout.setVerticalSpacing(0)
         self.board_layout.setHorizontalSpacing(0)
         self.board_layout.setOriginCorner(Qt.BottomLeftCorner)
+        self.create_board_fields()
         self.render_board()
 
     def set_bottom_controls(self):
@@ -79,6 +96,7 @@ class MainWindow(QMainWindow):
         self.game_mode_combo_box = QComboBox(self.menu_widget)
         self.game_mode_combo_box.addItem("Classic")
         self.game_mode_combo_box.addItem("PopOut")
+        self.game_mode_combo_box.addItem("Classic vs CPU")
         self.game_mode_combo_box.setFont(self.font)
         self.menu_layout.addWidget(self.game_mode_combo_box)
         # information label to notify the user about the state of the game
@@ -94,14 +112,14 @@ class MainWindow(QMainWindow):
         '''Sets the game mode to one provided by the @mode'''
         self.game_mode = mode
         if self.game_mode == "PopOut":
-            self.game = ConnectFourPopOut()
-        elif self.game_mode == "Classic":
-            self.game = ConnectFourClassic()
+            self.game = ConnectFourPopOut(*self.board_size)
+        elif self.game_mode in ("Classic", "Classic vs CPU"):
+            self.game = ConnectFourClassic(*self.board_size)
 
     def create_drop_buttons(self):
-        '''Creates 7 drop buttons displayed on the top control bar'''
+        '''Creates a drop button for every column, displayed on the top control bar'''
         self.drop_buttons = []
-        for i in range(7):
+        for i in range(self.game.column_count):
             code = ("self.drop_button" + str(i + 1) + " = QPushButton(self.top_controls_widget)\n" +
                 "self.drop_buttons.append(self.drop_button" + str(i + 1) +")")
             exec(code)
@@ -111,9 +129,9 @@ class MainWindow(QMainWindow):
             self.drop_buttons[i].setEnabled(False)
 
     def create_pop_buttons(self):
-        '''Creates 7 pop buttons displayed on the bottom control bar'''
+        '''Creates a pop button for every column, displayed on the bottom control bar'''
         self.pop_buttons = []
-        for i in range(7):
+        for i in range(self.game.column_count):
             code = ("self.pop_button" + str(i + 1) + " = QPushButton(self.bottom_controls_widget)\n" +
                 "self.pop_buttons.append(self.pop_button" + str(i + 1) +")")
             exec(code)
@@ -122,22 +140,41 @@ class MainWindow(QMainWindow):
             self.pop_buttons[i].setFont(self.font)
             self.pop_buttons[i].setEnabled(False)
 
+    def get_field_pixmap(self, player):
+        '''Returns the pixmap of the field with the coin of the @player (0 if empty), loaded on its first use'''
+        pixmap = MainWindow.field_pixmaps.get(player)
+        if pixmap is None:
+            pixmap = MainWindow.field_pixmaps[player] = QPixmap(self.FIELD_PIXMAP_FILES[player])
+        return pixmap
+
+    def create_board_fields(self):
+        '''Creates the grid of labels displaying the board fields, reused by every render'''
+        empty_pixmap = self.get_field_pixmap(0)
+        self.board_fields = []
+        for x in range(self.game.row_count):
+            row = []
+            for y in range(self.game.column_count):
+                field = QLabel(self.board_widget)
+                field.setPixmap(empty_pixmap)
+                self.board_layout.addWidget(field, x, y)
+                row.append(field)
+            self.board_fields.append(row)
+        # what the fields display at the moment, so that a render only touches the changed ones
+        self.rendered_board = [[0] * self.game.column_count for _ in range(self.game.row_count)]
+
     def render_board(self):
         '''Updates the board's visual appearance based on the game model'''
-        positions = list(chain.from_iterable([[(i, j) for j in range(7)] for i in range(6)]))
-        for position in positions:
-            self.render_field(position[0], position[1])
-
-    def render_field(self, x, y):
-        '''Updates a single board field's appearance based on the game model'''
-        field = QLabel(self.board_widget)
-        if self.game.get_board()[x][y] == 1:
-            field.setPixmap((QPixmap("drawable/red_field.png")))
-        elif self.game.get_board()[x][y] == 2:
-            field.setPixmap((QPixmap("drawable/yellow_field.png")))
-        else:
-            field.setPixmap((QPixmap("drawable/empty_field.png")))
-        self.board_layout.addWidget(field, x, y)
+        board = self.game.get_board()
+        for x, (row, rendered_row) in enumerate(zip(board, self.rendered_board)):
+            if row != rendered_row:
+                for y in range(len(row)):
+                    if row[y] != rendered_row[y]:
+                        self.render_field(x, y, row[y])
+
+    def render_field(self, x, y, player):
+        '''Updates a single board field's appearance to show the coin of the @player (0 if empty)'''
+        self.board_fields[x][y].setPixmap(self.get_field_pixmap(player))
+        self.rendered_board[x][y] = player
 
     def init_backend(self):
         '''Initialize the logic of the game controls on the window'''
@@ -149,13 +186,14 @@ class MainWindow(QMainWindow):
         # connecting the start/restart button with the function handling the click
         self.start_restart_button.clicked.connect(self.start_restart_game)
         # connecting the click events of each game buttons to their corresponding action function
-        for drop_button, pop_button, column in zip(self.drop_buttons, self.pop_buttons, range(7)):
+        for drop_button, pop_button, column in zip(self.drop_buttons, self.pop_buttons, range(self.game.column_count)):
             drop_button.clicked.connect(lambda *args, column=column: self.drop_move(column))
             pop_button.clicked.connect(lambda *args, column=column: self.pop_move(column))
 
     def start_restart_game(self):
         '''Based on the current game state either starts the game or resets the game'''
         if self.game_in_progress:
+            self.cancel_cpu_move()
             self.game_in_progress = False
             self.start_restart_button.setText("Start")
             self.info_label.setText("Waiting for start...")
@@ -181,25 +219,32 @@ class MainWindow(QMainWindow):
                 pop.setEnabled(enable)
 
     def move(move_func):
-        '''A wrapper function for any type of move during the game'''
+        '''A wrapper function for any type of move during the game, the move with its render is timed
+        when the instrumentation is set'''
+        name = "MainWindow." + move_func.__name__
         def wrap(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if instrumentation is not None:
+                start = time.perf_counter_ns()
             try:
                 move_func(self, *args, **kwargs)
                 self.render_board()
             except WrongMoveException:
                 self.info_label.setText("Can't make a move here!")
+            if instrumentation is not None:
+                instrumentation.record(name, time.perf_counter_ns() - start)
         return wrap
 
     @move
     def drop_move(self, column):
         '''Drops the current player's coin on the given @column'''
         self.game.drop_move(column)
-        if self.game.is_winning(self.game.current_player):
+        if self.game.last_move_wins(self.game.current_player):
             self.info_label.setText("Player " + str(self.game.current_player) + " won!")
             self.enable_control_buttons(False)
             dialog = GameStateDialog(self.game.current_player)
             dialog.show()
-        elif self.game.is_board_full() and self.game_mode == "Classic":
+        elif self.game.get_game_state() == 0:
             self.info_label.setText("Game drawn!")
             self.enable_control_buttons(False)
             dialog = GameStateDialog(0)
@@ -207,21 +252,80 @@ class MainWindow(QMainWindow):
         else:
             self.game.change_turns()
             self.info_label.setText("Player " + str(self.game.current_player) + " turn!")
+            self.enable_control_buttons(not self.is_cpu_turn())
+            if self.is_cpu_turn():
+                self.cpu_move()
+
+    def is_cpu_turn(self):
+        '''Returns True if the computer player is to move in the current game mode, else False'''
+        return self.game_mode == "Classic vs CPU" and self.game.current_player == self.CPU_PLAYER
+
+    def cpu_move(self):
+        '''Starts the search for the computer player's drop on a worker thread'''
+        self.info_label.setText("CPU thinking...")
+        if self.solver is None:
+            self.solver = Solver()
+        provider = SolverMoveProvider(self.solver, self.game, self.CPU_TIME_BUDGET)
+        # the signals of a cancelled search can still be on the way, they are told apart by the provider
+        provider.signals.progress.connect(lambda result: self.show_cpu_progress(provider, result))
+        provider.signals.failed.connect(lambda message: self.fail_cpu_move(provider, message))
+        provider.signals.finished.connect(lambda result: self.finish_cpu_move(provider, result))
+        self.move_provider = provider
+        QThreadPool.globalInstance().start(provider)
+
+    def show_cpu_progress(self, provider, result):
+        '''Shows the depth and the nodes of the finished iteration of the computer player's search'''
+        if provider is self.move_provider:
+            self.info_label.setText(f"CPU depth {result.depth}, {result.nodes:,} nodes")
+
+    def finish_cpu_move(self, provider, result):
+        '''Drops the computer player's coin on the column chosen by the search of the @provider,
+        the @result is None if the search was cancelled or failed (told by fail_cpu_move before)'''
+        if provider is self.move_provider:
+            self.move_provider = None
+            if result is not None and self.game_in_progress and self.is_cpu_turn():
+                self.drop_move(result.column)
+
+    def fail_cpu_move(self, provider, message):
+        '''Shows the error @message of the failed search of the @provider and gives the controls back,
+        so that the player can go on making the moves'''
+        if provider is self.move_provider:
+            self.move_provider = None
+            if self.game_in_progress:
+                self.info_label.setText("CPU move failed: " + message)
+                self.enable_control_buttons(True)
+
+    def cancel_cpu_move(self):
+        '''Stops the computer player's search, a new solver is taken as the old one may still be running'''
+        if self.move_provider is not None:
+            self.move_provider.cancel()
+            self.move_provider = None
+            self.solver = None
+
+    def closeEvent(self, event):
+        '''Stops the computer player's search when the window is closed'''
+        self.cancel_cpu_move()
+        super().closeEvent(event)
 
     @move
     def pop_move(self, column):
         '''Pops the current player's column from the given @column'''
         self.game.pop_move(column)
-        if self.game.is_winning(self.game.current_player):
+        if self.game.last_move_wins(self.game.current_player):
             self.info_label.setText("Player " + str(self.game.current_player) + " won!")
             self.enable_control_buttons(False)
             dialog = GameStateDialog(self.game.current_player)
             dialog.show()
-        elif self.game.is_winning(self.game.next_player):
+        elif self.game.last_move_wins(self.game.next_player):
             self.info_label.setText("Player " + str(self.game.next_player) + " won!")
             self.enable_control_buttons(False)
             dialog = GameStateDialog(self.game.next_player)
             dialog.show()
+        elif self.game.get_game_state() == 0:
+            self.info_label.setText("Game drawn!")
+            self.enable_control_buttons(False)
+            dialog = GameStateDialog(0)
+            dialog.show()
         else:
             self.game.change_turns()
             self.info_label.setText("Player " + str(self.game.current_player) + " turn!")
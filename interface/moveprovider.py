@@ -0,0 +1,46 @@
+# This Python file uses the following encoding: utf-8
+import copy
+import threading
+from PySide2.QtCore import QObject, QRunnable, Signal
+
+
+class MoveProviderSignals(QObject):
+    '''Signals of the move provider, emitted from the worker thread and delivered on the UI thread'''
+    progress = Signal(object)
+    failed = Signal(str)
+    finished = Signal(object)
+
+
+class SolverMoveProvider(QRunnable):
+    '''Searches for the computer player's drop on a worker thread of the QThreadPool.
+
+    The search works on its own copy of the game, so the window can reset its game at any time.
+    The SearchResult of every finished iteration is sent by the progress signal and the final one
+    by the finished signal. The finished signal always comes, with None if the search was cancelled
+    or failed; the failed signal brings the error message of the failed search before it.'''
+    def __init__(self, solver, game, time_budget):
+        '''Initialize the search of the @solver for the current player of the @game'''
+        super().__init__()
+        self.solver = solver
+        # the copy is made on the UI thread, before the game can change
+        self.game = copy.deepcopy(game)
+        self.time_budget = time_budget
+        self.stop = threading.Event()
+        self.signals = MoveProviderSignals()
+
+    def run(self):
+        '''Runs the search, called on the worker thread'''
+        result = None
+        try:
+            result = self.solver.search(self.game, time_budget=self.time_budget,
+                                        on_progress=self.signals.progress.emit, stop=self.stop)
+        except Exception as exception:
+            # the exception would end only in the worker thread, the window is told about it
+            self.signals.failed.emit(str(exception) or type(exception).__name__)
+        finally:
+            # whoever waits for the worker is told it is done, also when the search failed
+            self.signals.finished.emit(None if self.stop.is_set() else result)
+
+    def cancel(self):
+        '''Stops the search as soon as possible, the finished signal brings None instead of its result'''
+        self.stop.set()
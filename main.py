@@ -1,10 +1,32 @@
 # This Python file uses the following encoding: utf-8
 
-from PySide2.QtWidgets import QApplication
-from interface.mainwindow import MainWindow
+import os
+import sys
 
-if __name__ == "__main__":
-    app = QApplication([])
+
+def main(argv=None, instrumentation=None):
+    '''Opens the game window, Qt is imported only here so that importing this module stays cheap.
+    The game model and the window moves are timed by the @instrumentation if it is given.'''
+    from PySide2.QtWidgets import QApplication
+    from interface.mainwindow import MainWindow
+    app = QApplication(sys.argv if argv is None else argv)
+    if instrumentation is not None:
+        instrumentation.attach_game_model()
+        MainWindow.instrumentation = instrumentation
     win = MainWindow()
     win.show()
-    app.exec_()
+    try:
+        return app.exec_()
+    finally:
+        if instrumentation is not None:
+            instrumentation.output.write(instrumentation.format_summary())
+            instrumentation.detach()
+
+
+if __name__ == "__main__":
+    # CONNECTFOUR_INSTRUMENT=<moves> times the moves, writing the summary to stderr every <moves> moves
+    interval = os.environ.get('CONNECTFOUR_INSTRUMENT')
+    if interval is not None:
+        from gamemodel.instrumentation import Instrumentation
+        sys.exit(main(instrumentation=Instrumentation(int(interval) or None)))
+    sys.exit(main())
@@ -0,0 +1,301 @@
+# This Python file uses the following encoding: utf-8
+#python -m server.gameserver --port 8765
+
+import argparse
+import asyncio
+import json
+import secrets
+import sys
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT
+from gamemodel.wrongmoveexception import WrongMoveException
+
+# The clients and the server exchange JSON objects, one object per line. The client requests:
+#   {"type": "create", "rules": "Classic"}               starts a game, taking the seat of the player 1
+#   {"type": "join", "game": 1}                          takes the free seat of the player 2
+#   {"type": "reconnect", "game": 1, "token": "..."}     takes the seat back after losing the connection
+#   {"type": "move", "kind": "drop", "column": 3}        makes the move in the game of the connection
+# The server answers with "joined" (the game, the player and the token of the seat) or "error"
+# (the message), and pushes the "state" of the game to both seats after every change. An idle game
+# is evicted, its players get the "evicted" message and their moves are rejected from then on.
+GAME_CLASSES = {CLASSIC: ConnectFourClassic, POPOUT: ConnectFourPopOut}
+IDLE_TIMEOUT = 300.0
+MAX_REQUEST_SIZE = 4096
+# only the connection making the request is drained, the one of the other seat is closed when this
+# many bytes of its messages are still waiting to be sent
+MAX_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class SessionError(Exception):
+    '''Exception raised when the request of the client cannot be carried out'''
+
+
+def get_field(request, name, field_type, default=None):
+    '''Returns the @name field of the @request, raises SessionError if it is not of the @field_type'''
+    value = request.get(name, default)
+    # the exact type, so that true and false are not taken for the numbers
+    if type(value) is not field_type:
+        raise SessionError(f'The field {name!r} has to be of the type {field_type.__name__}')
+    return value
+
+
+def send(writer, message):
+    '''Queues the @message as a JSON line on the @writer, the connection may be already closed.
+    The connection not reading its messages is closed instead, so that its buffer stays bounded.'''
+    if writer.is_closing():
+        return
+    if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_SIZE:
+        writer.close()
+        return
+    writer.write(json.dumps(message).encode() + b'\n')
+
+
+class GameSession:
+    '''Game played over the network, the tokens of its seats and the connections sitting on them'''
+    __slots__ = ('session_id', 'game', 'tokens', 'connections', 'result', 'last_activity', 'evicted')
+
+    def __init__(self, session_id, rules, now):
+        '''Initialize the game of the @rules with only the seat of the player 1 taken'''
+        if rules not in GAME_CLASSES:
+            raise SessionError(f'Unknown rules {rules!r}')
+        self.session_id = session_id
+        self.game = GAME_CLASSES[rules]()
+        self.tokens = {1: secrets.token_hex(8)}
+        self.connections = {1: None, 2: None}
+        self.result = None
+        self.last_activity = now
+        self.evicted = False
+
+    def get_state(self):
+        '''Returns the state message of the game'''
+        game = self.game
+        return {'type': 'state', 'game': self.session_id, 'rules': game.rules, 'board': game.get_board(),
+                'current_player': game.current_player, 'last_move': game.last_move,
+                'moves': len(game.history), 'waiting': 2 not in self.tokens, 'result': self.result}
+
+    def take_seat(self, player, writer):
+        '''Seats the connection of the @writer as the @player, closing the connection it replaces'''
+        previous = self.connections[player]
+        if previous is not None and previous is not writer:
+            previous.close()
+        self.connections[player] = writer
+
+    def leave_seat(self, player, writer):
+        '''Frees the seat of the @player if the @writer still sits on it, it can be taken back by the token'''
+        if self.connections[player] is writer:
+            self.connections[player] = None
+
+    def make_move(self, player, kind, column):
+        '''Makes the (@kind, @column) move of the @player, validated by the game model'''
+        if self.evicted:
+            raise SessionError('The game was evicted')
+        if self.result is not None:
+            raise SessionError('The game is over')
+        if 2 not in self.tokens:
+            raise SessionError('Waiting for the second player')
+        if player != self.game.current_player:
+            raise SessionError('It is not your turn')
+        if not isinstance(column, int) or not 0 <= column < self.game.column_count:
+            raise SessionError('There is no such column')
+        try:
+            self.game.make_move((kind, column))
+        except WrongMoveException as exception:
+            raise SessionError(str(exception))
+        game_state = self.game.get_game_state()
+        if game_state is None:
+            self.game.change_turns()
+        else:
+            self.result = game_state
+
+    def broadcast(self, message):
+        '''Pushes the @message to every connected seat'''
+        for connection in self.connections.values():
+            if connection is not None:
+                send(connection, message)
+
+
+class GameServer:
+    '''Hosts many games at once in a single asyncio event loop, all the sessions stay in memory.
+
+    A session is evicted after @idle_timeout seconds without any request, checked every
+    @eviction_interval seconds (by default a tenth of the timeout).'''
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, eviction_interval=None):
+        '''Initialize the server without any sessions'''
+        self.idle_timeout = idle_timeout
+        self.eviction_interval = eviction_interval or idle_timeout / 10
+        self.sessions = {}
+        self.next_session_id = 1
+        self.server = None
+        self.eviction_task = None
+        self.client_tasks = set()
+        self.handlers = {'create': self.create_session, 'join': self.join_session,
+                         'reconnect': self.reconnect, 'move': self.make_move}
+
+    async def start(self, host='127.0.0.1', port=0):
+        '''Starts listening on the @host and @port (0 picks a free one), returns the port'''
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_REQUEST_SIZE)
+        self.eviction_task = asyncio.create_task(self.run_eviction())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        '''Stops listening, closes every connection and forgets all the sessions'''
+        if self.eviction_task is not None:
+            self.eviction_task.cancel()
+        self.server.close()
+        for session in self.sessions.values():
+            for connection in session.connections.values():
+                if connection is not None:
+                    connection.close()
+        self.sessions.clear()
+        for task in self.client_tasks:
+            task.cancel()
+        await asyncio.gather(*self.client_tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def serve_forever(self):
+        '''Serves the clients until the task is cancelled'''
+        async with self.server:
+            await self.server.serve_forever()
+
+    def get_time(self):
+        '''Returns the clock of the event loop the idle times are measured with'''
+        return asyncio.get_running_loop().time()
+
+    async def handle_client(self, reader, writer):
+        '''Reads the requests of a single connection until it is closed'''
+        task = asyncio.current_task()
+        self.client_tasks.add(task)
+        seat = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    send(writer, {'type': 'error', 'message': 'The request is too long'})
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise SessionError('The request is not a JSON object')
+                    seat = self.handle_request(request, writer, seat)
+                except (ValueError, SessionError) as exception:
+                    send(writer, {'type': 'error', 'message': str(exception)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if seat is not None:
+                seat[0].leave_seat(seat[1], writer)
+            writer.close()
+            self.client_tasks.discard(task)
+
+    def handle_request(self, request, writer, seat):
+        '''Carries out the @request of the connection of the @writer sitting on the @seat
+        (the session and the player, None before joining a game), returns the new seat'''
+        request_type = get_field(request, 'type', str)
+        handler = self.handlers.get(request_type)
+        if handler is None:
+            raise SessionError(f'Unknown request {request_type!r}')
+        new_seat = handler(request, writer, seat)
+        if seat is not None and new_seat != seat:
+            seat[0].leave_seat(seat[1], writer)
+        return new_seat
+
+    def get_session(self, request):
+        '''Returns the session of the game given in the @request'''
+        session = self.sessions.get(get_field(request, 'game', int))
+        if session is None:
+            raise SessionError('There is no such game')
+        session.last_activity = self.get_time()
+        return session
+
+    def seat(self, session, player, writer):
+        '''Seats the connection of the @writer, tells it the token and everyone the state'''
+        session.take_seat(player, writer)
+        send(writer, {'type': 'joined', 'game': session.session_id, 'player': player,
+                      'token': session.tokens[player]})
+        session.broadcast(session.get_state())
+        return session, player
+
+    def create_session(self, request, writer, seat):
+        '''Starts the game of the requested rules, the creator plays first'''
+        session = GameSession(self.next_session_id, get_field(request, 'rules', str, CLASSIC), self.get_time())
+        self.sessions[session.session_id] = session
+        self.next_session_id += 1
+        return self.seat(session, 1, writer)
+
+    def join_session(self, request, writer, seat):
+        '''Takes the seat of the player 2 in the requested game'''
+        session = self.get_session(request)
+        if 2 in session.tokens:
+            raise SessionError('The game has already started')
+        session.tokens[2] = secrets.token_hex(8)
+        return self.seat(session, 2, writer)
+
+    def reconnect(self, request, writer, seat):
+        '''Takes back the seat whose token is given in the request'''
+        session = self.get_session(request)
+        request_token = get_field(request, 'token', str)
+        # compare_digest() takes only the ASCII strings, the tokens are hexadecimal
+        if not request_token.isascii():
+            raise SessionError('The token does not match any seat of the game')
+        for player, token in session.tokens.items():
+            if secrets.compare_digest(token, request_token):
+                return self.seat(session, player, writer)
+        raise SessionError('The token does not match any seat of the game')
+
+    def make_move(self, request, writer, seat):
+        '''Makes the requested move of the connection's player and pushes the new state'''
+        if seat is None:
+            raise SessionError('Join a game first')
+        session, player = seat
+        session.last_activity = self.get_time()
+        session.make_move(player, get_field(request, 'kind', str), get_field(request, 'column', int))
+        session.broadcast(session.get_state())
+        return seat
+
+    def evict_idle_sessions(self, now=None):
+        '''Removes the sessions idle for longer than the timeout, returns how many were removed'''
+        now = self.get_time() if now is None else now
+        idle = [session for session in self.sessions.values()
+                if now - session.last_activity > self.idle_timeout]
+        for session in idle:
+            session.broadcast({'type': 'evicted', 'game': session.session_id})
+            # the connections may still sit on the seats, their moves are rejected from now on
+            session.evicted = True
+            del self.sessions[session.session_id]
+        return len(idle)
+
+    async def run_eviction(self):
+        '''Evicts the idle sessions periodically'''
+        while True:
+            await asyncio.sleep(self.eviction_interval)
+            self.evict_idle_sessions()
+
+
+async def serve(host, port, idle_timeout):
+    '''Runs the server until it is interrupted'''
+    server = GameServer(idle_timeout)
+    port = await server.start(host, port)
+    print(f'Serving on {host}:{port}', file=sys.stderr)
+    await server.serve_forever()
+
+
+def main(argv=None):
+    '''Runs the server described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m server.gameserver',
+                                     description='Hosts ConnectFour games played over TCP with JSON lines.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT,
+                        help='seconds after which a game without any request is evicted')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
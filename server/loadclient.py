@@ -0,0 +1,171 @@
+# This Python file uses the following encoding: utf-8
+#python -m server.loadclient --games 1000 --local
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from gamemodel.connectfour import CLASSIC, POPOUT, DROP, POP
+from server.gameserver import GameServer
+
+PERCENTILES = (50, 90, 99)
+
+
+class GameClient:
+    '''Connection to the game server, the pushed messages are queued until they are received'''
+    def __init__(self, reader, writer):
+        '''Initialize the client of the opened connection and starts reading its messages'''
+        self.reader = reader
+        self.writer = writer
+        self.messages = asyncio.Queue()
+        self.reading_task = asyncio.create_task(self.read_messages())
+
+    @classmethod
+    async def connect(cls, host, port):
+        '''Returns the client connected to the server on the @host and @port'''
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def read_messages(self):
+        '''Queues every message of the server, None when the connection is closed'''
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                await self.messages.put(json.loads(line))
+        except ConnectionError:
+            pass
+        await self.messages.put(None)
+
+    async def send(self, message):
+        '''Sends the @message to the server'''
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+
+    async def receive(self, *types):
+        '''Returns the next message of one of the @types (an error is always returned), skipping the others'''
+        while True:
+            message = await self.messages.get()
+            if message is None:
+                raise ConnectionError('The server closed the connection')
+            if message['type'] in types or message['type'] == 'error':
+                return message
+
+    async def receive_state(self, moves):
+        '''Returns the first pushed state with at least the @moves moves made (or an error)'''
+        while True:
+            message = await self.receive('state')
+            if message['type'] == 'error' or (message['moves'] >= moves and not message['waiting']):
+                return message
+
+    async def close(self):
+        '''Closes the connection'''
+        self.writer.close()
+        self.reading_task.cancel()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def choose_move(state, rng):
+    '''Returns a random legal move message of the current player of the game @state'''
+    board, player = state['board'], state['current_player']
+    moves = [(DROP, column) for column, top in enumerate(board[-1]) if top == 0]
+    if state['rules'] == POPOUT:
+        moves += [(POP, column) for column, bottom in enumerate(board[0]) if bottom == player]
+    kind, column = rng.choice(moves)
+    return {'type': 'move', 'kind': kind, 'column': column}
+
+
+async def play_match(host, port, rules, max_moves, rng, latencies):
+    '''Plays one random game by two clients, adding the latency of every move to the @latencies.
+    Returns the number of the errors the server answered with.'''
+    first = await GameClient.connect(host, port)
+    second = await GameClient.connect(host, port)
+    errors = 0
+    try:
+        await first.send({'type': 'create', 'rules': rules})
+        joined = await first.receive('joined')
+        await second.send({'type': 'join', 'game': joined['game']})
+        await second.receive('joined')
+        clients = {1: first, 2: second}
+        state = await first.receive_state(0)
+        while state['result'] is None and state['moves'] < max_moves:
+            client = clients[state['current_player']]
+            start = time.perf_counter()
+            await client.send(choose_move(state, rng))
+            answer = await client.receive_state(state['moves'] + 1)
+            latencies.append(time.perf_counter() - start)
+            if answer['type'] == 'error':
+                errors += 1
+                break
+            state = answer
+    finally:
+        await first.close()
+        await second.close()
+    return errors
+
+
+def get_percentile(values, percentile):
+    '''Returns the nearest-rank @percentile of the sorted @values'''
+    if not values:
+        return 0.0
+    rank = max(1, -(-percentile * len(values) // 100))
+    return values[rank - 1]
+
+
+async def run_load(host, port, games, rules=CLASSIC, max_moves=100, seed=0):
+    '''Plays @games random games at once against the server, returns the summary dictionary
+    with the move latency percentiles in milliseconds'''
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*[play_match(host, port, rules, max_moves,
+                                               random.Random(rng.getrandbits(32)), latencies)
+                                    for _ in range(games)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    summary = {'games': games, 'rules': rules, 'moves': len(latencies), 'errors': sum(errors),
+               'seconds': round(elapsed, 3),
+               'moves_per_second': len(latencies) / elapsed if elapsed > 0 else 0.0}
+    for percentile in PERCENTILES:
+        summary[f'p{percentile}_ms'] = round(get_percentile(latencies, percentile) * 1000, 3)
+    summary['max_ms'] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    return summary
+
+
+async def run_local_load(games, rules, max_moves, seed):
+    '''Runs the load against the server started in the same event loop'''
+    server = GameServer()
+    port = await server.start()
+    try:
+        return await run_load('127.0.0.1', port, games, rules, max_moves, seed)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    '''Runs the load described by the command line arguments'''
+    parser = argparse.ArgumentParser(prog='python -m server.loadclient',
+                                     description='Plays many random games at once against the game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--local', action='store_true',
+                        help='start the server in this process instead of connecting to a running one')
+    parser.add_argument('--games', type=int, default=100, help='number of the concurrent games')
+    parser.add_argument('--rules', choices=(CLASSIC, POPOUT), default=CLASSIC)
+    parser.add_argument('--max-moves', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.local:
+        summary = asyncio.run(run_local_load(args.games, args.rules, args.max_moves, args.seed))
+    else:
+        summary = asyncio.run(run_load(args.host, args.port, args.games, args.rules, args.max_moves, args.seed))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
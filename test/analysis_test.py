@@ -0,0 +1,129 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.analysis_test
+
+import unittest
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, DROP, POP
+from gamemodel.solver.analysis import Analyzer, AnalysisCache
+from gamemodel.solver.negamax import SOLVED_SCORE
+
+
+class AnalyzerTest(unittest.TestCase):
+    '''TestCase class for testing the scores of the moves and their cache'''
+
+    def setUp(self):
+        self.analyzer = Analyzer(depth=4, popout_depth=2)
+
+    def test_should_score_every_drop_when_classic(self):
+        '''analyze() scores every legal drop, the winning one above and the others below the solved score'''
+        # given
+        game = ConnectFourClassic()
+        game.board = [[1, 1, 1, 0, 2, 2, 2],
+                      [2, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        scores = self.analyzer.analyze(game)
+
+        # then
+        self.assertEqual(set(scores), {(DROP, column) for column in range(7)})
+        self.assertGreater(scores[(DROP, 3)], SOLVED_SCORE)
+        for column in (0, 1, 2, 4, 5, 6):
+            self.assertLess(scores[(DROP, column)], -SOLVED_SCORE)
+
+    def test_should_score_pops_when_popout(self):
+        '''analyze() scores the pops of the PopOut game too, the pop completing a line wins'''
+        # given
+        game = ConnectFourPopOut()
+        game.board = [[2, 1, 1, 1, 0, 0, 0],
+                      [1, 2, 2, 2, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        scores = self.analyzer.analyze(game)
+
+        # then
+        self.assertEqual(set(scores), set(game.legal_moves()))
+        self.assertIn((POP, 1), scores)
+        self.assertGreater(scores[(DROP, 4)], SOLVED_SCORE)
+        self.assertEqual(max(scores, key=scores.get), (DROP, 4))
+
+    def test_should_hit_cache_when_same_position_after_undo(self):
+        '''The position analyzed before the move and the undo is taken from the cache'''
+        # given
+        game = ConnectFourClassic()
+        game.drop_move(3)
+        game.change_turns()
+        first = self.analyzer.analyze(game)
+        game.drop_move(2)
+        game.undo()
+
+        # when
+        second = self.analyzer.analyze(game)
+
+        # then
+        self.assertEqual(first, second)
+        self.assertEqual(self.analyzer.get_stats()['hits'], 1)
+        self.assertEqual(self.analyzer.get_stats()['misses'], 1)
+
+    def test_should_return_no_scores_when_game_over(self):
+        '''analyze() returns an empty dictionary for the finished game'''
+        # given
+        game = ConnectFourClassic()
+        for column in (0, 1, 0, 1, 0, 1, 0):
+            game.drop_move(column)
+            if game.get_game_state() is None:
+                game.change_turns()
+
+        # when
+        scores = self.analyzer.analyze(game)
+
+        # then
+        self.assertEqual(scores, {})
+
+    def test_should_score_pops_when_full_popout_board_and_side_to_move_can_pop(self):
+        '''The full PopOut board goes on when the player to move has a coin on the bottom row to pop'''
+        # given
+        # the player 1 has no coin on the bottom row, the player 2 to move has
+        game = ConnectFourPopOut(4, 3)
+        game.change_turns()
+        game.board = [[2, 2, 2],
+                      [1, 1, 1],
+                      [2, 2, 2],
+                      [1, 1, 1]]
+
+        # when
+        scores = self.analyzer.analyze(game)
+
+        # then
+        self.assertEqual(set(scores), {(POP, column) for column in range(3)})
+
+
+class AnalysisCacheTest(unittest.TestCase):
+    '''TestCase class for testing the least recently used cache'''
+
+    def test_should_evict_least_recently_used_when_full(self):
+        '''The entry not read for the longest time is evicted first'''
+        # given
+        cache = AnalysisCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+
+        # when
+        cache.put('c', 3)
+
+        # then
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get_stats(), {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2,
+                                             'max_size': 2, 'hit_rate': 2 / 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.arena_test
+
+import io
+import json
+import unittest
+from gamemodel.arena import GreedyAgent, play_game, run_tournament, update_ratings
+from gamemodel.connectfour import ConnectFourClassic, CLASSIC, POPOUT, DROP
+
+
+class ArenaTest(unittest.TestCase):
+    '''TestCase class for testing the headless tournament runner'''
+
+    def test_should_block_column_when_opponent_threatens_to_win(self):
+        '''GreedyAgent blocks the vertical line of the other player'''
+        # given
+        game = ConnectFourClassic()
+        game.board = [[1, 2, 0, 2, 0, 0, 0],
+                      [1, 0, 0, 0, 0, 0, 0],
+                      [1, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0]]
+        game.change_turns()
+
+        # when
+        move = GreedyAgent(seed=1).choose_move(game)
+
+        # then
+        self.assertEqual(move, (DROP, 0))
+        self.assertEqual(game.current_player, 2)
+
+    def test_should_end_game_when_move_limit_reached(self):
+        '''play_game() counts the PopOut game as drawn when it does not end within the move limit'''
+        # given
+        task = {'game': 0, 'rules': POPOUT, 'max_moves': 4, 'seed': 1,
+                'first': 'random', 'second': 'random#2'}
+
+        # when
+        result = play_game(task)
+
+        # then
+        self.assertIsNone(result['winner'])
+        self.assertEqual(len(result['moves']), 4)
+
+    def test_should_stream_results_when_tournament(self):
+        '''run_tournament() writes one JSON line per game and sums up the results of both agents'''
+        # given
+        output = io.StringIO()
+
+        # when
+        summary = run_tournament(('greedy', 'random'), games=10, rules=CLASSIC, output=output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        # then
+        self.assertEqual([line['game'] for line in lines], list(range(10)))
+        self.assertEqual(sum(summary['agents']['greedy'][key] for key in ('wins', 'draws', 'losses')), 10)
+        self.assertGreater(summary['agents']['greedy']['rating'], summary['agents']['random']['rating'])
+        self.assertGreater(summary['games_per_second'], 0)
+
+    def test_should_match_serial_results_when_process_pool(self):
+        '''run_tournament() with two worker processes plays the same seeded games as without them'''
+        # given
+        serial_output, parallel_output = io.StringIO(), io.StringIO()
+
+        # when
+        serial = run_tournament(('random', 'random'), games=6, rules=POPOUT, output=serial_output)
+        parallel = run_tournament(('random', 'random'), games=6, rules=POPOUT, workers=2, output=parallel_output)
+
+        # then
+        def get_games(output):
+            return sorted((json.loads(line)['game'], json.loads(line)['moves'])
+                          for line in output.getvalue().splitlines())
+        self.assertEqual(get_games(serial_output), get_games(parallel_output))
+        for agent in serial['agents']:
+            self.assertEqual(serial['agents'][agent]['rating'], parallel['agents'][agent]['rating'])
+
+    def test_should_move_ratings_towards_winner_when_update(self):
+        '''update_ratings() moves the same number of points from the loser to the winner'''
+        # given
+        ratings = {'a': 1500.0, 'b': 1500.0}
+
+        # when
+        update_ratings(ratings, {'first': 'a', 'second': 'b', 'winner': 'b'})
+
+        # then
+        self.assertEqual(ratings, {'a': 1492.0, 'b': 1508.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.batch_test
+
+import random
+import unittest
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut
+from gamemodel.wrongmoveexception import WrongMoveException
+try:
+    import numpy as np
+    from gamemodel.batch import BatchConnectFour
+except ImportError:
+    BatchConnectFour = None
+
+
+@unittest.skipIf(BatchConnectFour is None, 'numpy is not installed')
+class BatchConnectFourTest(unittest.TestCase):
+    '''TestCase class comparing the BatchConnectFour with the single games on random games'''
+
+    def play_scalar_move(self, game, column, pop):
+        '''Makes the move on the single @game, returns its (valid, win, draw) like the batch does'''
+        try:
+            if pop:
+                game.pop_move(column)
+            else:
+                game.drop_move(column)
+        except (WrongMoveException, IndexError, AttributeError):
+            return False, False, False
+        game_state = game.get_game_state()
+        if game_state is None:
+            game.change_turns()
+        return True, game_state not in (None, 0), game_state == 0
+
+    def play_random_games(self, game_class, popout, size=64, moves=80, seed=11, geometry=(6, 7, 4)):
+        '''Plays the same random (also invalid) moves on the batch and on @size single games'''
+        rng = random.Random(seed)
+        batch = BatchConnectFour(size, popout, *geometry)
+        games = [game_class(*geometry) for _ in range(size)]
+        finished = [False] * size
+        # the batch does not see the repetition draws, those games are not compared any more
+        repeated = [False] * size
+        for _ in range(moves):
+            columns = [rng.randrange(-1, geometry[1] + 1) for _ in range(size)]
+            pops = [popout and rng.random() < 0.3 for _ in range(size)]
+            valid, win, draw = batch.play(np.array(columns), np.array(pops))
+            for index, game in enumerate(games):
+                if repeated[index]:
+                    continue
+                expected = (False, False, False)
+                if not finished[index] and 0 <= columns[index] < geometry[1]:
+                    expected = self.play_scalar_move(game, columns[index], pops[index])
+                finished[index] = finished[index] or expected[1] or expected[2]
+                if expected[2] and game.is_repetition():
+                    repeated[index] = True
+                    continue
+                self.assertEqual((valid[index], win[index], draw[index]), expected)
+                self.assertEqual(batch.boards[index].tolist(), game.board)
+                self.assertEqual(batch.current_player[index], game.current_player)
+
+    def test_should_match_classic_when_random_games(self):
+        '''BatchConnectFour plays like ConnectFourClassic on random games'''
+        self.play_random_games(ConnectFourClassic, popout=False)
+
+    def test_should_match_popout_when_random_games(self):
+        '''BatchConnectFour plays like ConnectFourPopOut on random games'''
+        self.play_random_games(ConnectFourPopOut, popout=True)
+
+    def test_should_match_connect_five_when_random_games(self):
+        '''BatchConnectFour plays like ConnectFourClassic of the connect five on the 7x9 boards'''
+        self.play_random_games(ConnectFourClassic, popout=False, moves=120, geometry=(7, 9, 5))
+
+    def test_should_draw_popout_when_full_board_and_no_pop(self):
+        '''play() draws the full PopOut board only where the next player has no coin on the bottom row'''
+        # given
+        # the bottom row of the narrow boards is not a line, so it can be full of the coins of one player
+        batch = BatchConnectFour(2, popout=True, row_count=4, column_count=3)
+        batch.boards[:] = [[1, 1, 1], [2, 2, 2], [1, 1, 1], [2, 2, 0]]
+        batch.boards[1, 0] = [1, 2, 1]
+
+        # when
+        valid, win, draw = batch.drop_move([2, 2])
+
+        # then
+        self.assertEqual(valid.tolist(), [True, True])
+        self.assertEqual(win.tolist(), [False, False])
+        self.assertEqual(draw.tolist(), [True, False])
+        self.assertEqual(batch.finished.tolist(), [True, False])
+        self.assertEqual(batch.current_player.tolist(), [1, 2])
+
+    def test_should_mark_winner_when_vertical_win_line(self):
+        '''drop_move() reports the win of the player 1 only on the board with the vertical line'''
+        # given
+        batch = BatchConnectFour(2)
+
+        # when
+        for columns in ([0, 0], [1, 1], [0, 0], [1, 1], [0, 0], [1, 1]):
+            batch.drop_move(columns)
+        valid, win, draw = batch.drop_move([0, 2])
+
+        # then
+        self.assertEqual(valid.tolist(), [True, True])
+        self.assertEqual(win.tolist(), [True, False])
+        self.assertEqual(batch.winner.tolist(), [1, 0])
+        self.assertEqual(batch.current_player.tolist(), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.bitboard_test
+
+import random
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut
+from gamemodel.wrongmoveexception import WrongMoveException
+from test import connectfour_test
+
+
+class ConnectFourBitboardClassicTest(connectfour_test.ConnectFourTest):
+    '''TestCase class running the ConnectFourClassic test suite against ConnectFourBitboardClassic'''
+
+    def setUp(self):
+        self.game = ConnectFourBitboardClassic()
+
+
+class ConnectFourBitboardPopOutTest(connectfour_test.ConnectFourPopOutTest):
+    '''TestCase class running the ConnectFourPopOut test suite against ConnectFourBitboardPopOut'''
+
+    def setUp(self):
+        self.game = ConnectFourBitboardPopOut()
+
+    def test_should_shift_column_down_when_pop(self):
+        '''pop_move(0) removes the bottom coin and shifts the rest of the column down'''
+        # given
+        self.game.board = [[1, 2, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        self.game.pop_move(0)
+        expected_board = [[2, 2, 0, 0, 0, 0, 0],
+                          [1, 0, 0, 0, 0, 0, 0],
+                          [2, 0, 0, 0, 0, 0, 0],
+                          [1, 0, 0, 0, 0, 0, 0],
+                          [2, 0, 0, 0, 0, 0, 0],
+                          [0, 0, 0, 0, 0, 0, 0]]
+
+        # then
+        self.assertEqual(self.game.get_board(), expected_board)
+
+    def test_should_throw_wrong_move_exception_when_wrong_pop(self):
+        '''pop_move(1) raises WrongMoveException when the bottom coin belongs to the other player'''
+        # given
+        self.game.board = [[1, 2, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+
+        # then
+        self.assertRaises(WrongMoveException, self.game.pop_move, 1)
+
+    def test_should_reject_field_write_when_board_view(self):
+        '''The board property is a read-only view, writing a field raises instead of being lost'''
+        # given
+        self.game.drop_move(0)
+
+        # when
+
+        # then
+        with self.assertRaises(TypeError):
+            self.game.board[0][0] = 2
+        self.assertEqual(self.game.board[0][0], 1)
+
+
+class BitboardEquivalenceTest(unittest.TestCase):
+    '''TestCase class comparing the bitboard games with the list-of-lists games on random games'''
+
+    def get_valid_moves(self, game):
+        '''Returns the list of the drop and pop moves possible in the @game'''
+        moves = [('drop', column) for column in range(7) if game.is_valid_drop(column)]
+        if hasattr(game, 'pop_move'):
+            moves += [('pop', column) for column in range(7) if game.is_valid_pop(column)]
+        return moves
+
+    def play_random_games(self, game, bitboard_game, games=200, seed=7):
+        '''Plays the same random moves on @game and @bitboard_game and compares their states'''
+        rng = random.Random(seed)
+        for _ in range(games):
+            game.reset()
+            bitboard_game.reset()
+            for _ in range(60):
+                moves = self.get_valid_moves(game)
+                self.assertEqual(moves, self.get_valid_moves(bitboard_game))
+                self.assertEqual(tuple(moves), game.legal_moves())
+                self.assertEqual(tuple(moves), bitboard_game.legal_moves())
+                self.assertEqual(game.legal_move_mask(), bitboard_game.legal_move_mask())
+                if not moves:
+                    break
+                kind, column = rng.choice(moves)
+                getattr(game, kind + '_move')(column)
+                getattr(bitboard_game, kind + '_move')(column)
+                self.assertEqual(game.get_board(), bitboard_game.get_board())
+                self.assertEqual(game.is_board_full(), bitboard_game.is_board_full())
+                self.assertEqual(game.get_hash(), bitboard_game.get_hash())
+                fresh_game = type(game)()
+                fresh_game.board = [list(row) for row in game.get_board()]
+                self.assertEqual(game.hash, fresh_game.hash)
+                self.assertEqual(game.heights, fresh_game.heights)
+                self.assertEqual(bitboard_game.heights, fresh_game.heights)
+                fresh_bitboard_game = type(bitboard_game)()
+                fresh_bitboard_game.board = game.get_board()
+                self.assertEqual(game.hash, fresh_bitboard_game.hash)
+                self.assertEqual(game.mirror_hash, fresh_bitboard_game.mirror_hash)
+                self.assertEqual(game.get_game_state(), bitboard_game.get_game_state())
+                self.assertEqual(game.get_canonical_hash(), bitboard_game.get_canonical_hash())
+                for player in (1, 2):
+                    self.assertEqual(game.is_winning(player), bitboard_game.is_winning(player))
+                    self.assertEqual(game.is_winning(player), game.last_move_wins(player))
+                    self.assertEqual(game.is_winning(player), bitboard_game.last_move_wins(player))
+                if game.is_winning(1) or game.is_winning(2):
+                    break
+                game.change_turns()
+                bitboard_game.change_turns()
+
+    def test_should_match_classic_when_random_games(self):
+        '''ConnectFourBitboardClassic behaves like ConnectFourClassic on random games'''
+        self.play_random_games(ConnectFourClassic(), ConnectFourBitboardClassic())
+
+    def test_should_match_popout_when_random_games(self):
+        '''ConnectFourBitboardPopOut behaves like ConnectFourPopOut on random games'''
+        self.play_random_games(ConnectFourPopOut(), ConnectFourBitboardPopOut())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.book_test
+
+import os
+import tempfile
+import unittest
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut
+from gamemodel.solver.book import OpeningBook, build_book, enumerate_positions
+from gamemodel.solver.negamax import Solver
+
+
+class OpeningBookTest(unittest.TestCase):
+    '''TestCase class for testing the OpeningBook building and lookup'''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'book.c4ob')
+        cls.count = build_book(cls.path, ply=2, depth=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.book = OpeningBook(self.path)
+        self.game = ConnectFourClassic()
+
+    def tearDown(self):
+        self.book.close()
+
+    def test_should_skip_mirror_images_when_enumerating(self):
+        '''enumerate_positions(2) finds 1 + 4 + 25 positions, the mirror images are counted once'''
+        # given
+
+        # when
+        positions = enumerate_positions(2)
+
+        # then
+        self.assertEqual(len(positions), 30)
+        self.assertEqual(len(self.book), self.count)
+        self.assertEqual(self.count, 30)
+
+    def test_should_return_search_result_when_position_in_book(self):
+        '''lookup() returns the same score and column as the search of the same depth'''
+        # given
+        for column in (1, 4):
+            self.game.drop_move(column)
+            self.game.change_turns()
+
+        # when
+        entry = self.book.lookup(self.game)
+        result = Solver().search(self.game, depth=3)
+
+        # then
+        self.assertEqual((entry.score, entry.column, entry.depth), (result.score, result.column, 3))
+
+    def test_should_mirror_column_when_mirrored_position(self):
+        '''lookup() returns the mirrored column for the mirror image of the booked position'''
+        # given
+        mirrored_game = ConnectFourClassic()
+        for column in (1, 4):
+            self.game.drop_move(column)
+            self.game.change_turns()
+            mirrored_game.drop_move(6 - column)
+            mirrored_game.change_turns()
+
+        # when
+        entry = self.book.lookup(self.game)
+        mirrored_entry = self.book.lookup(mirrored_game)
+
+        # then
+        self.assertEqual(mirrored_entry.column, 6 - entry.column)
+        self.assertEqual(mirrored_entry.score, entry.score)
+
+    def test_should_return_none_when_position_not_in_book(self):
+        '''lookup() returns None for the position deeper than the book'''
+        # given
+        for column in (3, 3, 3):
+            self.game.drop_move(column)
+            self.game.change_turns()
+
+        # when
+        entry = self.book.lookup(self.game)
+
+        # then
+        self.assertIsNone(entry)
+
+    def test_should_not_search_when_solver_has_book(self):
+        '''Solver with the book returns the book move without searching any node'''
+        # given
+        solver = Solver(book=self.book)
+
+        # when
+        result = solver.search(self.game, depth=3)
+        deeper_result = solver.search(self.game, depth=4)
+
+        # then
+        self.assertEqual(result.nodes, 0)
+        self.assertEqual(result.column, self.book.lookup(self.game).column)
+        self.assertGreater(deeper_result.nodes, 0)
+
+    def test_should_search_when_book_entry_not_solved_or_other_game(self):
+        '''Solver without the depth searches past the unsolved book entry, the book of the other rules
+        or board size is not looked up'''
+        # given
+        solver = Solver(book=self.book)
+        popout_game = ConnectFourPopOut()
+        wider_game = ConnectFourClassic(6, 8)
+
+        # when
+        result = solver.search(self.game, time_budget=0.1)
+        wider_result = solver.search(wider_game, depth=3)
+
+        # then
+        self.assertGreater(result.nodes, 0)
+        self.assertGreater(wider_result.nodes, 0)
+        self.assertFalse(self.book.is_for(popout_game))
+        self.assertFalse(self.book.is_for(wider_game))
+        self.assertTrue(self.book.is_for(self.game))
+        self.assertRaises(ValueError, solver.search, popout_game, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
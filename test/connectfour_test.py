@@ -1,8 +1,9 @@
 # This Python file uses the following encoding: utf-8
 #python -m unittest test.connectfour_test
 
+import random
 import unittest
-from gamemodel.connectfour import ConnectFourClassic
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, DROP, POP
 from gamemodel.wrongmoveexception import WrongMoveException
 
 
@@ -25,7 +26,7 @@ class ConnectFourTest(unittest.TestCase):
         expected_board[0][1] = 2
 
         # then
-        self.assertEqual(self.game.board, expected_board)
+        self.assertEqual(self.game.get_board(), expected_board)
 
     def test_should_return_true_when_vertical_win_line(self):
         '''is_winning(1) returns True when the player 1 assembles vertical winning line'''
@@ -126,6 +127,436 @@ class ConnectFourTest(unittest.TestCase):
         # then
         self.assertRaises(WrongMoveException, self.game.drop_move, 0)
 
+    def test_should_throw_wrong_move_exception_when_drop_outside_board(self):
+        '''drop_move() raises WrongMoveException for the columns -1 and column_count, the game stays as it was'''
+        # given
+        self.game.drop_move(3)
+        hash_before = self.game.get_hash()
+
+        # when
+
+        # then
+        for column in (-1, self.game.column_count):
+            self.assertFalse(self.game.is_valid_drop(column))
+            self.assertRaises(WrongMoveException, self.game.drop_move, column)
+        self.assertEqual(self.game.get_hash(), hash_before)
+        self.assertEqual(len(self.game.history), 1)
+        self.assertEqual(self.game.heights, [0, 0, 0, 1, 0, 0, 0])
+
+    def test_should_record_landing_field_when_drop(self):
+        '''drop_move(1) records the row and column the coin landed on as the last move'''
+        # given
+        self.game.board = [[1, 2, 0, 0, 0, 0, 0],
+                           [0, 1, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        self.game.drop_move(1)
+
+        # then
+        self.assertEqual(self.game.last_move, (DROP, 2, 1))
+
+    def test_should_last_move_win_when_diagonal_win_line(self):
+        '''last_move_wins(1) returns True when the last drop completes the diagonal line of the player 1'''
+        # given
+        self.game.board = [[1, 2, 1, 2, 0, 0, 0],
+                           [0, 1, 2, 2, 0, 0, 0],
+                           [0, 0, 1, 1, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        self.game.drop_move(3)
+
+        # then
+        self.assertTrue(self.game.last_move_wins(1))
+        self.assertFalse(self.game.last_move_wins(2))
+
+    def test_should_not_last_move_win_when_no_line_through_last_coin(self):
+        '''last_move_wins(1) returns False when the last drop is away from the other winning line'''
+        # given
+        self.game.board = [[1, 1, 1, 1, 0, 0, 0],
+                           [2, 2, 2, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        self.game.drop_move(6)
+
+        # then
+        self.assertFalse(self.game.last_move_wins(1))
+
+    def test_should_hash_equal_when_same_position_by_different_move_order(self):
+        '''get_hash() is the same for the position reached by two different move orders'''
+        # given
+        other_game = type(self.game)()
+
+        # when
+        for column in (0, 1, 2, 3):
+            self.game.drop_move(column)
+            self.game.change_turns()
+        for column in (2, 3, 0, 1):
+            other_game.drop_move(column)
+            other_game.change_turns()
+
+        # then
+        self.assertEqual(self.game.get_hash(), other_game.get_hash())
+        self.assertNotEqual(self.game.get_hash(), type(self.game)().get_hash())
+
+    def test_should_hash_differ_when_other_player_to_move(self):
+        '''get_hash() depends on which player is to move on the same board'''
+        # given
+        self.game.drop_move(3)
+        hash_before = self.game.get_hash()
+
+        # when
+        self.game.change_turns()
+
+        # then
+        self.assertNotEqual(self.game.get_hash(), hash_before)
+
+    def test_should_canonical_hash_equal_when_mirrored_positions(self):
+        '''get_canonical_hash() is the same for the position and its left-right mirror image'''
+        # given
+        other_game = type(self.game)()
+
+        # when
+        for column in (0, 1, 1, 5):
+            self.game.drop_move(column)
+            self.game.change_turns()
+            other_game.drop_move(6 - column)
+            other_game.change_turns()
+
+        # then
+        self.assertNotEqual(self.game.get_hash(), other_game.get_hash())
+        self.assertEqual(self.game.get_canonical_hash(), other_game.get_canonical_hash())
+
+    def test_should_restore_empty_board_when_all_drops_undone(self):
+        '''undo() after a long sequence of drops restores the starting board, turns and hash'''
+        # given
+        start_hash = self.game.get_hash()
+        columns = [3, 3, 2, 4, 4, 2, 1, 5, 0, 6, 6, 0, 5, 1, 3, 3, 2, 2, 4, 4]
+
+        # when
+        for column in columns:
+            self.game.drop_move(column)
+            self.game.change_turns()
+        for _ in columns:
+            self.game.undo()
+
+        # then
+        self.assertEqual(self.game.get_board(), [[0 for i in range(7)] for i in range(6)])
+        self.assertEqual((self.game.current_player, self.game.next_player), (1, 2))
+        self.assertEqual(self.game.get_hash(), start_hash)
+        self.assertIsNone(self.game.last_move)
+
+    def test_should_throw_index_error_when_nothing_to_undo(self):
+        '''undo() raises IndexError when no move was made'''
+        # given
+
+        # when
+
+        # then
+        self.assertRaises(IndexError, self.game.undo)
+
+    def test_should_return_legal_drops_when_column_full(self):
+        '''legal_moves() and legal_move_mask() leave out the full column'''
+        # given
+        for _ in range(6):
+            self.game.drop_move(2)
+            self.game.change_turns()
+
+        # when
+        moves = self.game.legal_moves()
+        mask = self.game.legal_move_mask()
+
+        # then
+        self.assertEqual(moves, ((DROP, 0), (DROP, 1), (DROP, 3), (DROP, 4), (DROP, 5), (DROP, 6)))
+        self.assertEqual(mask, 0b1111011)
+        self.assertRaises(WrongMoveException, self.game.drop_move, 2)
+
+    def test_should_restore_heights_when_drops_undone(self):
+        '''undo() takes the coins back off the column heights and the coin count'''
+        # given
+        for column in (3, 3, 4):
+            self.game.drop_move(column)
+            self.game.change_turns()
+
+        # when
+        heights = list(self.game.heights)
+        self.game.undo()
+        self.game.undo()
+
+        # then
+        self.assertEqual(heights, [0, 0, 0, 2, 1, 0, 0])
+        self.assertEqual(self.game.heights, [0, 0, 0, 1, 0, 0, 0])
+        self.assertEqual(self.game.coin_count, 1)
+
+    def test_should_have_69_winning_lines_when_standard_board(self):
+        '''The 6x7 board of the connect four has 69 winning lines'''
+        # given
+
+        # when
+        lines = self.game.winning_lines
+
+        # then
+        self.assertEqual(len(lines), 69)
+        self.assertEqual(len(self.game.field_lines[0][0]), 3)
+        self.assertEqual(len(self.game.field_lines[2][3]), 13)
+
+    def test_should_not_win_with_four_when_connect_five(self):
+        '''On the 7x9 board of the connect five four coins in a row do not win, the fifth one does'''
+        # given
+        self.game = type(self.game)(7, 9, 5)
+        for column in (2, 2, 3, 3, 4, 4, 5, 5):
+            self.game.drop_move(column)
+            self.game.change_turns()
+
+        # when
+        four_wins = self.game.is_winning(1)
+        self.game.drop_move(6)
+
+        # then
+        self.assertFalse(four_wins)
+        self.assertTrue(self.game.is_winning(1))
+        self.assertEqual(self.game.get_game_state(), 1)
+        self.assertEqual(len(self.game.board), 7)
+        self.assertEqual(len(self.game.board[0]), 9)
+
+    def test_should_fill_board_when_small_board(self):
+        '''All the fields of the 4x5 board of the connect three can be filled'''
+        # given
+        self.game = type(self.game)(4, 5, 3)
+        columns = [0, 1, 2, 3, 4] * 2 + [1, 0, 3, 2, 4] * 2
+
+        # when
+        for column in columns:
+            self.game.drop_move(column)
+            self.game.change_turns()
+
+        # then
+        self.assertTrue(self.game.is_board_full())
+        self.assertEqual(self.game.legal_moves(), ())
+
+    def test_should_throw_value_error_when_line_longer_than_board(self):
+        '''The game cannot be created when the winning line does not fit on the board'''
+        # given
+
+        # when
+
+        # then
+        self.assertRaises(ValueError, type(self.game), 4, 4, 5)
+
+    def test_should_not_count_positions_when_classic(self):
+        '''The Classic drops never bring a position back, so the moves only go to the history'''
+        # given
+
+        # when
+        for column in [3, 3, 2, 4]:
+            self.game.drop_move(column)
+            self.game.change_turns()
+        self.game.undo()
+
+        # then
+        self.assertEqual(len(self.game.history), 3)
+        self.assertEqual(self.game.position_keys, [])
+        self.assertEqual(self.game.position_counts, {})
+        self.assertFalse(self.game.is_repetition())
+
+
+class ConnectFourPopOutTest(unittest.TestCase):
+    '''TestCase class for testing the ConnectFourPopOut functionalities'''
+
+    def setUp(self):
+        self.game = ConnectFourPopOut()
+
+    def test_should_last_move_win_for_other_player_when_pop(self):
+        '''last_move_wins(1) returns True when the pop of the player 2 shifts down the line of the player 1'''
+        # given
+        self.game.board = [[1, 1, 1, 2, 0, 0, 0],
+                           [2, 2, 2, 1, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        self.game.change_turns()
+
+        # when
+        self.game.pop_move(3)
+
+        # then
+        self.assertEqual(self.game.last_move, (POP, 0, 3))
+        self.assertTrue(self.game.last_move_wins(1))
+        self.assertFalse(self.game.last_move_wins(2))
+
+    def test_should_update_hash_when_pop_shifts_column(self):
+        '''get_hash() after pop_move(0) equals the hash computed from scratch for the shifted board'''
+        # given
+        self.game.board = [[1, 2, 0, 0, 0, 0, 0],
+                           [2, 1, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        other_game = type(self.game)()
+
+        # when
+        self.game.pop_move(0)
+        other_game.board = [list(row) for row in self.game.board]
+
+        # then
+        self.assertEqual(self.game.get_hash(), other_game.get_hash())
+        self.assertEqual(self.game.get_canonical_hash(), other_game.get_canonical_hash())
+
+    def test_should_throw_wrong_move_exception_when_pop_outside_board(self):
+        '''pop_move() raises WrongMoveException for the columns -1 and column_count, the game stays as it was'''
+        # given
+        self.game.board = [[1, 1, 1, 1, 1, 1, 1],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+
+        # then
+        for column in (-1, self.game.column_count):
+            self.assertFalse(self.game.is_valid_pop(column))
+            self.assertRaises(WrongMoveException, self.game.pop_move, column)
+        self.assertEqual(self.game.history, [])
+        self.assertEqual(self.game.get_board()[0], [1] * 7)
+
+    def test_should_restore_every_position_when_drops_and_pops_undone(self):
+        '''undo() after a long random sequence of drops and pops restores each position in turn'''
+        # given
+        rng = random.Random(3)
+        positions = []
+
+        # when
+        for _ in range(200):
+            moves = [(self.game.drop_move, column) for column in range(7) if self.game.is_valid_drop(column)]
+            moves += [(self.game.pop_move, column) for column in range(7) if self.game.is_valid_pop(column)]
+            positions.append(([list(row) for row in self.game.board], self.game.current_player,
+                              self.game.get_hash(), self.game.last_move))
+            move, column = rng.choice(moves)
+            move(column)
+            self.game.change_turns()
+
+        # then
+        for position in reversed(positions):
+            self.game.undo()
+            self.assertEqual(([list(row) for row in self.game.board], self.game.current_player,
+                              self.game.get_hash(), self.game.last_move), position)
+        self.assertRaises(IndexError, self.game.undo)
+
+    def test_should_return_pops_in_mask_when_own_bottom_coins(self):
+        '''legal_move_mask() sets the pop bits of the columns with the current player's bottom coin'''
+        # given
+        self.game.board = [[1, 2, 1, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        mask = self.game.legal_move_mask()
+        self.game.pop_move(0)
+
+        # then
+        self.assertEqual(mask, 0b0000101_1111110)
+        self.assertEqual(self.game.heights, [5, 1, 1, 0, 0, 0, 0])
+        self.assertIn((DROP, 0), self.game.legal_moves())
+
+    def play_cycle(self, moves):
+        '''Makes the @moves cycling the same coins in and out until the game ends, returns the move count'''
+        for count in range(1, 100):
+            self.game.make_move(moves[(count - 1) % len(moves)])
+            if self.game.get_game_state() is not None:
+                return count
+            self.game.change_turns()
+        return None
+
+    def test_should_draw_when_position_repeated_three_times(self):
+        '''get_game_state() returns 0 when the drops and pops reach the same position for the third time'''
+        # given
+        moves = [(DROP, 0), (DROP, 1), (POP, 0), (POP, 1)]
+
+        # when
+        count = self.play_cycle(moves)
+
+        # then
+        # the empty board the game starts from comes back after the moves 4 and 8
+        self.assertEqual(count, 8)
+        self.assertEqual(self.game.get_game_state(), 0)
+        self.assertTrue(self.game.is_repetition())
+
+    def test_should_draw_when_loaded_position_repeated_three_times(self):
+        '''The position set with the board setter counts as reached once, so it draws when reached twice more'''
+        # given
+        self.game.board = [[1, 2, 0, 0, 0, 0, 0],
+                           [2, 1, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        moves = [(DROP, 3), (DROP, 4), (POP, 3), (POP, 4)]
+
+        # when
+        count = self.play_cycle(moves)
+
+        # then
+        self.assertEqual(count, 8)
+        self.assertEqual(self.game.position_counts[self.game.get_position_key()], 3)
+
+    def test_should_forget_position_when_repeating_move_undone(self):
+        '''undo() takes the position back out of the history, so it is not repeated any more'''
+        # given
+        moves = [(DROP, 0), (DROP, 1), (POP, 0), (POP, 1)]
+        self.play_cycle(moves)
+
+        # when
+        self.game.undo()
+
+        # then
+        self.assertFalse(self.game.is_repetition())
+        self.assertEqual(sorted(self.game.position_counts.values()), [2, 2, 2, 2])
+
+    def test_should_draw_when_move_limit_reached(self):
+        '''get_game_state() returns 0 after the move limit of the game without a winner'''
+        # given
+        self.game = type(self.game)(move_limit=5)
+        moves = [(DROP, 0), (DROP, 1), (DROP, 2), (DROP, 3), (DROP, 5)]
+
+        # when
+        count = self.play_cycle(moves)
+
+        # then
+        self.assertEqual(count, 5)
+
+    def test_should_draw_when_full_board_and_no_pop(self):
+        '''get_game_state() returns 0 when the board is full and the next player has no coin to pop'''
+        # given
+        # the bottom row of the narrow board is not a line, so it can be full of the coins of one player
+        self.game = type(self.game)(4, 3)
+        self.game.board = [[1, 1, 1],
+                           [2, 2, 2],
+                           [1, 1, 1],
+                           [2, 2, 0]]
+
+        # when
+        self.game.drop_move(2)
+
+        # then
+        self.assertEqual(self.game.get_game_state(), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
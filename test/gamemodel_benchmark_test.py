@@ -0,0 +1,64 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.gamemodel_benchmark_test
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmark.gamemodel_benchmark import REFERENCE, main, run_benchmarks
+from gamemodel.connectfour import CLASSIC, POPOUT
+
+
+class GameModelBenchmarkTest(unittest.TestCase):
+    '''TestCase class running the game model benchmarks on the tiny amounts of work'''
+
+    def run_main(self, *args):
+        '''Returns the (exit status, printed text) of the benchmark run with the command line @args'''
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(['--implementation', 'list', '--benchmark', 'is_board_full', '--repeat', '1', *args])
+        return status, output.getvalue()
+
+    def test_should_report_regression_when_slower_than_saved_baseline(self):
+        '''--save writes the results that --baseline compares with, a much faster baseline is a regression'''
+        with tempfile.TemporaryDirectory() as directory:
+            # given
+            path = os.path.join(directory, 'baseline.json')
+            saved_status, _ = self.run_main('--save', path)
+            with open(path) as file:
+                saved = json.load(file)
+            faster_path = os.path.join(directory, 'faster.json')
+            with open(faster_path, 'w') as file:
+                json.dump({'list': {rules: {name: 100 * value for name, value in values.items()}
+                                    for rules, values in saved['list'].items()}}, file)
+
+            # when
+            status, text = self.run_main('--baseline', path, '--threshold', '0.99')
+            regressed_status, regressed_text = self.run_main('--baseline', faster_path)
+
+            # then
+            self.assertEqual(saved_status, 0)
+            self.assertEqual(sorted(saved['list']), [CLASSIC, POPOUT])
+            self.assertGreater(saved['list'][CLASSIC]['is_board_full'], 0)
+            self.assertEqual(status, 0)
+            self.assertNotIn('REGRESSION', text)
+            self.assertEqual(regressed_status, 1)
+            self.assertEqual(regressed_text.count('REGRESSION'), 2)
+
+    def test_should_run_only_old_api_benchmarks_when_reference(self):
+        '''The frozen reference classes play the random games and skip the benchmarks they have no API for'''
+        # given
+
+        # when
+        results = run_benchmarks([REFERENCE], ['random_games', 'legal_moves', 'search'], repeat=1)
+
+        # then
+        for rules in (CLASSIC, POPOUT):
+            self.assertEqual(list(results[REFERENCE][rules]), ['random_games'])
+            self.assertGreater(results[REFERENCE][rules]['random_games'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.gamerecord_test
+
+import os
+import random
+import tempfile
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT, DROP, POP
+from gamemodel.gamerecord import (GameRecord, GameRecordError, GameRecordReader, GameRecordWriter,
+                                  get_record, replay)
+
+
+class GameRecordTest(unittest.TestCase):
+    '''TestCase class for testing the game record writer, reader and replay'''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.c4gr')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def play_random_game(self, game, rng):
+        '''Plays random moves in the @game until it ends or 100 moves are made'''
+        for _ in range(100):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.make_move(rng.choice(moves))
+            if game.get_game_state() is not None:
+                break
+            game.change_turns()
+        return game
+
+    def test_should_read_same_records_when_written(self):
+        '''GameRecordReader streams the records in the order GameRecordWriter wrote them'''
+        # given
+        rng = random.Random(5)
+        records = [get_record(self.play_random_game(game_class(), rng))
+                   for game_class in (ConnectFourClassic, ConnectFourPopOut) * 50]
+
+        # when
+        with GameRecordWriter(self.path) as writer:
+            for record in records:
+                writer.write(record)
+        with GameRecordReader(self.path) as reader:
+            read_records = list(reader)
+
+        # then
+        self.assertEqual(read_records, records)
+
+    def test_should_pack_two_moves_per_byte_when_seven_columns(self):
+        '''the record of 10 moves takes 1 header byte, 1 length byte and 5 bytes of moves'''
+        # given
+        record = GameRecord(POPOUT, None, ((DROP, 6), (POP, 6)) * 5)
+
+        # when
+        with GameRecordWriter(self.path) as writer:
+            writer.write(record)
+
+        # then
+        self.assertEqual(os.path.getsize(self.path), 8 + 1 + 1 + 5)
+
+    def test_should_get_single_game_when_random_access(self):
+        '''GameRecordReader returns the game N through the index, also after appending to the file'''
+        # given
+        records = [GameRecord(CLASSIC, 0, tuple((DROP, column % 7) for column in range(count)))
+                   for count in range(300)]
+
+        # when
+        with GameRecordWriter(self.path) as writer:
+            for record in records[:150]:
+                writer.write(record)
+        with GameRecordWriter(self.path) as writer:
+            for record in records[150:]:
+                writer.write(record)
+
+        # then
+        with GameRecordReader(self.path) as reader:
+            self.assertEqual(len(reader), 300)
+            self.assertEqual(reader[200], records[200])
+            self.assertEqual(reader[-1], records[-1])
+            self.assertRaises(IndexError, reader.__getitem__, 300)
+
+    def test_should_reproduce_game_when_replayed(self):
+        '''replay() yields the game reaching the same board and result as the recorded game'''
+        # given
+        game = self.play_random_game(ConnectFourPopOut(), random.Random(8))
+        record = get_record(game)
+
+        # when
+        games = list(replay(record, ConnectFourBitboardPopOut))
+
+        # then
+        self.assertEqual(len(games), len(record.moves))
+        self.assertEqual(games[-1].get_board(), game.get_board())
+        self.assertEqual(games[-1].get_game_state(), record.result)
+
+    def test_should_throw_game_record_error_when_other_board_size(self):
+        '''GameRecordWriter refuses to append the games of another board size'''
+        # given
+        GameRecordWriter(self.path).close()
+
+        # when
+
+        # then
+        self.assertRaises(GameRecordError, GameRecordWriter, self.path, 7, 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
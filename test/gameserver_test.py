@@ -0,0 +1,212 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.gameserver_test
+
+import unittest
+from gamemodel.connectfour import CLASSIC, POPOUT
+from server.gameserver import GameServer, MAX_WRITE_BUFFER_SIZE, send
+from server.loadclient import GameClient, run_load
+
+
+class StalledWriter:
+    '''Stands for the connection whose peer stopped reading, @buffered bytes wait to be sent'''
+    def __init__(self, buffered):
+        '''Initialize the open connection with the @buffered bytes already waiting'''
+        self.transport = self
+        self.buffered = buffered
+        self.written = []
+        self.closed = False
+
+    def get_write_buffer_size(self):
+        '''Returns the number of the bytes waiting to be sent'''
+        return self.buffered
+
+    def is_closing(self):
+        '''Returns True after the connection was closed'''
+        return self.closed
+
+    def write(self, data):
+        '''Queues the @data, none of it is sent'''
+        self.written.append(data)
+        self.buffered += len(data)
+
+    def close(self):
+        '''Closes the connection'''
+        self.closed = True
+
+
+class SendTest(unittest.TestCase):
+    '''TestCase class for testing the bounded writes to the connections'''
+
+    def test_should_close_connection_when_write_buffer_full(self):
+        '''send() closes the connection whose unsent messages take more than MAX_WRITE_BUFFER_SIZE bytes'''
+        # given
+        reading = StalledWriter(0)
+        stalled = StalledWriter(MAX_WRITE_BUFFER_SIZE + 1)
+
+        # when
+        send(reading, {'type': 'state'})
+        send(stalled, {'type': 'state'})
+        send(stalled, {'type': 'state'})
+
+        # then
+        self.assertEqual(reading.written, [b'{"type": "state"}\n'])
+        self.assertFalse(reading.closed)
+        self.assertEqual(stalled.written, [])
+        self.assertTrue(stalled.closed)
+
+
+class GameServerTest(unittest.IsolatedAsyncioTestCase):
+    '''TestCase class for testing the asyncio game server with real localhost connections'''
+
+    async def asyncSetUp(self):
+        self.server = GameServer(idle_timeout=60)
+        self.port = await self.server.start()
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        await self.server.close()
+
+    async def connect(self):
+        '''Returns a new client connected to the server'''
+        client = await GameClient.connect('127.0.0.1', self.port)
+        self.clients.append(client)
+        return client
+
+    async def start_game(self, rules=CLASSIC):
+        '''Returns both clients and their joined messages of a new game'''
+        first, second = await self.connect(), await self.connect()
+        await first.send({'type': 'create', 'rules': rules})
+        first_joined = await first.receive('joined')
+        await second.send({'type': 'join', 'game': first_joined['game']})
+        second_joined = await second.receive('joined')
+        return first, second, first_joined, second_joined
+
+    async def test_should_push_state_to_both_players_when_drop(self):
+        '''The drop of the player 1 is pushed to both players'''
+        # given
+        first, second, first_joined, second_joined = await self.start_game()
+
+        # when
+        await first.send({'type': 'move', 'kind': 'drop', 'column': 3})
+        first_state = await first.receive_state(1)
+        second_state = await second.receive_state(1)
+
+        # then
+        self.assertEqual((first_joined['player'], second_joined['player']), (1, 2))
+        self.assertEqual(first_state, second_state)
+        self.assertEqual(first_state['board'][0], [0, 0, 0, 1, 0, 0, 0])
+        self.assertEqual(first_state['current_player'], 2)
+        self.assertEqual(first_state['last_move'], ['drop', 0, 3])
+
+    async def test_should_answer_error_when_wrong_move(self):
+        '''The server rejects the moves out of turn, on the full column and the pops in Classic'''
+        # given
+        first, second, *_ = await self.start_game()
+        for move in range(6):
+            client = first if move % 2 == 0 else second
+            await client.send({'type': 'move', 'kind': 'drop', 'column': 0})
+            await client.receive_state(move + 1)
+
+        # when
+        await second.send({'type': 'move', 'kind': 'drop', 'column': 1})
+        not_your_turn = await second.receive('error')
+        await first.send({'type': 'move', 'kind': 'drop', 'column': 0})
+        full_column = await first.receive('error')
+        await first.send({'type': 'move', 'kind': 'pop', 'column': 1})
+        classic_pop = await first.receive('error')
+
+        # then
+        self.assertEqual(not_your_turn['message'], 'It is not your turn')
+        self.assertEqual(full_column, {'type': 'error', 'message': "1 -> Can't make a move on chosen column!"})
+        self.assertEqual(classic_pop['message'], "2 -> Can't make a move on chosen column!")
+        self.assertEqual(len(self.server.sessions[1].game.history), 6)
+
+    async def test_should_take_seat_back_when_reconnect_with_token(self):
+        '''The player coming back with the token of the seat gets the game state and can move on'''
+        # given
+        first, second, first_joined, _ = await self.start_game(POPOUT)
+        await first.send({'type': 'move', 'kind': 'drop', 'column': 2})
+        await second.receive_state(1)
+        await first.close()
+        third = await self.connect()
+
+        # when
+        await third.send({'type': 'reconnect', 'game': first_joined['game'], 'token': 'wrong'})
+        rejected = await third.receive('joined')
+        await third.send({'type': 'reconnect', 'game': first_joined['game'], 'token': first_joined['token']})
+        joined = await third.receive('joined')
+        state = await third.receive_state(1)
+
+        # then
+        self.assertEqual(rejected['type'], 'error')
+        self.assertEqual(joined['player'], 1)
+        self.assertEqual(state['board'][0][2], 1)
+        self.assertEqual(state['current_player'], 2)
+
+    async def test_should_evict_session_when_idle(self):
+        '''The game without any request for longer than the idle timeout is evicted'''
+        # given
+        first, second, first_joined, _ = await self.start_game()
+
+        # when
+        evicted = self.server.evict_idle_sessions(self.server.get_time() + 61)
+        message = await second.receive('evicted')
+        await first.send({'type': 'join', 'game': first_joined['game']})
+        error = await first.receive('joined')
+        await first.send({'type': 'move', 'kind': 'drop', 'column': 3})
+        move_error = await first.receive('state')
+
+        # then
+        self.assertEqual(evicted, 1)
+        self.assertEqual(message, {'type': 'evicted', 'game': first_joined['game']})
+        self.assertEqual(self.server.sessions, {})
+        self.assertEqual(error, {'type': 'error', 'message': 'There is no such game'})
+        self.assertEqual(move_error, {'type': 'error', 'message': 'The game was evicted'})
+
+    async def test_should_answer_error_when_malformed_fields(self):
+        '''The requests with the fields of wrong types get the error answers and the connection stays open'''
+        # given
+        first, second, first_joined, _ = await self.start_game()
+        requests = [{'type': ['move']},
+                    {'type': 'create', 'rules': {'name': 'Classic'}},
+                    {'type': 'join', 'game': [first_joined['game']]},
+                    {'type': 'reconnect', 'game': first_joined['game'], 'token': 'żeton'},
+                    {'type': 'reconnect', 'game': first_joined['game'], 'token': 7}]
+        client = await self.connect()
+
+        # when
+        errors = []
+        for request in requests:
+            await client.send(request)
+            errors.append(await client.receive('error'))
+        await first.send({'type': 'move', 'kind': 'drop', 'column': True})
+        column_error = await first.receive('error')
+        await first.send({'type': 'move', 'kind': 'drop', 'column': 3})
+        state = await second.receive_state(1)
+
+        # then
+        self.assertEqual([error['type'] for error in errors], ['error'] * len(requests))
+        self.assertEqual(errors[2]['message'], "The field 'game' has to be of the type int")
+        self.assertEqual(errors[3]['message'], 'The token does not match any seat of the game')
+        self.assertEqual(column_error['message'], "The field 'column' has to be of the type int")
+        self.assertEqual(state['board'][0][3], 1)
+
+    async def test_should_report_latency_percentiles_when_load(self):
+        '''run_load() plays the concurrent random games and reports the latency of every move'''
+        # given
+
+        # when
+        summary = await run_load('127.0.0.1', self.port, games=10, max_moves=20, seed=1)
+
+        # then
+        self.assertEqual(summary['errors'], 0)
+        self.assertGreater(summary['moves'], 10 * 6)
+        self.assertLessEqual(summary['p50_ms'], summary['p90_ms'])
+        self.assertLessEqual(summary['p90_ms'], summary['p99_ms'])
+        self.assertEqual(len(self.server.sessions), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
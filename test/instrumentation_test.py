@@ -0,0 +1,132 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.instrumentation_test
+
+import io
+import os
+import pstats
+import tempfile
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardBase, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourBase, ConnectFourClassic, ConnectFourPopOut
+from gamemodel.instrumentation import Instrumentation, LatencyHistogram
+from gamemodel.wrongmoveexception import WrongMoveException
+
+
+class InstrumentationTest(unittest.TestCase):
+    '''TestCase class for testing the timing of the game model methods'''
+
+    def setUp(self):
+        self.output = io.StringIO()
+        self.instrumentation = Instrumentation(output=self.output)
+
+    def tearDown(self):
+        self.instrumentation.detach()
+
+    def test_should_count_calls_when_attached(self):
+        '''The calls of the attached methods are counted by the class defining them, the moves too'''
+        # given
+        self.instrumentation.attach_game_model()
+        game = ConnectFourPopOut()
+        bitboard_game = ConnectFourBitboardPopOut()
+
+        # when
+        for column in (0, 0, 1):
+            game.drop_move(column)
+            bitboard_game.drop_move(column)
+        game.pop_move(0)
+        game.is_board_full()
+
+        # then
+        summary = self.instrumentation.get_summary()
+        self.assertEqual(summary['ConnectFourBase.drop_move']['calls'], 3)
+        self.assertEqual(summary['ConnectFourBitboardBase.drop_move']['calls'], 3)
+        self.assertEqual(summary['ConnectFourPopOut.pop_move']['calls'], 1)
+        self.assertEqual(summary['ConnectFourBase.is_board_full']['calls'], 1)
+        self.assertEqual(self.instrumentation.moves, 7)
+
+    def test_should_restore_methods_when_detached(self):
+        '''detach() puts back the very same method objects, the disabled instrumentation costs nothing'''
+        # given
+        originals = [(cls, dict(cls.__dict__)) for cls in (ConnectFourBase, ConnectFourPopOut, ConnectFourBitboardBase)]
+        self.instrumentation.attach_game_model()
+
+        # when
+        self.instrumentation.detach()
+
+        # then
+        for cls, attributes in originals:
+            for name in ('drop_move', 'pop_move', 'is_winning', 'is_board_full'):
+                self.assertIs(cls.__dict__.get(name), attributes.get(name))
+
+    def test_should_time_call_when_move_raises(self):
+        '''The failed move is timed and the exception passes through, it is not counted as a move'''
+        # given
+        self.instrumentation.attach_game_model()
+        game = ConnectFourClassic()
+        for _ in range(6):
+            game.drop_move(0)
+
+        # when
+        with self.assertRaises(WrongMoveException):
+            game.drop_move(0)
+
+        # then
+        self.assertEqual(self.instrumentation.get_summary()['ConnectFourBase.drop_move']['calls'], 7)
+        self.assertEqual(self.instrumentation.moves, 6)
+
+    def test_should_write_summary_when_interval_of_moves(self):
+        '''The summary is written after every summary_interval moves'''
+        # given
+        self.instrumentation.summary_interval = 2
+        self.instrumentation.attach_game_model()
+        game = ConnectFourClassic()
+
+        # when
+        for column in range(5):
+            game.drop_move(column)
+
+        # then
+        self.assertEqual(self.output.getvalue().count('after '), 2)
+        self.assertIn('after 4 moves:', self.output.getvalue())
+
+    def test_should_profile_window_when_profile_moves(self):
+        '''The cProfile window closes by itself after the given number of moves and dumps the pstats'''
+        # given
+        self.instrumentation.attach_game_model()
+        game = ConnectFourClassic()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'moves.pstats')
+
+            # when
+            self.instrumentation.profile_moves(3, path)
+            for column in range(5):
+                game.drop_move(column)
+
+            # then
+            self.assertIsNone(self.instrumentation.profiler)
+            stats = pstats.Stats(path, stream=io.StringIO())
+            drops = [calls for (file, line, name), (calls, *_) in stats.stats.items() if name == 'drop_move']
+            self.assertEqual(drops, [3])
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    '''TestCase class for testing the power of two latency buckets'''
+
+    def test_should_bound_percentiles_when_latencies_added(self):
+        '''The percentiles are the upper bounds of their buckets, never above the maximum'''
+        # given
+        histogram = LatencyHistogram()
+
+        # when
+        for nanoseconds in [100] * 98 + [5000, 70000]:
+            histogram.add(nanoseconds)
+
+        # then
+        self.assertEqual(histogram.get_percentile(50), 127)
+        self.assertEqual(histogram.get_percentile(99), 8191)
+        self.assertEqual(histogram.get_percentile(100), 70000)
+        self.assertEqual(histogram.get_stats()['calls'], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.mcts_test
+
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, DROP, POP
+from gamemodel.solver.mcts import MCTSPlayer, get_rollout_state, rollout
+
+
+class MCTSPlayerTest(unittest.TestCase):
+    '''TestCase class for testing the MCTSPlayer functionalities'''
+
+    def setUp(self):
+        self.game = ConnectFourClassic()
+
+    def test_should_drop_on_winning_column_when_immediate_win(self):
+        '''choose_move() returns the drop completing the horizontal line of the current player'''
+        # given
+        self.game.board = [[1, 1, 1, 0, 0, 0, 0],
+                           [2, 2, 2, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        player = MCTSPlayer(iterations=300, seed=1)
+
+        # when
+        move = player.choose_move(self.game)
+
+        # then
+        self.assertEqual(move, (DROP, 3))
+
+    def test_should_pop_when_pop_wins(self):
+        '''choose_move() returns the pop that shifts down the winning line of the current player'''
+        # given
+        game = ConnectFourPopOut()
+        game.board = [[1, 2, 2, 1, 2, 0, 0],
+                      [2, 1, 1, 2, 1, 0, 0],
+                      [1, 0, 0, 1, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0, 0, 0]]
+        player = MCTSPlayer(iterations=500, seed=1)
+
+        # when
+        move = player.choose_move(game)
+
+        # then
+        self.assertEqual(move, (POP, 3))
+
+    def test_should_reuse_tree_when_opponent_replied(self):
+        '''search() starts from the statistics gathered for the position reached by the reply'''
+        # given
+        player = MCTSPlayer(iterations=200, seed=1)
+        move = player.choose_move(self.game)
+        self.game.make_move(move)
+        self.game.change_turns()
+        self.game.drop_move(0)
+        self.game.change_turns()
+        reused_visits = [child for child in player.root.children if child.move == move][0].children
+        reused_visits = sum(child.visits for child in reused_visits if child.move == (DROP, 0))
+
+        # when
+        player.search(self.game)
+
+        # then
+        self.assertGreater(reused_visits, 0)
+        self.assertGreaterEqual(player.root.visits, reused_visits + 200)
+
+    def test_should_report_rollouts_when_process_pool(self):
+        '''search() with two worker processes plays the rollouts and reports their rate'''
+        # given
+        game = ConnectFourBitboardPopOut()
+
+        # when
+        with MCTSPlayer(iterations=64, workers=2, seed=1) as player:
+            result = player.search(game)
+
+        # then
+        self.assertIn(result.move, game.legal_moves())
+        self.assertEqual(result.rollouts, 64)
+        self.assertGreater(result.rollouts_per_second, 0)
+
+    def test_should_draw_rollout_when_move_limit_reached(self):
+        '''rollout() counts the game as drawn when it does not end within the move limit'''
+        # given
+        state = get_rollout_state(self.game)
+
+        # when
+        winner = rollout(state, seed=1, max_moves=3)
+
+        # then
+        self.assertEqual(winner, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.moveprovider_test
+
+import unittest
+from gamemodel.connectfour import ConnectFourClassic
+from gamemodel.solver import Solver
+try:
+    from interface.moveprovider import SolverMoveProvider
+except ImportError:
+    SolverMoveProvider = None
+
+
+@unittest.skipIf(SolverMoveProvider is None, 'PySide2 is not installed')
+class SolverMoveProviderTest(unittest.TestCase):
+    '''TestCase class running the computer player's search of the move provider on the test thread'''
+
+    def run_provider(self, cancel, solver=None):
+        '''Runs the search of a new provider (cancelled before it starts if @cancel) with the @solver,
+        returns the finished results and the failed messages'''
+        provider = SolverMoveProvider(solver or Solver(table_size=1 << 12), ConnectFourClassic(), 0.05)
+        results, messages = [], []
+        provider.signals.finished.connect(results.append)
+        provider.signals.failed.connect(messages.append)
+        if cancel:
+            provider.cancel()
+        provider.run()
+        return results, messages
+
+    def test_should_emit_finished_with_result_when_search_done(self):
+        '''run() sends the SearchResult of the search by the finished signal'''
+        # given
+
+        # when
+        results, messages = self.run_provider(cancel=False)
+
+        # then
+        self.assertEqual(len(results), 1)
+        self.assertIsNotNone(results[0].column)
+        self.assertEqual(messages, [])
+
+    def test_should_emit_finished_with_none_when_cancelled(self):
+        '''run() of the cancelled search still sends the finished signal, with None'''
+        # given
+
+        # when
+        results, messages = self.run_provider(cancel=True)
+
+        # then
+        self.assertEqual(results, [None])
+        self.assertEqual(messages, [])
+
+    def test_should_emit_failed_and_finished_when_search_raises(self):
+        '''run() of the failing search sends the error message by the failed signal and then None as finished'''
+        # given
+        solver = Solver(table_size=1 << 12)
+        solver.search = lambda *args, **kwargs: 1 / 0
+
+        # when
+        results, messages = self.run_provider(cancel=False, solver=solver)
+
+        # then
+        self.assertEqual(results, [None])
+        self.assertEqual(messages, ['division by zero'])
+
+
+if __name__ == "__main__":
+    unittest.main()
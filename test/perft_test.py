@@ -0,0 +1,102 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.perft_test
+
+import unittest
+from gamemodel.connectfour import CLASSIC, POPOUT, DROP, POP
+from gamemodel.perft import Perft, REFERENCE_COUNTS, IMPLEMENTATIONS, get_game, parse_moves, run_perft
+
+
+class PerftTest(unittest.TestCase):
+    '''TestCase class checking the game implementations against the reference move tree counts'''
+
+    def test_should_match_reference_counts_when_every_implementation(self):
+        '''Every implementation of both rules gives the reference counts of the first depths'''
+        for implementation in IMPLEMENTATIONS:
+            for rules, depth in ((CLASSIC, 5), (POPOUT, 4)):
+                # given
+                game = get_game(rules, implementation)
+
+                for current_depth in range(1, depth + 1):
+                    # when
+                    counts = Perft().count(game, current_depth)
+
+                    # then
+                    with self.subTest(implementation=implementation, rules=rules, depth=current_depth):
+                        self.assertEqual(tuple(counts), REFERENCE_COUNTS[rules][current_depth - 1])
+                        self.assertEqual(game.history, [])
+
+    def test_should_count_wins_when_cache_used(self):
+        '''The cached subtree counts give the same counts as the whole tree walk, also with the wins'''
+        # given
+        game = get_game(CLASSIC, moves=parse_moves('3,3,2,2,4'))
+        perft = Perft()
+
+        # when
+        cached = perft.count(game, 4)
+        uncached = Perft(cache_size=0).count(game, 4)
+
+        # then
+        self.assertEqual(cached, uncached)
+        self.assertGreater(cached.wins, 0)
+        self.assertGreater(perft.hits, 0)
+
+    def test_should_count_draws_when_board_fills(self):
+        '''The draws on the full board are counted on the small board'''
+        # given
+        game = get_game(CLASSIC, geometry=(2, 3, 3), moves=[(DROP, 0)])
+
+        # when
+        counts = Perft().count(game, 5)
+
+        # then
+        self.assertEqual(counts.draws + counts.wins, counts.nodes)
+        self.assertGreater(counts.draws, 0)
+
+    def test_should_count_repetition_draws_when_popout_cycles(self):
+        '''After a drop, drop, pop, pop cycle back to the empty board every such cycle draws the game'''
+        for implementation in IMPLEMENTATIONS:
+            # given
+            game = get_game(POPOUT, implementation, moves=parse_moves('0,0,p0,p0'))
+
+            # when
+            counts = Perft().count(game, 4)
+
+            # then
+            with self.subTest(implementation=implementation):
+                self.assertEqual(counts.nodes, REFERENCE_COUNTS[POPOUT][3][0])
+                self.assertEqual(counts.draws, 7 * 7)
+
+    def test_should_give_same_counts_when_parallel(self):
+        '''Splitting the root moves across the processes gives the same counts'''
+        # given
+        game = get_game(POPOUT, 'bitboard', moves=parse_moves('3,3,p3'))
+
+        # when
+        single = run_perft(game, 3, implementation='bitboard')
+        parallel = run_perft(game, 3, workers=2, implementation='bitboard')
+
+        # then
+        self.assertEqual((single['nodes'], single['wins'], single['draws']),
+                         (parallel['nodes'], parallel['wins'], parallel['draws']))
+        self.assertEqual(parse_moves('3,3,p3'), [(DROP, 3), (DROP, 3), (POP, 3)])
+
+    def test_should_give_same_draws_when_parallel_from_history(self):
+        '''The workers replay the moves to the root, so they count the same repetition draws'''
+        for implementation in IMPLEMENTATIONS:
+            # given
+            game = get_game(POPOUT, implementation, moves=parse_moves('0,0,p0,p0'))
+
+            # when
+            single = run_perft(game, 4, implementation=implementation)
+            parallel = run_perft(game, 4, workers=2, implementation=implementation)
+
+            # then
+            with self.subTest(implementation=implementation):
+                self.assertEqual((single['nodes'], single['wins'], single['draws']),
+                                 (parallel['nodes'], parallel['wins'], parallel['draws']))
+                self.assertEqual(parallel['draws'], 7 * 7)
+                self.assertEqual(len(game.history), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.position_test
+
+import pickle
+import random
+import sys
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut, CLASSIC, POPOUT
+from gamemodel.position import Position, PositionArray
+
+
+class PositionTest(unittest.TestCase):
+    '''TestCase class for testing the packed Position functionalities'''
+
+    def play_random_moves(self, game, count, seed):
+        '''Makes @count random moves in the @game (fewer if the game ends), returns the @game'''
+        rng = random.Random(seed)
+        for _ in range(count):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.make_move(rng.choice(moves))
+            if game.get_game_state() is not None:
+                break
+            game.change_turns()
+        return game
+
+    def test_should_restore_game_when_converted_back(self):
+        '''to_game() restores the board, the player to move and the rules of random positions'''
+        for seed in range(50):
+            # given
+            game = self.play_random_moves(ConnectFourPopOut(), seed, seed)
+
+            # when
+            position = Position.from_game(game)
+            restored = position.to_game()
+
+            # then
+            self.assertEqual(restored.get_board(), game.get_board())
+            self.assertEqual(restored.current_player, game.current_player)
+            self.assertEqual(restored.rules, POPOUT)
+            self.assertEqual(restored.get_hash(), game.get_hash())
+            self.assertEqual(position.get_heights(), game.heights)
+
+    def test_should_be_equal_when_same_position_of_list_and_bitboard_games(self):
+        '''The list and the bitboard games of the same position give the same Position'''
+        # given
+        game = self.play_random_moves(ConnectFourClassic(), 15, 4)
+        bitboard_game = ConnectFourBitboardClassic()
+        bitboard_game.board = game.get_board()
+        bitboard_game.current_player, bitboard_game.next_player = game.current_player, game.next_player
+
+        # when
+        position = Position.from_game(game)
+
+        # then
+        self.assertEqual(position, Position.from_game(bitboard_game))
+        self.assertEqual(len({position, Position.from_game(bitboard_game)}), 1)
+        self.assertEqual(position.rules, CLASSIC)
+        self.assertIsInstance(position.to_game(ConnectFourBitboardPopOut), ConnectFourBitboardPopOut)
+
+    def test_should_differ_when_other_player_to_move(self):
+        '''The same board with the other player to move is another Position'''
+        # given
+        game = ConnectFourClassic()
+        game.drop_move(3)
+
+        # when
+        first = Position.from_game(game)
+        game.change_turns()
+        second = Position.from_game(game)
+
+        # then
+        self.assertNotEqual(first, second)
+        self.assertEqual((first.current_player, second.current_player), (1, 2))
+        self.assertEqual(first.get_board(), second.get_board())
+
+    def test_should_take_few_bytes_when_full_board(self):
+        '''The Position of the full standard board fits in 48 bytes, 8 bytes in the PositionArray'''
+        # given
+        game = self.play_random_moves(ConnectFourClassic(), 42, 9)
+        position = Position.from_game(game)
+
+        # when
+        positions = PositionArray([position] * 10)
+
+        # then
+        self.assertLessEqual(sys.getsizeof(position), 48)
+        self.assertEqual(positions.get_size(), 80)
+        self.assertEqual(positions[3], position)
+        self.assertIsInstance(positions[3], Position)
+        self.assertEqual(pickle.loads(pickle.dumps(position)), position)
+
+    def test_should_restore_game_when_other_board_size(self):
+        '''to_game() restores the position of the 7x9 board given its size'''
+        # given
+        game = self.play_random_moves(ConnectFourClassic(7, 9, 5), 30, 2)
+
+        # when
+        restored = Position.from_game(game).to_game(row_count=7, column_count=9, connect_count=5)
+
+        # then
+        self.assertEqual(restored.get_board(), game.get_board())
+        self.assertEqual(restored.connect_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
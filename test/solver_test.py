@@ -0,0 +1,162 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.solver_test
+
+import threading
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardClassic, ConnectFourBitboardPopOut
+from gamemodel.connectfour import ConnectFourClassic, ConnectFourPopOut
+from gamemodel.solver import Solver, best_move
+from gamemodel.solver.negamax import SOLVED_SCORE
+from gamemodel.solver.transpositiontable import TranspositionTable, EXACT
+
+
+class SolverTest(unittest.TestCase):
+    '''TestCase class for testing the Solver functionalities'''
+
+    def setUp(self):
+        self.game = ConnectFourClassic()
+        self.solver = Solver(table_size=1 << 16)
+
+    def test_should_drop_on_winning_column_when_immediate_win(self):
+        '''best_move() returns the column completing the horizontal line of the current player'''
+        # given
+        self.game.board = [[1, 1, 1, 0, 0, 0, 0],
+                           [2, 2, 2, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        column = best_move(self.game, depth=4)
+
+        # then
+        self.assertEqual(column, 3)
+
+    def test_should_block_column_when_opponent_threatens_to_win(self):
+        '''best_move() returns the column blocking the vertical line of the other player'''
+        # given
+        self.game.board = [[1, 2, 0, 1, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [1, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        self.game.change_turns()
+
+        # when
+        column = self.solver.best_move(self.game, depth=6)
+
+        # then
+        self.assertEqual(column, 0)
+
+    def test_should_solve_position_when_endgame(self):
+        '''search() proves the win of the player 1 who can set up two threats at once'''
+        # given
+        self.game.board = [[0, 1, 1, 0, 0, 2, 2],
+                           [0, 0, 0, 0, 0, 0, 2],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        result = self.solver.search(self.game, depth=5)
+
+        # then
+        self.assertGreater(result.score, SOLVED_SCORE)
+        self.assertEqual(result.column, 3)
+
+    def test_should_solve_position_when_connect_three(self):
+        '''search() finds the win of the player 1 who can make two lines of three on the 4x5 board'''
+        # given
+        self.game = ConnectFourClassic(4, 5, 3)
+        self.game.board = [[0, 1, 0, 0, 2],
+                           [0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0]]
+
+        # when
+        result = self.solver.search(self.game)
+
+        # then
+        self.assertGreater(result.score, SOLVED_SCORE)
+        self.assertEqual(result.column, 2)
+
+    def test_should_report_nodes_when_search(self):
+        '''search() reports the reached depth, the searched nodes and the nodes per second'''
+        # given
+        game = ConnectFourBitboardClassic()
+
+        # when
+        result = self.solver.search(game, depth=5)
+
+        # then
+        self.assertEqual(result.depth, 5)
+        self.assertEqual(result.column, 3)
+        self.assertGreater(result.nodes, 0)
+        self.assertGreater(result.nodes_per_second, 0)
+
+    def test_should_stop_when_time_budget_runs_out(self):
+        '''search() returns a move before the full solve when the time budget is small'''
+        # given
+
+        # when
+        result = self.solver.search(self.game, time_budget=0.2)
+
+        # then
+        self.assertIsNotNone(result.column)
+        self.assertLess(result.depth, 42)
+        self.assertLess(result.elapsed, 1.0)
+
+    def test_should_stop_when_stop_event_set_from_other_thread(self):
+        '''search() returns soon after the stop event is set by another thread'''
+        # given
+        stop = threading.Event()
+        timer = threading.Timer(0.2, stop.set)
+        depths = []
+
+        # when
+        timer.start()
+        result = self.solver.search(self.game, on_progress=lambda result: depths.append(result.depth), stop=stop)
+        timer.join()
+
+        # then
+        self.assertLess(result.elapsed, 1.0)
+        self.assertLess(result.depth, 42)
+        self.assertEqual(result.depth, depths[-1] if depths else 0)
+        self.assertIsNone(self.solver.stop)
+
+    def test_should_raise_value_error_when_popout_game(self):
+        '''search() and best_move() refuse the PopOut games instead of answering with a Classic drop'''
+        # given
+        games = [ConnectFourPopOut(), ConnectFourBitboardPopOut()]
+
+        # when
+
+        # then
+        for game in games:
+            self.assertRaises(ValueError, self.solver.search, game, 4)
+            self.assertRaises(ValueError, best_move, game, 4)
+
+
+class TranspositionTableTest(unittest.TestCase):
+    '''TestCase class for testing the TranspositionTable functionalities'''
+
+    def test_should_replace_entry_when_slot_collision(self):
+        '''put() replaces the older entry stored in the same slot, so the table never grows'''
+        # given
+        table = TranspositionTable(size=8)
+
+        # when
+        table.put(3, 1, EXACT, 5, 2)
+        table.put(11, 2, EXACT, 7, 4)
+
+        # then
+        self.assertIsNone(table.get(3))
+        self.assertEqual(table.get(11), (2, EXACT, 7, 4))
+        self.assertEqual(len(table), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.startup_test
+
+import subprocess
+import sys
+import unittest
+from benchmark.startup_benchmark import HEADLESS_MODULES, ROOT
+
+
+class StartupTest(unittest.TestCase):
+    '''TestCase class checking that the headless entry points start without Qt'''
+
+    def run_python(self, *args):
+        '''Returns the completed process of a new interpreter run in the project directory with the @args'''
+        return subprocess.run([sys.executable, *args], cwd=ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, universal_newlines=True)
+
+    def test_should_not_load_qt_when_import_game_model(self):
+        '''Importing the game model, the solvers and the tools does not import PySide2 nor the process pools'''
+        # given
+        imports = '; '.join(f'import {module}' for module in HEADLESS_MODULES + ['gamemodel.trainingdata', 'main'])
+
+        # when
+        process = self.run_python('-c', imports + '; import sys; print(sorted(sys.modules))')
+
+        # then
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertNotIn("'PySide2'", process.stdout)
+        self.assertNotIn("'concurrent.futures.process'", process.stdout)
+
+    def test_should_import_only_negamax_when_import_solver_package(self):
+        '''Importing the solver package for the computer player does not load the other solvers'''
+        # given
+
+        # when
+        process = self.run_python('-c', 'import gamemodel.solver, sys; print(sorted(sys.modules))')
+
+        # then
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertIn("'gamemodel.solver.negamax'", process.stdout)
+        for module in ('mcts', 'book', 'analysis'):
+            self.assertNotIn(f"'gamemodel.solver.{module}'", process.stdout)
+
+    def test_should_run_tool_when_headless_entry_point(self):
+        '''python -m gamemodel runs the chosen tool, an unknown one only prints the usage'''
+        # given
+
+        # when
+        arena = self.run_python('-m', 'gamemodel', 'arena', 'random', 'greedy', '--games', '2')
+        unknown = self.run_python('-m', 'gamemodel', 'window')
+
+        # then
+        self.assertEqual(arena.returncode, 0, arena.stderr)
+        self.assertEqual(len(arena.stdout.splitlines()), 2)
+        self.assertEqual(unknown.returncode, 2)
+        self.assertIn('usage: python -m gamemodel', unknown.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
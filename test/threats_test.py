@@ -0,0 +1,98 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.threats_test
+
+import unittest
+from gamemodel.bitboard import ConnectFourBitboardClassic
+from gamemodel.connectfour import ConnectFourClassic
+from gamemodel.threats import analyze_threats, get_bitboards, get_threat_board
+
+
+class ThreatsTest(unittest.TestCase):
+    '''TestCase class for testing the threat analysis of the positions'''
+
+    def setUp(self):
+        self.game = ConnectFourClassic()
+        self.threats = get_threat_board()
+
+    def get_cell(self, row, column):
+        '''Returns the bit of the cell on @row and @column of the standard board'''
+        return 1 << (column * 7 + row)
+
+    def test_should_find_winning_cells_when_three_in_line(self):
+        '''The empty cells completing the lines of both players are found, the current player's win is immediate'''
+        # given
+        self.game.board = [[1, 1, 1, 0, 2, 2, 0],
+                           [2, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        report = analyze_threats(self.game)
+
+        # then
+        self.assertEqual(report.winning_cells[1], self.get_cell(0, 3))
+        self.assertEqual(report.winning_cells[2], 0)
+        self.assertEqual(report.immediate_wins, [3])
+        self.assertEqual(report.forced_moves, [])
+        self.assertFalse(report.is_lost)
+
+    def test_should_be_lost_when_two_opponent_wins(self):
+        '''Two immediate wins of the opponent cannot be both blocked, no drop is non-losing'''
+        # given
+        self.game.board = [[0, 2, 2, 2, 0, 1, 1],
+                           [0, 0, 0, 1, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+
+        # when
+        report = analyze_threats(self.game)
+
+        # then
+        self.assertEqual(report.forced_moves, [0, 4])
+        self.assertEqual(report.non_losing_moves, [])
+        self.assertTrue(report.is_lost)
+
+    def test_should_skip_drop_below_opponent_cell_when_non_losing_moves(self):
+        '''The drop right below the opponent's winning cell is not a non-losing move'''
+        # given
+        self.game.board = [[2, 2, 2, 1, 1, 0, 0],
+                           [2, 1, 2, 0, 1, 0, 0],
+                           [1, 1, 1, 0, 2, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0, 0]]
+        self.game.change_turns()
+
+        # when
+        report = analyze_threats(self.game)
+
+        # then
+        self.assertEqual(report.winning_cells[1], self.get_cell(2, 3))
+        self.assertEqual(report.immediate_wins, [])
+        self.assertEqual(report.non_losing_moves, [0, 1, 2, 4, 5, 6])
+        self.assertEqual(report.odd_threats[1], self.get_cell(2, 3))
+        self.assertEqual(report.even_threats[1], 0)
+
+    def test_should_give_same_bitboards_when_list_and_bitboard_games(self):
+        '''get_bitboards() gives the same masks for both game implementations'''
+        # given
+        bitboard_game = ConnectFourBitboardClassic()
+        for column in (3, 3, 2, 4, 0):
+            for game in (self.game, bitboard_game):
+                game.drop_move(column)
+                game.change_turns()
+
+        # when
+        bitboards = get_bitboards(self.game)
+
+        # then
+        self.assertEqual(bitboards, get_bitboards(bitboard_game))
+        self.assertEqual(self.threats.get_columns(self.threats.get_possible_moves(bitboards[1])), list(range(7)))
+
+
+if __name__ == "__main__":
+    unittest.main()
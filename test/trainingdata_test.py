@@ -0,0 +1,111 @@
+# This Python file uses the following encoding: utf-8
+#python -m unittest test.trainingdata_test
+
+import os
+import tempfile
+import unittest
+from gamemodel.connectfour import CLASSIC, POPOUT, DROP, POP
+from gamemodel.gamerecord import GameRecord, GameRecordWriter
+try:
+    import numpy as np
+    from gamemodel.trainingdata import get_samples, export_records, export_self_play
+except ImportError:
+    get_samples = None
+
+
+@unittest.skipIf(get_samples is None, 'numpy is not installed')
+class TrainingDataTest(unittest.TestCase):
+    '''TestCase class for testing the export of the labelled positions into the shards'''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_should_label_every_position_when_finished_game(self):
+        '''Every position before a move is seen by the player to move, with the game result for that player'''
+        # given
+        moves = ((DROP, 0), (DROP, 1), (DROP, 0), (DROP, 1), (DROP, 0), (DROP, 1), (DROP, 0))
+        record = GameRecord(CLASSIC, 1, moves)
+
+        # when
+        samples = get_samples([record], mirror=False)
+
+        # then
+        self.assertEqual(samples['boards'].shape, (7, 2, 6, 7))
+        self.assertEqual(list(samples['players']), [1, 2, 1, 2, 1, 2, 1])
+        self.assertEqual(list(samples['outcomes']), [1, -1, 1, -1, 1, -1, 1])
+        self.assertEqual(list(samples['moves']), [0, 1, 0, 1, 0, 1, 0])
+        # the player 2 sees its coin on the column 1 in the first plane
+        self.assertEqual(samples['boards'][3, 0, 0, 1], 1)
+        self.assertEqual(samples['boards'][3, 1, 0, 0], 1)
+        self.assertTrue(samples['legal'][0, :7].all())
+        self.assertFalse(samples['legal'][0, 7:].any())
+
+    def test_should_mirror_board_mask_and_move_when_mirror(self):
+        '''The mirror image flips the columns of the board, of both halves of the mask and of the move'''
+        # given
+        record = GameRecord(POPOUT, 0, ((DROP, 0), (DROP, 6), (POP, 0)))
+
+        # when
+        samples = get_samples([record])
+
+        # then
+        self.assertEqual(len(samples['moves']), 6)
+        self.assertEqual(list(samples['moves']), [0, 6, 6, 0, 7, 13])
+        np.testing.assert_array_equal(samples['boards'][5], samples['boards'][4][:, :, ::-1])
+        self.assertTrue(samples['legal'][4, 7])
+        self.assertTrue(samples['legal'][5, 13])
+        self.assertEqual(samples['legal'][4, 7:].sum(), 1)
+        self.assertEqual(list(samples['outcomes']), [0] * 6)
+
+    def test_should_skip_game_when_unfinished(self):
+        '''The games without the result give no samples'''
+        # given
+        record = GameRecord(CLASSIC, None, ((DROP, 3),))
+
+        # when
+        samples = get_samples([record])
+
+        # then
+        self.assertEqual(len(samples['moves']), 0)
+
+    def test_should_split_samples_into_shards_when_records_file(self):
+        '''All the samples of the games file are written into the shards of the fixed size'''
+        # given
+        path = os.path.join(self.directory.name, 'games.c4gr')
+        with GameRecordWriter(path) as writer:
+            for _ in range(5):
+                writer.write(GameRecord(CLASSIC, 1, ((DROP, 0), (DROP, 1)) * 3 + ((DROP, 0),)))
+        output = os.path.join(self.directory.name, 'shards')
+
+        # when
+        summary = export_records(output, path, shard_size=30, games_per_job=2)
+
+        # then
+        self.assertEqual(summary['samples'], 70)
+        sizes = [len(np.load(shard)['moves']) for shard in summary['shards']]
+        self.assertEqual(sizes, [30, 30, 10])
+        self.assertEqual(os.path.basename(summary['shards'][0]), 'samples-00000.npz')
+
+    def test_should_write_same_samples_when_parallel(self):
+        '''The self-play export gives the same shards in the process pool as in a single process'''
+        # given
+        agents = ('random', 'greedy')
+
+        # when
+        single = export_self_play(os.path.join(self.directory.name, 'single'), agents, 6,
+                                  shard_size=50, games_per_job=2)
+        parallel = export_self_play(os.path.join(self.directory.name, 'parallel'), agents, 6,
+                                    workers=2, shard_size=50, games_per_job=2)
+
+        # then
+        self.assertEqual(single['samples'], parallel['samples'])
+        self.assertGreater(single['samples_per_second'], 0)
+        for first, second in zip(single['shards'], parallel['shards']):
+            np.testing.assert_array_equal(np.load(first)['boards'], np.load(second)['boards'])
+
+
+if __name__ == "__main__":
+    unittest.main()